@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -8,6 +9,41 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Read replica used by GET handlers that tolerate slightly stale data (None: everything on DATABASE_URL)
+    database_read_url: Optional[str] = None
+    # Seconds a read may lag behind the primary: after a write a client reads from the
+    # primary for this long, and reads go to the primary while the replica lags more
+    database_read_max_staleness: float = 5.0
+    
+    # Connection pool (PostgreSQL / MySQL)
+    db_pool_size: int = 10  # Connections kept open per worker process
+    db_max_overflow: int = 20  # Extra connections allowed under bursts
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced (server idle timeouts)
+    
+    # SQLite tuning
+    sqlite_busy_timeout_ms: int = 5000  # Wait for a writer instead of failing with "database is locked"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kb: int = 64 * 1024
+    
+    # Largest document accepted, in bytes (multipart or resumable upload)
+    max_upload_bytes: int = 20 * 1024 * 1024
+    max_image_dimension: int = 10000  # Longest side accepted, in pixels
+    max_image_pixels: int = 50_000_000  # Width x height accepted (a 48 MP phone photo fits)
+    
+    # Document delivery: "direct" (served by the API), "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd)
+    document_delivery: str = "direct"
+    document_accel_prefix: str = "/protected-uploads/"  # nginx internal location aliasing uploads/
+    
+    # At-rest normalization of stored documents (after OCR)
+    document_format: str = "webp"  # "webp" or "jpeg"
+    document_max_dimension: int = 2400  # Longest side in pixels, keeps enough detail for OCR re-runs
+    document_quality: int = 82
+    original_retention_days: int = 0  # Days to keep the uploaded original after transcoding (0 = drop it)
+    
+    # Admission campaigns run over an academic year starting this month (archive_candidatures.py)
+    campaign_start_month: int = 9
+    
     class Config:
         env_file = ".env"
 
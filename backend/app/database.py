@@ -1,22 +1,285 @@
-from sqlalchemy import create_engine
+import hashlib
+import hmac
+import math
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .config import get_settings
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+from .config import get_settings, Settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# Driver used by the async engine for each database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def _set_sqlite_pragmas(engine: Engine, settings: Settings, in_memory: bool):
+    """Apply the SQLite pragmas on every new connection"""
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            # Readers no longer block the writer (and vice versa); NORMAL is
+            # durable in WAL mode except for the last commits on power loss
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")  # Negative: size in KiB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def _engine_options(url: URL, settings: Settings) -> dict:
+    """create_engine() arguments for a database backend"""
+    if url.get_backend_name() == "sqlite":
+        return {
+            "connect_args": {
+                "check_same_thread": False,  # Sessions are used from the threadpool
+                "timeout": settings.sqlite_busy_timeout_ms / 1000
+            }
+        }
+
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+        "pool_use_lifo": True  # Idle connections beyond the needed ones time out and get recycled
+    }
+
+
+def create_db_engine(settings: Settings) -> Engine:
+    """
+    Create the engine for DATABASE_URL
+
+    - SQLite: shared between threads, WAL journal and tuning pragmas
+    - PostgreSQL / MySQL: connection pool sized from the settings, with
+      pre-ping (dead connections are replaced transparently) and recycling
+    """
+    url = make_url(settings.database_url)
+    engine = create_engine(url, **_engine_options(url, settings))
+
+    if url.get_backend_name() == "sqlite":
+        _set_sqlite_pragmas(engine, settings, url.database in (None, "", ":memory:"))
+
+    return engine
+
+
+def create_async_db_engine(settings: Settings, database_url: Optional[str] = None) -> AsyncEngine:
+    """
+    Create the async engine used by the API for DATABASE_URL (or another URL)
+
+    The driver is swapped for its asyncio counterpart (aiosqlite, asyncpg,
+    aiomysql); pool settings and SQLite pragmas are the same as the sync engine.
+    """
+    url = make_url(database_url or settings.database_url)
+    backend = url.get_backend_name()
+    async_url = url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+    engine = create_async_engine(async_url, **_engine_options(url, settings))
+
+    if backend == "sqlite":
+        _set_sqlite_pragmas(engine.sync_engine, settings, url.database in (None, "", ":memory:"))
+
+    return engine
+
+
+# Sync engine: scripts, migrations and background tasks (run in worker threads)
+engine = create_db_engine(settings)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers, queries do not block the event loop
+async_engine = create_async_db_engine(settings)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    # Objects stay readable after commit without another round trip (and
+    # without lazy loads, which are not allowed in async code)
+    expire_on_commit=False
+)
+
+# Read engine: replica for GET handlers, the primary itself when there is none
+read_async_engine = (
+    create_async_db_engine(settings, settings.database_read_url) if settings.database_read_url else async_engine
+)
+ReadSessionLocal = async_sessionmaker(read_async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+# How far the replica is behind its primary, in seconds (NULL / no row: not replicating)
+REPLICA_LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+    "mysql": "SHOW REPLICA STATUS",
+}
+REPLICA_LAG_CHECK_INTERVAL = 1.0  # Seconds a measured lag is reused
+
+_replica_lag = {"value": 0.0, "checked_at": None}
+
+# Read-your-writes: after a commit the response carries its time, signed, in this
+# header and cookie; the client's next requests send it back (the cookie does by
+# itself), so any worker or host can route its reads
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+_longest_staleness = {"value": settings.database_read_max_staleness}  # Largest read_db() tolerance
+
+
+def _client_key(request: Request) -> Optional[str]:
+    """The bearer token of a request: identifies the client across its requests"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+def _signature(client: str, stamp: str) -> str:
+    return hmac.new(settings.secret_key.encode(), f"{client}|{stamp}".encode(), hashlib.sha256).hexdigest()[:32]
+
 
-def get_db():
-    db = SessionLocal()
+def encode_last_write(client: str, written_at: float) -> str:
+    """Last-write marker of a client: "<unix time>.<signature>" """
+    stamp = f"{written_at:.3f}"
+    return f"{stamp}.{_signature(client, stamp)}"
+
+
+def last_write(request: Request) -> Optional[float]:
+    """When the client of a request last committed, from the marker it sent back (None: unknown or forged)"""
+    client = _client_key(request)
+    marker = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if client is None or not marker:
+        return None
+
+    stamp, _, signature = marker.rpartition(".")
+    if not stamp or not hmac.compare_digest(signature, _signature(client, stamp)):
+        return None
     try:
+        return float(stamp)
+    except ValueError:
+        return None
+
+
+@event.listens_for(Session, "after_commit")
+def record_write(session):
+    """Note on the request that its session committed, see ReadYourWritesMiddleware"""
+    request = session.info.get("request")
+    if request is not None:
+        request.state.last_write = time.time()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Add the last-write marker (header and cookie) to the responses of
+    requests that committed, for read_db() to route the client's next reads
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})  # Shared with request.state
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and state.get("last_write") is not None:
+                client = _client_key(Request(scope))
+                if client is not None:
+                    marker = encode_last_write(client, state["last_write"])
+                    cookie = (
+                        f"{LAST_WRITE_COOKIE}={marker}; Max-Age={math.ceil(_longest_staleness['value'])}; "
+                        "Path=/; HttpOnly; SameSite=Lax"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (LAST_WRITE_HEADER.lower().encode(), marker.encode()),
+                        (b"set-cookie", cookie.encode()),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
+
+
+async def replica_lag() -> float:
+    """
+    Current lag of the read replica, in seconds, measured at most once per
+    REPLICA_LAG_CHECK_INTERVAL; infinite while the replica cannot be reached
+    """
+    if read_async_engine is async_engine:
+        return 0.0
+
+    now = time.monotonic()
+    checked_at = _replica_lag["checked_at"]
+    if checked_at is not None and now - checked_at < REPLICA_LAG_CHECK_INTERVAL:
+        return _replica_lag["value"]
+
+    query = REPLICA_LAG_QUERIES.get(read_async_engine.dialect.name)
+    lag = 0.0
+    if query is not None:
+        try:
+            async with read_async_engine.connect() as connection:
+                row = (await connection.execute(text(query))).first()
+            if row is not None and read_async_engine.dialect.name == "mysql":
+                value = row._mapping.get("Seconds_Behind_Source", row._mapping.get("Seconds_Behind_Master"))
+                lag = float("inf") if value is None else float(value)  # NULL: replication stopped
+            elif row is not None:
+                lag = float(row[0] or 0)
+        except DBAPIError:
+            lag = float("inf")
+
+    _replica_lag.update(value=lag, checked_at=now)
+    return lag
+
+
+async def get_db(request: Request):
+    """Session on the primary: writes, and reads that must see them"""
+    async with AsyncSessionLocal() as db:
+        db.sync_session.info["request"] = request
         yield db
-    finally:
-        db.close()
+
+
+def read_db(max_staleness: Optional[float] = None):
+    """
+    Dependency factory: a session for handlers that only read
+
+    The session is on the read replica (DATABASE_READ_URL) unless
+    - the client committed something less than `max_staleness` seconds ago
+      (read-your-writes: the replica might not have it yet), or
+    - the replica is more than `max_staleness` seconds behind.
+    In both cases it is on the primary, like get_db().
+
+    Args:
+        max_staleness: Seconds of lag the handler tolerates, defaults to
+            DATABASE_READ_MAX_STALENESS
+    """
+    staleness = settings.database_read_max_staleness if max_staleness is None else max_staleness
+    _longest_staleness["value"] = max(_longest_staleness["value"], staleness)
+
+    async def get_read_db(request: Request):
+        written_at = last_write(request)
+
+        if written_at is not None and time.time() - written_at < staleness:
+            session_factory = AsyncSessionLocal
+        elif await replica_lag() > staleness:
+            session_factory = AsyncSessionLocal
+        else:
+            session_factory = ReadSessionLocal
+
+        async with session_factory() as db:
+            yield db
+
+    return get_read_db
+
+
+get_read_db = read_db()
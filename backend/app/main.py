@@ -1,13 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
-from .database import engine, Base
-from .routers import auth_router, offres_router, candidatures_router, admin_router, profile_router
+from .database import LAST_WRITE_HEADER, ReadYourWritesMiddleware
+from .routers import auth_router, offres_router, candidatures_router, admin_router, profile_router, documents_router, uploads_router
 from .routers.candidatures_grades import router as candidatures_grades_router
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Database schema is managed by migrations: run `alembic upgrade head`
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,14 +23,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", LAST_WRITE_HEADER],
 )
 
+# Last-write marker on responses, for read-your-writes across workers
+app.add_middleware(ReadYourWritesMiddleware)
+
 # Create uploads directory
 os.makedirs("uploads", exist_ok=True)
 os.makedirs("uploads/profiles", exist_ok=True)
 
-# Mount static files for uploaded documents
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Uploaded documents are served by the /documents router (access checks, caching, Range)
 
 # Include routers
 app.include_router(auth_router)
@@ -41,6 +42,8 @@ app.include_router(offres_router)
 app.include_router(candidatures_router)
 app.include_router(candidatures_grades_router)
 app.include_router(admin_router)
+app.include_router(documents_router)
+app.include_router(uploads_router)
 
 
 @app.get("/")
@@ -55,7 +58,9 @@ async def root():
             "profile": "/profile",
             "offres": "/offres",
             "candidatures": "/candidatures",
-            "admin": "/admin"
+            "admin": "/admin",
+            "documents": "/documents",
+            "uploads": "/uploads"
         }
     }
 
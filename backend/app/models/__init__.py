@@ -3,5 +3,11 @@ from .offre import Offre, OffreStatus
 from .candidature import Candidature, CandidatureStatus
 from .student_profile import StudentProfile, ProfileStatus
 from .semester_grade import SemesterGrade, DiplomaType
+from .document import DocumentBlob, DocumentReference
+from .document_result import DocumentResult
+from .upload_session import UploadSession, UploadStatus
+from .statistics import DiplomaStatistics, CandidatureStatistics
+from .archive import ArchivedCandidature, ArchivedSemesterGrade
+from . import identifiers  # noqa: F401 - fills the lookup columns of candidatures and profiles
 
-__all__ = ["User", "UserRole", "Offre", "OffreStatus", "Candidature", "CandidatureStatus", "StudentProfile", "ProfileStatus", "SemesterGrade", "DiplomaType"]
+__all__ = ["User", "UserRole", "Offre", "OffreStatus", "Candidature", "CandidatureStatus", "StudentProfile", "ProfileStatus", "SemesterGrade", "DiplomaType", "DocumentBlob", "DocumentReference", "DocumentResult", "UploadSession", "UploadStatus", "DiplomaStatistics", "CandidatureStatistics", "ArchivedCandidature", "ArchivedSemesterGrade"]
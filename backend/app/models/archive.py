@@ -0,0 +1,84 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, JSON, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class ArchivedCandidature(Base):
+    """
+    Closed candidature (accepted or rejected) of a past admission campaign
+
+    Moved out of candidatures by archive_candidatures.py so the hot table
+    only holds the current campaign. Has its own id, which its documents and
+    OCR results are keyed by: the original one (original_id) can be given to
+    a new candidature once the row is gone (SQLite reuses the highest
+    rowid). No foreign keys, an archived candidature outlives its offre.
+    """
+    __tablename__ = "archived_candidatures"
+    __table_args__ = (
+        Index("ix_archived_candidatures_campaign_created_at_id", "campaign", "created_at", "id"),  # Pagination
+        Index("ix_archived_candidatures_offre", "offre_id"),
+        Index("ix_archived_candidatures_candidat", "candidat_id"),
+        Index("ix_archived_candidatures_original_id", "original_id"),
+        {"sqlite_autoincrement": True}  # Never reuse an id, documents point to it
+    )
+
+    id = Column(Integer, primary_key=True)
+    original_id = Column(Integer, nullable=False)  # candidatures.id before archival
+    campaign = Column(String(9), nullable=False)  # Academic year of the campaign: "2024-2025"
+    candidat_id = Column(Integer, nullable=False)
+    offre_id = Column(Integer, nullable=False)
+    offre_titre = Column(String(255))  # As it was when archived
+
+    nom = Column(String(100), nullable=False)
+    prenom = Column(String(100), nullable=False)
+    date_naissance = Column(String(50))
+    telephone = Column(String(20))
+    cne = Column(String(20))
+    cin_number = Column(String(20))
+
+    cin_image_path = Column(String(500))
+    bac_image_path = Column(String(500))
+    cin_data = Column(JSON)
+    bac_data = Column(JSON)
+
+    status = Column(String(20), nullable=False)  # CandidatureStatus value
+    commentaire = Column(Text)
+    grades_count = Column(Integer, default=0, nullable=False)
+    average_total = Column(Float)
+
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    semester_grades = relationship(
+        "ArchivedSemesterGrade", back_populates="candidature", cascade="all, delete-orphan",
+        order_by="ArchivedSemesterGrade.semester_number"
+    )
+
+
+class ArchivedSemesterGrade(Base):
+    """Semester grade of an archived candidature, original_id is its semester_grades.id"""
+    __tablename__ = "archived_semester_grades"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    original_id = Column(Integer, nullable=False)
+    candidature_id = Column(Integer, ForeignKey("archived_candidatures.id"), nullable=False, index=True)
+
+    diploma_type = Column(String(20), nullable=False)  # DiplomaType value
+    semester_number = Column(Integer, nullable=False)
+    academic_year = Column(String(10))
+    average = Column(Float)
+    grades_detail = Column(JSON)
+    transcript_path = Column(String(255))
+    ocr_data = Column(JSON)
+
+    is_validated = Column(Boolean, default=False)
+    validated_by = Column(Integer)
+    validated_at = Column(DateTime)
+
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+    candidature = relationship("ArchivedCandidature", back_populates="semester_grades")
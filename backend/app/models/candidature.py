@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Float, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -15,6 +15,21 @@ class CandidatureStatus(str, enum.Enum):
 
 class Candidature(Base):
     __tablename__ = "candidatures"
+    __table_args__ = (
+        # Un candidat ne postule qu'une fois à une offre
+        Index("uq_candidatures_candidat_offre", "candidat_id", "offre_id", unique=True),
+        Index("ix_candidatures_offre_status", "offre_id", "status"),
+        Index("ix_candidatures_status_created_at", "status", "created_at"),
+        Index("ix_candidatures_created_at_id", "created_at", "id"),  # Pagination
+        # Classement et filtre par moyenne, dans une offre ou globalement
+        Index("ix_candidatures_offre_average", "offre_id", "average_total"),
+        Index("ix_candidatures_average", "average_total"),
+        # Recherche admin par identifiant ou par nom (exact ou préfixe)
+        Index("ix_candidatures_cne_lookup", "cne_lookup"),
+        Index("ix_candidatures_cin_number_lookup", "cin_number_lookup"),
+        Index("ix_candidatures_nom_prenom", "nom_normalized", "prenom_normalized"),
+        Index("ix_candidatures_prenom", "prenom_normalized"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     candidat_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -26,6 +41,16 @@ class Candidature(Base):
     date_naissance = Column(String(50))
     telephone = Column(String(20))
     
+    # Identifiants tels que saisis
+    cne = Column(String(20))
+    cin_number = Column(String(20))
+    
+    # Identifiants de recherche, remplis à l'écriture (voir models/identifiers.py)
+    cne_lookup = Column(String(20))
+    cin_number_lookup = Column(String(20))
+    nom_normalized = Column(String(100))
+    prenom_normalized = Column(String(100))
+    
     # Documents
     cin_image_path = Column(String(500))
     bac_image_path = Column(String(500))
@@ -38,6 +63,10 @@ class Candidature(Base):
     status = Column(Enum(CandidatureStatus), default=CandidatureStatus.INCOMPLETE, nullable=False)
     commentaire = Column(Text)
     
+    # Notes, maintenues à chaque écriture de SemesterGrade (voir models/statistics.py)
+    grades_count = Column(Integer, default=0, server_default="0", nullable=False)
+    average_total = Column(Float)  # Moyenne des semestres qui en ont une
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
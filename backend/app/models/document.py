@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class DocumentBlob(Base):
+    __tablename__ = "document_blobs"
+
+    # SHA-256 du contenu : deux fichiers identiques partagent le même blob
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String(500), unique=True, nullable=False)  # uploads/store/ab/cd/abcd...jpg
+    size = Column(Integer, nullable=False)
+    content_type = Column(String(100))
+    ref_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relations
+    references = relationship("DocumentReference", back_populates="blob")
+
+
+class DocumentReference(Base):
+    __tablename__ = "document_references"
+    __table_args__ = (
+        UniqueConstraint("owner_type", "owner_id", "field", name="uq_document_reference_owner_field"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_type = Column(String(50), nullable=False)  # "candidature", "student_profile"
+    owner_id = Column(Integer, nullable=False)
+    field = Column(String(50), nullable=False)  # "cin_image_path", "bac_image_path", "releve_notes_path"
+    blob_sha256 = Column(String(64), ForeignKey("document_blobs.sha256"), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=True)  # Originals kept after transcoding, per retention policy
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relations
+    blob = relationship("DocumentBlob", back_populates="references")
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import deferred
+from datetime import datetime
+from ..database import Base
+
+
+class DocumentResult(Base):
+    """
+    Full OCR output of a document (raw text, layout), compressed
+
+    The owner row (candidature, profile) only keeps the compact part of the
+    result in its *_data column; the bulky rest lives here and is read when
+    an admin needs it.
+    """
+    __tablename__ = "document_results"
+    __table_args__ = (
+        UniqueConstraint("owner_type", "owner_id", "field", name="uq_document_result_owner_field"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_type = Column(String(50), nullable=False)  # "candidature", "student_profile"
+    owner_id = Column(Integer, nullable=False)
+    field = Column(String(50), nullable=False)  # "cin_data", "bac_data", "releve_data"
+
+    codec = Column(String(10), default="zstd", nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed JSON size in bytes
+    payload = deferred(Column(LargeBinary, nullable=False))  # Only loaded when asked for
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,51 @@
+import re
+import unicodedata
+from typing import Any, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .candidature import Candidature
+from .student_profile import StudentProfile
+
+IDENTIFIER_LENGTH = 20  # cne_lookup, cin_number_lookup columns
+NAME_LENGTH = 100  # nom_normalized, prenom_normalized columns
+
+
+def normalize_name(value: Optional[str]) -> Optional[str]:
+    """Name as searched: lowercase ASCII words ("Aït-Brahim  Hajar" -> "ait brahim hajar")"""
+    if not value:
+        return None
+    folded = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.findall(r"[a-z0-9]+", folded))[:NAME_LENGTH] or None
+
+
+def normalize_identifier(value: Any) -> Optional[str]:
+    """CNE or CIN number as searched: uppercase letters and digits ("ab 123-456" -> "AB123456")"""
+    if not value:
+        return None
+    return "".join(re.findall(r"[A-Za-z0-9]", str(value))).upper()[:IDENTIFIER_LENGTH] or None
+
+
+def _extracted(ocr_data: Optional[dict], field: str) -> Optional[str]:
+    """A field read by OCR from a document (verified_fields of the *_data column)"""
+    return normalize_identifier(((ocr_data or {}).get("verified_fields") or {}).get(field))
+
+
+@event.listens_for(Session, "before_flush")
+def update_identifiers(session, flush_context, instances):
+    """
+    Fill the lookup columns of candidatures and profiles being written
+
+    Names are normalized from nom / prenom; cin_number_lookup and
+    cne_lookup are read from the OCR results. When a document could not be
+    read, they take the normalized cin_number / cne, which are left as
+    entered (for a candidature: the CNE typed by the candidate).
+    """
+    for instance in list(session.new) + list(session.dirty):
+        if not isinstance(instance, (Candidature, StudentProfile)):
+            continue
+        instance.nom_normalized = normalize_name(instance.nom)
+        instance.prenom_normalized = normalize_name(instance.prenom)
+        instance.cin_number_lookup = (
+            _extracted(instance.cin_data, "cin_number") or normalize_identifier(instance.cin_number)
+        )
+        instance.cne_lookup = _extracted(instance.bac_data, "cne") or normalize_identifier(instance.cne)
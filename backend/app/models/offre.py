@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -13,6 +13,9 @@ class OffreStatus(str, enum.Enum):
 
 class Offre(Base):
     __tablename__ = "offres"
+    __table_args__ = (
+        Index("ix_offres_created_at_id", "created_at", "id"),  # Pagination
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     titre = Column(String(255), nullable=False)
@@ -20,7 +23,7 @@ class Offre(Base):
     type_formation = Column(String(100))  # Licence, Master, Doctorat, etc.
     duree = Column(String(50))  # "2 ans", "3 ans", etc.
     conditions = Column(Text)
-    status = Column(Enum(OffreStatus), default=OffreStatus.VALIDATED, nullable=False)  # Admin creates validated offers by default
+    status = Column(Enum(OffreStatus), default=OffreStatus.VALIDATED, nullable=False, index=True)  # Admin creates validated offers by default
     admin_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
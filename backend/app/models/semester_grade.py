@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -15,6 +15,10 @@ class DiplomaType(str, enum.Enum):
 
 class SemesterGrade(Base):
     __tablename__ = "semester_grades"
+    __table_args__ = (
+        # Une seule ligne par semestre d'une candidature
+        Index("uq_semester_grades_candidature_semester", "candidature_id", "semester_number", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     candidature_id = Column(Integer, ForeignKey("candidatures.id"), nullable=False)
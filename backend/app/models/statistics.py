@@ -0,0 +1,272 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE, set_committed_value
+from collections import defaultdict
+from datetime import datetime
+from ..database import Base
+from .candidature import Candidature
+from .student_profile import StudentProfile, ProfileStatus
+from .semester_grade import SemesterGrade
+
+
+class DiplomaStatistics(Base):
+    """
+    Students and grades per diploma, kept up to date on every write
+
+    Students are counted under their profile's current_diploma ("" when not
+    set yet), grades under the diploma of the semester.
+    """
+    __tablename__ = "diploma_statistics"
+
+    diploma = Column(String(50), primary_key=True)
+    students_count = Column(Integer, default=0, nullable=False)
+    verified_count = Column(Integer, default=0, nullable=False)
+    grades_count = Column(Integer, default=0, nullable=False)  # Semesters with an average
+    grades_sum = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CandidatureStatistics(Base):
+    """Candidatures per offre and status, kept up to date on every write"""
+    __tablename__ = "candidature_statistics"
+
+    # No foreign key: counts of a deleted offre drop to 0 in the same flush
+    offre_id = Column(Integer, primary_key=True)
+    status = Column(String(20), primary_key=True)  # CandidatureStatus value
+    candidatures_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def _profile_counts(values: dict) -> dict:
+    return {
+        (DiplomaStatistics, (values["current_diploma"] or "",)): {
+            "students_count": 1,
+            "verified_count": int(values["profile_status"] == ProfileStatus.VERIFIED)
+        }
+    }
+
+
+def _grade_counts(values: dict) -> dict:
+    if values["average"] is None:
+        return {}
+    return {
+        (DiplomaStatistics, (values["diploma_type"].value,)): {
+            "grades_count": 1,
+            "grades_sum": values["average"]
+        }
+    }
+
+
+def _candidature_counts(values: dict) -> dict:
+    return {
+        (CandidatureStatistics, (values["offre_id"], values["status"].value)): {
+            "candidatures_count": 1
+        }
+    }
+
+
+# Mapped class -> (attributes the statistics depend on, contribution of one row)
+TRACKED = {
+    StudentProfile: (("current_diploma", "profile_status"), _profile_counts),
+    SemesterGrade: (("diploma_type", "average"), _grade_counts),
+    Candidature: (("offre_id", "status"), _candidature_counts),
+}
+
+
+def _stored_values(session: Session, obj, attributes) -> dict:
+    """Values of a persistent row as they are in the database, before this flush"""
+    state = inspect(obj)
+    values = {}
+    for attribute in attributes:
+        if attribute in state.committed_state:
+            value = state.committed_state[attribute]  # Modified: the original value
+        else:
+            value = state.dict.get(attribute, NO_VALUE)
+        if value is NO_VALUE:
+            break
+        values[attribute] = value
+    else:
+        return values
+
+    # Not loaded (expired after a commit): read the row as it is stored
+    mapper = state.mapper
+    row = session.connection().execute(
+        select(*[mapper.columns[attribute] for attribute in attributes]).where(
+            *[column == value for column, value in zip(mapper.primary_key, state.identity)]
+        )
+    ).one()
+    return dict(zip(attributes, row))
+
+
+def _new_values(obj, attributes) -> dict:
+    """Values a row is about to be written with, column defaults included"""
+    state = inspect(obj)
+    values = {}
+    for attribute in attributes:
+        value = getattr(obj, attribute)
+        default = state.mapper.columns[attribute].default
+        if value is None and state.pending and default is not None and default.is_scalar:
+            value = default.arg
+        values[attribute] = value
+    return values
+
+
+def _add(deltas: dict, counts: dict, sign: int):
+    for key, columns in counts.items():
+        for column, value in columns.items():
+            deltas[key][column] += sign * value
+
+
+def _apply(session: Session, deltas: dict):
+    """Add the deltas to the statistics rows, creating missing rows"""
+    connection = session.connection()
+    now = datetime.utcnow()
+
+    for (model, key), columns in deltas.items():
+        columns = {column: value for column, value in columns.items() if value}
+        if not columns:
+            continue
+
+        table = model.__table__
+        key_columns = dict(zip([column.name for column in table.primary_key.columns], key))
+        increment = update(table).where(
+            *[table.c[column] == value for column, value in key_columns.items()]
+        ).values(
+            updated_at=now,
+            **{column: table.c[column] + value for column, value in columns.items()}
+        )
+
+        if connection.execute(increment).rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(**key_columns, **columns, updated_at=now))
+        except IntegrityError:
+            # Created meanwhile by another transaction
+            connection.execute(increment)
+
+
+def _changed(state, attributes) -> bool:
+    """Whether a persistent row has a tracked attribute, or a relationship setting one, modified"""
+    if any(attribute in state.committed_state for attribute in attributes):
+        return True
+    # Foreign keys set through a relationship (candidature.offre = ...) are only copied by the flush
+    return any(
+        relationship.key in state.committed_state
+        for relationship in state.mapper.relationships
+        if {column.key for column in relationship.local_columns} & set(attributes)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def collect_statistics_changes(session: Session, flush_context, instances):
+    """
+    Note the rows of this flush the statistics depend on, with their values
+    as stored before it
+
+    Their new values are read once the flush has run (update_statistics):
+    foreign keys set through a relationship, and the ids of new parents,
+    are only known then.
+    """
+    changes = []
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tracked = TRACKED.get(type(obj))
+        if not tracked:
+            continue
+        attributes = tracked[0]
+        state = inspect(obj)
+        deleted = obj in session.deleted
+
+        if state.persistent and not deleted and not _changed(state, attributes):
+            continue  # Other columns changed
+        stored = _stored_values(session, obj, attributes) if state.persistent else None
+        changes.append((obj, stored, deleted))
+
+    # Replaces what a failed flush may have left
+    session.info["statistics_changes"] = changes
+
+
+@event.listens_for(Session, "after_flush")
+def update_statistics(session: Session, flush_context):
+    """
+    Apply the writes just flushed to the statistics tables
+
+    Runs in the flush, so the statistics are committed (or rolled back)
+    together with the rows they describe. Bulk Core statements bypass the
+    session: run rebuild_statistics.py after those.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    for obj, stored, deleted in session.info.pop("statistics_changes", []):
+        attributes, counts = TRACKED[type(obj)]
+        if stored is not None:
+            _add(deltas, counts(stored), -1)
+        if not deleted:
+            _add(deltas, counts(_new_values(obj, attributes)), 1)
+
+    if deltas:
+        _apply(session, deltas)
+
+
+@event.listens_for(Session, "before_flush")
+def collect_regraded_candidatures(session: Session, flush_context, instances):
+    """Remember the candidatures a changed or deleted grade belonged to"""
+    regraded = session.info.setdefault("regraded_candidatures", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, SemesterGrade) or not inspect(obj).persistent:
+            continue
+        if obj in session.deleted or _changed(inspect(obj), ("candidature_id", "average")):
+            regraded.add(_stored_values(session, obj, ("candidature_id",))["candidature_id"])
+
+
+@event.listens_for(Session, "after_flush")
+def update_candidature_grades(session: Session, flush_context):
+    """
+    Recompute Candidature.grades_count and average_total of regraded candidatures
+
+    Runs once the grades are written (new grades have their candidature_id
+    even when added through the relationship). The average only counts
+    semesters that have one.
+    """
+    regraded = session.info.pop("regraded_candidatures", set())
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, SemesterGrade):
+            continue
+        if obj in session.new or _changed(inspect(obj), ("candidature_id", "average")):
+            regraded.add(obj.candidature_id)
+    regraded.discard(None)
+    if not regraded:
+        return
+
+    connection = session.connection()
+    scores = {candidature_id: (0, None) for candidature_id in regraded}
+    scores.update({
+        candidature_id: (count, average)
+        for candidature_id, count, average in connection.execute(
+            select(
+                SemesterGrade.candidature_id,
+                func.count(SemesterGrade.id),
+                func.avg(SemesterGrade.average)
+            ).where(
+                SemesterGrade.candidature_id.in_(regraded)
+            ).group_by(SemesterGrade.candidature_id)
+        )
+    })
+
+    table = Candidature.__table__
+    mapper = inspect(Candidature)
+    for candidature_id, (count, average) in scores.items():
+        connection.execute(
+            update(table).where(table.c.id == candidature_id).values(
+                grades_count=count,
+                average_total=average,
+                updated_at=table.c.updated_at  # Derived data: not an update of the candidature
+            )
+        )
+        # Keep loaded instances in sync without reloading them
+        candidature = session.identity_map.get(mapper.identity_key_from_primary_key((candidature_id,)))
+        if candidature is not None:
+            set_committed_value(candidature, "grades_count", count)
+            set_committed_value(candidature, "average_total", average)
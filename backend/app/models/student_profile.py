@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, Enum, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, JSON, Enum, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,6 +14,13 @@ class ProfileStatus(str, enum.Enum):
 
 class StudentProfile(Base):
     __tablename__ = "student_profiles"
+    __table_args__ = (
+        # Recherche admin par identifiant ou par nom (exact ou préfixe)
+        Index("ix_student_profiles_cne_lookup", "cne_lookup"),
+        Index("ix_student_profiles_cin_number_lookup", "cin_number_lookup"),
+        Index("ix_student_profiles_nom_prenom", "nom_normalized", "prenom_normalized"),
+        Index("ix_student_profiles_prenom", "prenom_normalized"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
@@ -25,6 +32,16 @@ class StudentProfile(Base):
     telephone = Column(String(20))
     adresse = Column(Text)
     
+    # Identifiants tels que saisis
+    cne = Column(String(20))
+    cin_number = Column(String(20))
+    
+    # Identifiants de recherche, remplis à l'écriture (voir models/identifiers.py)
+    cne_lookup = Column(String(20))
+    cin_number_lookup = Column(String(20))
+    nom_normalized = Column(String(100))
+    prenom_normalized = Column(String(100))
+    
     # Documents - chemins des fichiers
     cin_image_path = Column(String(255))
     bac_image_path = Column(String(255))
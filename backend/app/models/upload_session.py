@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+from ..database import Base
+
+
+class UploadStatus(str, enum.Enum):
+    IN_PROGRESS = "in_progress"  # Chunks still being received
+    COMPLETED = "completed"      # Finalized, bytes moved into the document store
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String(32), primary_key=True)  # Opaque upload id (uuid4 hex)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    filename = Column(String(255))
+    upload_length = Column(Integer, nullable=False)  # Total size announced by the client
+    upload_offset = Column(Integer, default=0, nullable=False)  # Bytes received so far
+    
+    status = Column(Enum(UploadStatus), default=UploadStatus.IN_PROGRESS, nullable=False)
+    blob_sha256 = Column(String(64), ForeignKey("document_blobs.sha256"), nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relations
+    user = relationship("User", back_populates="upload_sessions")
+    blob = relationship("DocumentBlob")
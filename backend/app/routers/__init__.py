@@ -3,5 +3,7 @@ from .offres import router as offres_router
 from .candidatures import router as candidatures_router
 from .admin import router as admin_router
 from .profile import router as profile_router
+from .documents import router as documents_router
+from .uploads import router as uploads_router
 
-__all__ = ["auth_router", "offres_router", "candidatures_router", "admin_router", "profile_router"]
+__all__ = ["auth_router", "offres_router", "candidatures_router", "admin_router", "profile_router", "documents_router", "uploads_router"]
@@ -1,14 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import User, Offre, UserRole, OffreStatus
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from itertools import groupby
+from typing import Iterator, List, Optional
+import json
+import os
+import re
+from ..database import get_db, get_read_db, read_db, SessionLocal
+from ..models import (
+    User, Offre, UserRole, OffreStatus, DiplomaStatistics, CandidatureStatistics, Candidature, StudentProfile,
+    ArchivedCandidature, ArchivedSemesterGrade
+)
 from ..schemas import UserResponse, UserUpdate, OffreResponse, OffreValidation
-from ..utils import get_current_user
+from ..utils import get_current_user, document_store, document_results
+from ..utils.archive import ARCHIVED_OWNER_TYPE
+from ..utils.candidate_lookup import lookup_conditions
+from ..utils.image_derivatives import derivative_service
+from ..utils.pagination import paginate
+from ..utils.tabular_stream import stream_csv, stream_ndjson
+from ..utils.zip_stream import stream_zip, ZipEntry
 from datetime import datetime
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+# The dashboard figures can be a minute behind: read them from the replica even when it lags
+get_statistics_db = read_db(max_staleness=60)
+
 
 def check_admin(current_user: User = Depends(get_current_user)):
     """Ensure current user is admin"""
@@ -22,15 +41,18 @@ def check_admin(current_user: User = Depends(get_current_user)):
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(check_admin)
 ):
     """
     Get all users (ADMIN only)
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    users = await paginate(db, select(User), User, response, skip, limit, cursor, include_total)
     return users
 
 
@@ -38,13 +60,13 @@ async def get_all_users(
 async def update_user_status(
     user_id: int,
     is_active: bool,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(check_admin)
 ):
     """
     Activate or deactivate a user (ADMIN only)
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -53,38 +75,41 @@ async def update_user_status(
         )
     
     user.is_active = is_active
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 
 @router.get("/offres/pending", response_model=List[OffreResponse])
 async def get_pending_offres(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(check_admin)
 ):
     """
     Get all offres pending validation (ADMIN only)
     """
-    pending_offres = db.query(Offre).filter(
-        Offre.status == OffreStatus.PENDING
-    ).all()
+    pending_offres = (await db.execute(
+        select(Offre).where(Offre.status == OffreStatus.PENDING)
+    )).scalars().all()
     
     return pending_offres
 
 
 @router.get("/offres/all", response_model=List[OffreResponse])
 async def get_all_offres(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(check_admin)
 ):
     """
     Get all offres regardless of status (ADMIN only)
     """
-    offres = db.query(Offre).offset(skip).limit(limit).all()
+    offres = await paginate(db, select(Offre), Offre, response, skip, limit, cursor, include_total)
     return offres
 
 
@@ -92,7 +117,7 @@ async def get_all_offres(
 async def validate_offre(
     offre_id: int,
     validation: OffreValidation,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(check_admin)
 ):
     """
@@ -100,7 +125,7 @@ async def validate_offre(
     
     - **status**: "validated" or "rejected"
     """
-    offre = db.query(Offre).filter(Offre.id == offre_id).first()
+    offre = await db.get(Offre, offre_id)
     
     if not offre:
         raise HTTPException(
@@ -115,8 +140,8 @@ async def validate_offre(
         )
     
     offre.status = validation.status
-    db.commit()
-    db.refresh(offre)
+    await db.commit()
+    await db.refresh(offre)
     
     return offre
 
@@ -124,14 +149,14 @@ async def validate_offre(
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(check_admin)
 ):
     """
     Delete a user (ADMIN only)
     Warning: This will cascade delete all related data
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -146,19 +171,38 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    db.delete(user)
-    db.commit()
+    # Archived candidatures have no foreign key to the user: delete them too
+    # (their documents are released by gc_uploads.py)
+    archived = select(ArchivedCandidature.id).where(ArchivedCandidature.candidat_id == user.id)
+    await db.execute(delete(ArchivedSemesterGrade).where(ArchivedSemesterGrade.candidature_id.in_(archived)))
+    await db.execute(delete(ArchivedCandidature).where(ArchivedCandidature.candidat_id == user.id))
+    
+    await db.delete(user)
+    await db.commit()
     
     return None
 
 
+def _document_links(reference):
+    """URLs of a stored document and of its review renditions"""
+    if not reference:
+        return None
+    return {
+        "original": f"/documents/{reference.blob_sha256}",
+        **derivative_service.urls_for(reference.blob_sha256)
+    }
+
+
 # ===== NEW ENDPOINTS FOR STUDENT ANALYTICS =====
 
 @router.get("/students")
 async def get_all_students(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(check_admin)
 ):
     """
@@ -168,7 +212,8 @@ async def get_all_students(
     """
     try:
         # Query for CANDIDAT users only
-        users = db.query(User).filter(User.role == UserRole.CANDIDAT).offset(skip).limit(limit).all()
+        query = select(User).where(User.role == UserRole.CANDIDAT)
+        users = await paginate(db, query, User, response, skip, limit, cursor, include_total)
         
         # Build simple response
         result = []
@@ -187,6 +232,8 @@ async def get_all_students(
             })
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_all_students: {str(e)}")
         import traceback
@@ -199,28 +246,95 @@ async def get_all_students(
 
 
 
+@router.get("/lookup")
+async def lookup_candidates(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(check_admin)
+):
+    """
+    Find candidatures and student profiles by CNE, CIN number or name
+    
+    - A CNE / CIN number, or its beginning: "K1234" finds "K123456789"
+    - A name, its beginning, or "nom prenom" in either order; accents,
+      case and punctuation are ignored
+    
+    Exact matches come first. The identifiers are read from the documents
+    by OCR and stored in indexed columns.
+    """
+    results = {}
+    for key, model, loader in (
+        ("candidatures", Candidature, joinedload(Candidature.offre)),
+        ("students", StudentProfile, joinedload(StudentProfile.user))
+    ):
+        matches, exact = lookup_conditions(model, q)
+        results[key] = (await db.execute(
+            select(model, exact.label("exact")).options(loader).where(matches).order_by(
+                case((exact, 0), else_=1), model.nom_normalized, model.prenom_normalized, model.id
+            ).limit(limit)
+        )).all()
+    
+    return {
+        "candidatures": [
+            {
+                "id": cand.id,
+                "candidat_id": cand.candidat_id,
+                "nom": cand.nom,
+                "prenom": cand.prenom,
+                "cne": cand.cne,
+                "cin_number": cand.cin_number,
+                "offre_id": cand.offre_id,
+                "offre_titre": cand.offre.titre if cand.offre else None,
+                "status": cand.status.value,
+                "match": "exact" if is_exact else "prefix"
+            }
+            for cand, is_exact in results["candidatures"]
+        ],
+        "students": [
+            {
+                "id": profile.id,
+                "user_id": profile.user_id,
+                "nom": profile.nom,
+                "prenom": profile.prenom,
+                "email": profile.user.email if profile.user else None,
+                "cne": profile.cne,
+                "cin_number": profile.cin_number,
+                "profile_status": profile.profile_status.value,
+                "match": "exact" if is_exact else "prefix"
+            }
+            for profile, is_exact in results["students"]
+        ]
+    }
+
+
 @router.get("/students/{student_id}/grades")
 async def get_student_grades(
     student_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(check_admin)
 ):
     """
     Get detailed semester grades for a specific student
     Returns all semesters with grades, diploma info, and statistics
     """
-    from ..models import StudentProfile, SemesterGrade
-    from sqlalchemy import func
+    from ..models import StudentProfile, SemesterGrade, Candidature
     
     # Get student profile
-    student = db.query(StudentProfile).filter(StudentProfile.id == student_id).first()
+    student = (await db.execute(
+        select(StudentProfile).options(joinedload(StudentProfile.user)).where(StudentProfile.id == student_id)
+    )).scalars().first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Get all semester grades
-    grades = db.query(SemesterGrade).filter(
-        SemesterGrade.student_profile_id == student_id
-    ).order_by(SemesterGrade.semester_number).all()
+    # Get all semester grades, entered in the student's candidatures
+    grades = (await db.execute(
+        select(SemesterGrade).join(
+            Candidature, SemesterGrade.candidature_id == Candidature.id
+        ).where(
+            Candidature.candidat_id == student.user_id
+        ).order_by(SemesterGrade.semester_number, SemesterGrade.candidature_id)
+    )).scalars().all()
     
     # Calculate statistics
     global_avg = 0
@@ -242,6 +356,7 @@ async def get_student_grades(
         "semesters": [
             {
                 "id": g.id,
+                "candidature_id": g.candidature_id,
                 "semester_number": g.semester_number,
                 "academic_year": g.academic_year,
                 "average": g.average,
@@ -261,86 +376,104 @@ async def get_student_grades(
 
 @router.get("/statistics")
 async def get_statistics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_statistics_db),
     admin: User = Depends(check_admin)
 ):
     """
-    Get global statistics about students and grades
-    """
-    from sqlalchemy import func
-    from ..models import StudentProfile, SemesterGrade, ProfileStatus
-    
-    # Total students
-    total_students = db.query(StudentProfile).count()
-    
-    # Verified profiles
-    verified_profiles = db.query(StudentProfile).filter(
-        StudentProfile.profile_status == ProfileStatus.VERIFIED
-    ).count()
-    
-    # Students by diploma
-    by_diploma = db.query(
-        StudentProfile.current_diploma,
-        func.count(StudentProfile.id)
-    ).filter(
-        StudentProfile.current_diploma.isnot(None)
-    ).group_by(StudentProfile.current_diploma).all()
-    
-    # Average by diploma
-    avg_by_diploma = db.query(
-        StudentProfile.current_diploma,
-        func.avg(SemesterGrade.average)
-    ).join(
-        SemesterGrade, StudentProfile.id == SemesterGrade.student_profile_id
-    ).filter(
-        StudentProfile.current_diploma.isnot(None),
-        SemesterGrade.average.isnot(None)
-    ).group_by(StudentProfile.current_diploma).all()
+    Get global statistics about students, grades and candidatures
+
+    Read from the statistics tables, which are updated with every write:
+    the cost does not grow with the number of students or grades.
+    """
+    diplomas = (await db.execute(select(DiplomaStatistics))).scalars().all()
+    candidatures = (await db.execute(
+        select(CandidatureStatistics).where(CandidatureStatistics.candidatures_count > 0)
+    )).scalars().all()
+    
+    total_students = sum(d.students_count for d in diplomas)
+    verified_profiles = sum(d.verified_count for d in diplomas)
+    
+    candidatures_by_offre = {}
+    for c in candidatures:
+        candidatures_by_offre.setdefault(c.offre_id, {})[c.status] = c.candidatures_count
     
     return {
         "total_students": total_students,
         "verified_profiles": verified_profiles,
         "pending_verification": total_students - verified_profiles,
-        "students_by_diploma": {d: count for d, count in by_diploma} if by_diploma else {},
-        "average_by_diploma": {d: round(float(avg), 2) for d, avg in avg_by_diploma} if avg_by_diploma else {}
+        "students_by_diploma": {d.diploma: d.students_count for d in diplomas if d.diploma and d.students_count},
+        "average_by_diploma": {
+            d.diploma: round(d.grades_sum / d.grades_count, 2) for d in diplomas if d.grades_count
+        },
+        "candidatures_by_offre": candidatures_by_offre
     }
 
 
 # Candidature Management
 @router.get("/candidatures")
 async def get_all_candidatures(
+    response: Response,
     status_filter: str = None,
+    offre_id: Optional[int] = None,
+    min_average: Optional[float] = None,
+    sort: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(check_admin)
 ):
     """
     Get all candidatures for admin review
     Can filter by status: incomplete, submitted, in_review, accepted, rejected
+    
+    - **offre_id**: only the candidatures to one offre
+    - **min_average**: only candidatures whose average is at least this value
+    - **sort**: `average_desc` for the best averages first (pages then use skip/limit)
+    
+    A page is loaded in a single query: candidat and offre are joined in,
+    grade count and average are stored on the candidature. Pass the
+    X-Next-Cursor header of a page as **cursor** to get the next one.
     """
     from ..models.candidature import Candidature, CandidatureStatus
-    from ..models.semester_grade import SemesterGrade
     
-    query = db.query(Candidature)
+    sort_orders = {
+        "average_desc": [
+            Candidature.average_total.is_(None),  # Candidatures without grades last
+            Candidature.average_total.desc(),
+            Candidature.id
+        ]
+    }
+    if sort is not None and sort not in sort_orders:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sort. Must be one of: {', '.join(sort_orders)}"
+        )
+    
+    query = select(Candidature).options(
+        joinedload(Candidature.candidat),
+        joinedload(Candidature.offre)
+    )
     
     if status_filter:
         try:
             status_enum = CandidatureStatus(status_filter)
-            query = query.filter(Candidature.status == status_enum)
+            query = query.where(Candidature.status == status_enum)
         except ValueError:
             pass
+    if offre_id is not None:
+        query = query.where(Candidature.offre_id == offre_id)
+    if min_average is not None:
+        query = query.where(Candidature.average_total >= min_average)
     
-    candidatures = query.offset(skip).limit(limit).all()
+    cands = await paginate(
+        db, query, Candidature, response, skip, limit, cursor, include_total,
+        order_by=sort_orders.get(sort)
+    )
     
     result = []
-    for cand in candidatures:
-        grades = db.query(SemesterGrade).filter(
-            SemesterGrade.candidature_id == cand.id
-        ).all()
-        
-        avg_total = sum(g.average for g in grades if g.average) / len(grades) if grades else 0
-        
+    for cand in cands:
         result.append({
             "id": cand.id,
             "candidat_id": cand.candidat_id,
@@ -352,8 +485,8 @@ async def get_all_candidatures(
             "status": cand.status.value,
             "commentaire": cand.commentaire,
             "created_at": cand.created_at.isoformat() if cand.created_at else None,
-            "grades_count": len(grades),
-            "average_total": round(avg_total, 2) if avg_total > 0 else None,
+            "grades_count": cand.grades_count,
+            "average_total": round(cand.average_total, 2) if cand.average_total is not None else None,
             "cin_verification": cand.cin_data.get("verification") if cand.cin_data else None,
             "bac_verification": cand.bac_data.get("verification") if cand.bac_data else None
         })
@@ -361,12 +494,139 @@ async def get_all_candidatures(
     return result
 
 
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
+EXPORT_COLUMNS = (
+    "id", "candidat_id", "email", "nom", "prenom", "cne", "cin_number", "offre_id", "offre_titre",
+    "status", "created_at", "diploma_type", "grades_count", "average_total"
+)
+
+
+def _iter_export_rows(conditions, semesters: List[int], batch_size: int = 1000) -> Iterator[list]:
+    """
+    Yield one flat row per candidature: EXPORT_COLUMNS, then academic year
+    and average of each semester in semesters
+
+    A single query joins candidat, offre and grades; it is read through a
+    server-side cursor (yield_per) and grouped by candidature as rows
+    arrive, so memory does not grow with the number of candidatures.
+    Runs in its own session: the response is streamed after the request's
+    session has been released.
+    """
+    from ..models.candidature import Candidature
+    from ..models.semester_grade import SemesterGrade
+
+    query = select(
+        Candidature.id, Candidature.candidat_id, User.email, Candidature.nom, Candidature.prenom,
+        Candidature.cne, Candidature.cin_number, Candidature.offre_id, Offre.titre, Candidature.status,
+        Candidature.created_at, Candidature.grades_count, Candidature.average_total,
+        SemesterGrade.diploma_type, SemesterGrade.semester_number, SemesterGrade.academic_year,
+        SemesterGrade.average
+    ).outerjoin(
+        User, User.id == Candidature.candidat_id
+    ).outerjoin(
+        Offre, Offre.id == Candidature.offre_id
+    ).outerjoin(
+        SemesterGrade, SemesterGrade.candidature_id == Candidature.id
+    ).where(*conditions).order_by(
+        Candidature.id, SemesterGrade.semester_number
+    ).execution_options(yield_per=batch_size)
+
+    db = SessionLocal()
+    try:
+        for _, rows in groupby(db.execute(query), key=lambda row: row.id):
+            rows = list(rows)
+            first = rows[0]
+            grades = {row.semester_number: row for row in rows if row.semester_number is not None}
+
+            row = [
+                first.id, first.candidat_id, first.email, first.nom, first.prenom, first.cne,
+                first.cin_number, first.offre_id, first.titre, first.status, first.created_at,
+                first.diploma_type, first.grades_count,
+                round(first.average_total, 2) if first.average_total is not None else None
+            ]
+            for number in semesters:
+                grade = grades.get(number)
+                row += [grade.academic_year, grade.average] if grade else [None, None]
+            yield row
+    finally:
+        db.close()
+
+
+@router.get("/candidatures/export")
+async def export_candidatures(
+    format: str = "csv",
+    offre_id: Optional[int] = None,
+    status_filter: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(check_admin)
+):
+    """
+    Download candidatures with their grades as a spreadsheet
+
+    - **format**: `csv` (opens in Excel) or `ndjson` (one JSON object per line)
+    - **offre_id**: only the candidatures to one offre
+    - **status_filter**: only candidatures with this status
+
+    One row per candidature; grades are flattened into `s<n>_academic_year`
+    and `s<n>_average` columns, one pair per semester found. The file is
+    written while it is sent, in constant memory whatever the number of rows.
+    """
+    from ..models.candidature import Candidature, CandidatureStatus
+    from ..models.semester_grade import SemesterGrade
+
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format. Must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    conditions = []
+    if offre_id is not None:
+        if not await db.get(Offre, offre_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Offre not found"
+            )
+        conditions.append(Candidature.offre_id == offre_id)
+    if status_filter:
+        try:
+            conditions.append(Candidature.status == CandidatureStatus(status_filter))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status: {status_filter}. Must be one of: {', '.join(s.value for s in CandidatureStatus)}"
+            )
+
+    # Grade columns are known before the first row is written
+    semesters = (await db.execute(
+        select(SemesterGrade.semester_number).distinct().join(
+            Candidature, Candidature.id == SemesterGrade.candidature_id
+        ).where(*conditions).order_by(SemesterGrade.semester_number)
+    )).scalars().all()
+
+    columns = list(EXPORT_COLUMNS)
+    for number in semesters:
+        columns += [f"s{number}_academic_year", f"s{number}_average"]
+
+    writer, media_type = EXPORT_FORMATS[format]
+    filename = f"candidatures-offre-{offre_id}" if offre_id is not None else "candidatures"
+
+    return StreamingResponse(
+        writer(columns, _iter_export_rows(conditions, list(semesters))),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
+
+
 @router.put("/candidatures/{candidature_id}/status")
 async def update_candidature_status(
     candidature_id: int,
     new_status: str,
     commentaire: str = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(check_admin)
 ):
     """
@@ -375,7 +635,7 @@ async def update_candidature_status(
     """
     from ..models.candidature import Candidature, CandidatureStatus
     
-    candidature = db.query(Candidature).filter(Candidature.id == candidature_id).first()
+    candidature = await db.get(Candidature, candidature_id)
     
     if not candidature:
         raise HTTPException(
@@ -396,8 +656,8 @@ async def update_candidature_status(
         candidature.commentaire = commentaire
     candidature.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(candidature)
+    await db.commit()
+    await db.refresh(candidature)
     
     return {
         "message": f"Candidature {new_status}",
@@ -410,7 +670,7 @@ async def update_candidature_status(
 @router.get("/candidatures/{candidature_id}")
 async def get_candidature_details(
     candidature_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(check_admin)
 ):
     """
@@ -419,7 +679,12 @@ async def get_candidature_details(
     from ..models.candidature import Candidature
     from ..models.semester_grade import SemesterGrade
     
-    candidature = db.query(Candidature).filter(Candidature.id == candidature_id).first()
+    candidature = (await db.execute(
+        select(Candidature).options(
+            joinedload(Candidature.candidat),
+            joinedload(Candidature.offre)
+        ).where(Candidature.id == candidature_id)
+    )).scalars().first()
     
     if not candidature:
         raise HTTPException(
@@ -427,9 +692,13 @@ async def get_candidature_details(
             detail="Candidature not found"
         )
     
-    grades = db.query(SemesterGrade).filter(
-        SemesterGrade.candidature_id == candidature_id
-    ).order_by(SemesterGrade.semester_number).all()
+    grades = (await db.execute(
+        select(SemesterGrade).where(
+            SemesterGrade.candidature_id == candidature_id
+        ).order_by(SemesterGrade.semester_number)
+    )).scalars().all()
+    
+    documents = await document_store.references_for_async(db, "candidature", candidature.id)
     
     return {
         "id": candidature.id,
@@ -460,5 +729,282 @@ async def get_candidature_details(
         "verification": {
             "cin": candidature.cin_data.get("verification") if candidature.cin_data else None,
             "bac": candidature.bac_data.get("verification") if candidature.bac_data else None
+        },
+        "documents": {
+            "cin": _document_links(documents.get("cin_image_path")),
+            "bac": _document_links(documents.get("bac_image_path"))
+        }
+    }
+
+
+@router.get("/candidatures/{candidature_id}/ocr")
+async def get_candidature_ocr(
+    candidature_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(check_admin)
+):
+    """
+    Get the full OCR results of a candidature's documents, extracted text included
+    
+    Candidature rows only keep the verified fields; the rest is read
+    (and decompressed) here, on demand.
+    """
+    from ..models.candidature import Candidature
+    
+    candidature = await db.get(Candidature, candidature_id)
+    
+    if not candidature:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidature not found"
+        )
+    
+    ocr = (await document_results.load_async(db, "candidature", [candidature.id])).get(candidature.id, {})
+    
+    return {
+        "candidature_id": candidature.id,
+        "cin": document_results.merge(candidature.cin_data, ocr.get("cin_data")),
+        "bac": document_results.merge(candidature.bac_data, ocr.get("bac_data"))
+    }
+
+
+def _dossier_folder(candidature) -> str:
+    """Archive folder of a candidature: <id>_<NOM>_<Prenom>, safe for every OS"""
+    name = re.sub(r"[^\w.-]+", "_", f"{candidature.nom}_{candidature.prenom}").strip("_")
+    return f"{candidature.id}_{name}"
+
+
+def _iter_dossier_entries(offre_id: int, batch_size: int = 200) -> Iterator[ZipEntry]:
+    """
+    Yield the archive members of every candidature of an offre
+
+    Candidatures are read in batches by id (keyset) with their profiles in a
+    single query per batch, so memory does not grow with the offre size.
+    Runs in its own session: the response is streamed after the request's
+    session has been released.
+    """
+    from ..models.candidature import Candidature
+    from ..models.student_profile import StudentProfile
+
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            candidatures = db.query(Candidature).filter(
+                Candidature.offre_id == offre_id,
+                Candidature.id > last_id
+            ).order_by(Candidature.id).limit(batch_size).all()
+
+            if not candidatures:
+                break
+            last_id = candidatures[-1].id
+
+            profiles = {
+                profile.user_id: profile
+                for profile in db.query(StudentProfile).filter(
+                    StudentProfile.user_id.in_({c.candidat_id for c in candidatures})
+                ).all()
+            }
+            # Full OCR output (extracted text) of the batch, one query per owner type
+            candidature_ocr = document_results.load(db, "candidature", [c.id for c in candidatures])
+            profile_ocr = document_results.load(db, "student_profile", [p.id for p in profiles.values()])
+
+            for candidature in candidatures:
+                folder = _dossier_folder(candidature)
+                profile = profiles.get(candidature.candidat_id)
+                ocr = candidature_ocr.get(candidature.id, {})
+                documents = {
+                    "cin": candidature.cin_image_path,
+                    "bac": candidature.bac_image_path,
+                    "releve_notes": profile.releve_notes_path if profile else None
+                }
+
+                for label, path in documents.items():
+                    if path:
+                        yield f"{folder}/{label}{os.path.splitext(path)[1]}", path
+
+                verification = {
+                    "candidature_id": candidature.id,
+                    "nom": candidature.nom,
+                    "prenom": candidature.prenom,
+                    "status": candidature.status.value,
+                    "created_at": candidature.created_at.isoformat() if candidature.created_at else None,
+                    "cin": document_results.merge(candidature.cin_data, ocr.get("cin_data")),
+                    "bac": document_results.merge(candidature.bac_data, ocr.get("bac_data")),
+                    "releve_notes": document_results.merge(
+                        profile.releve_data, profile_ocr.get(profile.id, {}).get("releve_data")
+                    ) if profile else None,
+                    "missing_documents": [
+                        label for label, path in documents.items() if not path or not os.path.exists(path)
+                    ]
+                }
+                yield f"{folder}/verification.json", json.dumps(
+                    verification, ensure_ascii=False, indent=2, default=str
+                ).encode("utf-8")
+
+            # Objects of the batch are not needed anymore
+            db.expunge_all()
+    finally:
+        db.close()
+
+
+@router.get("/offres/{offre_id}/dossiers.zip")
+async def export_offre_dossiers(
+    offre_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(check_admin)
+):
+    """
+    Download every dossier of an offre as a single ZIP archive
+
+    One folder per candidature with the CIN, Baccalauréat and relevé de notes
+    files plus verification.json (OCR results). The archive is built while
+    it is sent: no temporary file, constant memory whatever the offre size.
+    """
+    offre = await db.get(Offre, offre_id)
+
+    if not offre:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Offre not found"
+        )
+
+    return StreamingResponse(
+        stream_zip(_iter_dossier_entries(offre_id)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="offre-{offre_id}-dossiers.zip"'}
+    )
+
+
+@router.get("/archive/campaigns")
+async def get_archived_campaigns(
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(check_admin)
+):
+    """Campaigns in the archive, with their number of candidatures per status"""
+    rows = (await db.execute(
+        select(
+            ArchivedCandidature.campaign,
+            ArchivedCandidature.status,
+            func.count(ArchivedCandidature.id)
+        ).group_by(ArchivedCandidature.campaign, ArchivedCandidature.status)
+    )).all()
+    
+    campaigns = {}
+    for campaign, candidature_status, count in rows:
+        counts = campaigns.setdefault(campaign, {"campaign": campaign, "candidatures": 0})
+        counts[candidature_status] = count
+        counts["candidatures"] += count
+    
+    return sorted(campaigns.values(), key=lambda counts: counts["campaign"], reverse=True)
+
+
+@router.get("/archive/candidatures")
+async def get_archived_candidatures(
+    response: Response,
+    campaign: Optional[str] = None,
+    offre_id: Optional[int] = None,
+    status_filter: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(check_admin)
+):
+    """
+    Get the archived candidatures of past campaigns (read only)
+    
+    - **campaign**: academic year, e.g. 2024-2025
+    - **offre_id**, **status_filter** (accepted, rejected): as for /admin/candidatures
+    
+    Pass the X-Next-Cursor header of a page as **cursor** to get the next one.
+    """
+    query = select(ArchivedCandidature)
+    if campaign is not None:
+        query = query.where(ArchivedCandidature.campaign == campaign)
+    if offre_id is not None:
+        query = query.where(ArchivedCandidature.offre_id == offre_id)
+    if status_filter:
+        query = query.where(ArchivedCandidature.status == status_filter)
+    
+    cands = await paginate(db, query, ArchivedCandidature, response, skip, limit, cursor, include_total)
+    
+    return [{
+        "id": cand.id,
+        "original_id": cand.original_id,
+        "campaign": cand.campaign,
+        "candidat_id": cand.candidat_id,
+        "candidat_nom": cand.nom,
+        "candidat_prenom": cand.prenom,
+        "cne": cand.cne,
+        "offre_id": cand.offre_id,
+        "offre_titre": cand.offre_titre,
+        "status": cand.status,
+        "commentaire": cand.commentaire,
+        "created_at": cand.created_at.isoformat() if cand.created_at else None,
+        "archived_at": cand.archived_at.isoformat(),
+        "grades_count": cand.grades_count,
+        "average_total": round(cand.average_total, 2) if cand.average_total is not None else None
+    } for cand in cands]
+
+
+@router.get("/archive/candidatures/{candidature_id}")
+async def get_archived_candidature(
+    candidature_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(check_admin)
+):
+    """Get an archived candidature with its grades, documents and full OCR results"""
+    candidature = (await db.execute(
+        select(ArchivedCandidature).options(
+            selectinload(ArchivedCandidature.semester_grades)
+        ).where(ArchivedCandidature.id == candidature_id)
+    )).scalars().first()
+    
+    if not candidature:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived candidature not found"
+        )
+    
+    documents = await document_store.references_for_async(db, ARCHIVED_OWNER_TYPE, candidature.id)
+    ocr = (await document_results.load_async(db, ARCHIVED_OWNER_TYPE, [candidature.id])).get(candidature.id, {})
+    
+    return {
+        "id": candidature.id,
+        "original_id": candidature.original_id,
+        "campaign": candidature.campaign,
+        "candidat": {
+            "id": candidature.candidat_id,
+            "nom": candidature.nom,
+            "prenom": candidature.prenom,
+            "telephone": candidature.telephone,
+            "date_naissance": candidature.date_naissance,
+            "cne": candidature.cne,
+            "cin_number": candidature.cin_number
+        },
+        "offre": {
+            "id": candidature.offre_id,
+            "titre": candidature.offre_titre
+        },
+        "status": candidature.status,
+        "commentaire": candidature.commentaire,
+        "created_at": candidature.created_at.isoformat() if candidature.created_at else None,
+        "archived_at": candidature.archived_at.isoformat(),
+        "grades": [{
+            "id": g.id,
+            "semester_number": g.semester_number,
+            "average": g.average,
+            "academic_year": g.academic_year,
+            "diploma_type": g.diploma_type
+        } for g in candidature.semester_grades],
+        "ocr": {
+            "cin": document_results.merge(candidature.cin_data, ocr.get("cin_data")),
+            "bac": document_results.merge(candidature.bac_data, ocr.get("bac_data"))
+        },
+        "documents": {
+            "cin": _document_links(documents.get("cin_image_path")),
+            "bac": _document_links(documents.get("bac_image_path"))
         }
     }
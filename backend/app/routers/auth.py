@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import timedelta
 from ..database import get_db
 from ..models import User
@@ -17,7 +19,7 @@ settings = get_settings()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Register a new user
     
@@ -27,9 +29,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     - **role**: User role (candidat, recruteur, admin)
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    existing_user = (await db.execute(
+        select(User).where((User.email == user_data.email) | (User.username == user_data.username))
+    )).scalars().first()
     
     if existing_user:
         if existing_user.email == user_data.email:
@@ -43,8 +45,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
                 detail="Username already taken"
             )
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    # Create new user (hashing is CPU-bound: keep it off the event loop)
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -53,8 +55,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
@@ -63,7 +65,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 async def login(
     username: str = Form(),  # Email will be sent as username
     password: str = Form(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Login with email and password to get JWT token
@@ -72,9 +74,9 @@ async def login(
     - **password**: User password
     """
     # Find user by email
-    user = db.query(User).filter(User.email == username).first()
+    user = (await db.execute(select(User).where(User.email == username))).scalars().first()
     
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await run_in_threadpool(verify_password, password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -1,22 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import os
-import shutil
-from datetime import datetime
-from ..database import get_db
+from starlette.concurrency import run_in_threadpool
+from ..database import get_db, get_read_db
 from ..models import Candidature, User, Offre, UserRole, OffreStatus
 from ..schemas import CandidatureCreate, CandidatureResponse, OCRVerifyResponse
-from ..utils import get_current_user, ocr_service
+from ..utils import get_current_user, ocr_service, document_store, document_results, upload_validator
+from ..utils.document_transcoder import transcode_documents_task
+from .uploads import resolve_document
 
 router = APIRouter(prefix="/candidatures", tags=["Candidatures"])
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 
 @router.post("/", response_model=CandidatureResponse, status_code=status.HTTP_201_CREATED)
 async def submit_candidature(
+    background_tasks: BackgroundTasks,
     offre_id: int = Form(...),
     nom: str = Form(...),
     prenom: str = Form(...),
@@ -24,14 +24,19 @@ async def submit_candidature(
     telephone: Optional[str] = Form(None),
     cne: str = Form(...),
     mention: str = Form(...),
-    cin_image: UploadFile = File(...),
-    bac_image: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    cin_image: Optional[UploadFile] = File(None),
+    bac_image: Optional[UploadFile] = File(None),
+    cin_image_upload_id: Optional[str] = Form(None),
+    bac_image_upload_id: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Submit a candidature (CANDIDAT only)
     Upload CIN and Baccalauréat images for OCR verification
+    
+    Each document is sent either as a file (cin_image, bac_image) or as the id
+    of a finalized resumable upload (cin_image_upload_id, bac_image_upload_id)
     """
     try:
         if current_user.role != UserRole.CANDIDAT:
@@ -41,7 +46,7 @@ async def submit_candidature(
             )
         
         # Check if offre exists and is validated
-        offre = db.query(Offre).filter(Offre.id == offre_id).first()
+        offre = await db.get(Offre, offre_id)
         if not offre:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -55,10 +60,12 @@ async def submit_candidature(
             )
         
         # Check if already applied
-        existing = db.query(Candidature).filter(
-            Candidature.candidat_id == current_user.id,
-            Candidature.offre_id == offre_id
-        ).first()
+        existing = (await db.execute(
+            select(Candidature).where(
+                Candidature.candidat_id == current_user.id,
+                Candidature.offre_id == offre_id
+            )
+        )).scalars().first()
         
         if existing:
             raise HTTPException(
@@ -66,23 +73,16 @@ async def submit_candidature(
                 detail="You have already applied to this offre"
             )
         
-        # Save uploaded files
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        cin_filename = f"cin_{current_user.id}_{timestamp}_{cin_image.filename}"
-        bac_filename = f"bac_{current_user.id}_{timestamp}_{bac_image.filename}"
-        
-        cin_path = os.path.join(UPLOAD_DIR, cin_filename)
-        bac_path = os.path.join(UPLOAD_DIR, bac_filename)
+        # Save uploaded files in the content-addressed store (deduplicated)
+        cin_blob = await resolve_document(db, current_user, cin_image, cin_image_upload_id, "cin_image")
+        bac_blob = await resolve_document(db, current_user, bac_image, bac_image_upload_id, "bac_image")
         
-        with open(cin_path, "wb") as buffer:
-            shutil.copyfileobj(cin_image.file, buffer)
-        
-        with open(bac_path, "wb") as buffer:
-            shutil.copyfileobj(bac_image.file, buffer)
+        cin_path = cin_blob.path
+        bac_path = bac_blob.path
         
         # Perform OCR verification
-        cin_ocr_result = ocr_service.verify_cin(cin_path)
-        bac_ocr_result = ocr_service.verify_baccalaureat(bac_path)
+        cin_ocr_result = await run_in_threadpool(ocr_service.verify_cin, cin_path)
+        bac_ocr_result = await run_in_threadpool(ocr_service.verify_baccalaureat, bac_path)
         
         # Perform verification comparison
         verification_result = ocr_service.verify_candidature_data(
@@ -147,6 +147,10 @@ async def submit_candidature(
                 )
         
         # Create candidature with verification results (only if verification passed)
+        ocr_results = {
+            "cin_data": {**cin_ocr_result, "verification": verification_result.get("cin_verification")},
+            "bac_data": {**bac_ocr_result, "verification": verification_result.get("bac_verification")}
+        }
         new_candidature = Candidature(
             candidat_id=current_user.id,
             offre_id=offre_id,
@@ -154,19 +158,38 @@ async def submit_candidature(
             prenom=prenom,
             date_naissance=date_naissance,
             telephone=telephone,
+            cne=cne,  # As typed; searched as the CNE read on the baccalauréat, if any
             cin_image_path=cin_path,
             bac_image_path=bac_path,
-            cin_data={**cin_ocr_result, "verification": verification_result.get("cin_verification")},
-            bac_data={**bac_ocr_result, "verification": verification_result.get("bac_verification")}
+            # Verified fields and verification only, the extracted text goes to document_results
+            cin_data=document_results.compact(ocr_results["cin_data"]),
+            bac_data=document_results.compact(ocr_results["bac_data"])
         )
         
         db.add(new_candidature)
-        db.commit()
-        db.refresh(new_candidature)
+        await db.flush()
+        
+        await document_store.attach_async(db, cin_blob, "candidature", new_candidature.id, "cin_image_path")
+        await document_store.attach_async(db, bac_blob, "candidature", new_candidature.id, "bac_image_path")
+        await document_results.save_async(db, "candidature", new_candidature.id, ocr_results)
+        
+        await db.commit()
+        await db.refresh(new_candidature)
+        
+        # OCR is done: re-encode the documents for storage and prepare the
+        # admin review renditions once the response is sent
+        background_tasks.add_task(transcode_documents_task, "candidature", new_candidature.id)
         
         return new_candidature
     except HTTPException:
         raise
+    except IntegrityError:
+        # Concurrent submission: the unique index on (candidat_id, offre_id) kept the first one
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already applied to this offre"
+        )
     except Exception as e:
         print(f"Error submitting candidature: {str(e)}")
         raise HTTPException(
@@ -183,40 +206,32 @@ async def verify_document(
 ):
     """
     Verify a single document using OCR (for testing purposes)
+    The document is decoded and OCR'd in memory, nothing is written to uploads/
     
     - **document_type**: Either "cin" or "bac"
     """
-    # Save temporary file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    temp_filename = f"temp_{document_type}_{current_user.id}_{timestamp}_{document.filename}"
-    temp_path = os.path.join(UPLOAD_DIR, temp_filename)
-    
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(document.file, buffer)
+    verifiers = {
+        "cin": ocr_service.verify_cin,
+        "bac": ocr_service.verify_baccalaureat
+    }
+    verify = verifiers.get(document_type.lower())
     
-    # Perform OCR based on document type
-    if document_type.lower() == "cin":
-        result = ocr_service.verify_cin(temp_path)
-    elif document_type.lower() == "bac":
-        result = ocr_service.verify_baccalaureat(temp_path)
-    else:
+    if not verify:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid document_type. Must be 'cin' or 'bac'"
         )
     
-    # Clean up temporary file
-    try:
-        os.remove(temp_path)
-    except:
-        pass
+    contents = await document.read()
+    await run_in_threadpool(upload_validator.validate, contents, "document")
+    result = await run_in_threadpool(verify, contents)
     
     return OCRVerifyResponse(**result)
 
 
 @router.get("/me", response_model=List[CandidatureResponse])
 async def get_my_candidatures(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -228,9 +243,9 @@ async def get_my_candidatures(
             detail="Only candidates can view their candidatures"
         )
     
-    candidatures = db.query(Candidature).filter(
-        Candidature.candidat_id == current_user.id
-    ).all()
+    candidatures = (await db.execute(
+        select(Candidature).where(Candidature.candidat_id == current_user.id)
+    )).scalars().all()
     
     return candidatures
 
@@ -238,7 +253,7 @@ async def get_my_candidatures(
 @router.get("/offre/{offre_id}", response_model=List[CandidatureResponse])
 async def get_candidatures_for_offre(
     offre_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -246,7 +261,7 @@ async def get_candidatures_for_offre(
     RECRUTEUR: Only for their own offres
     ADMIN: For all offres
     """
-    offre = db.query(Offre).filter(Offre.id == offre_id).first()
+    offre = await db.get(Offre, offre_id)
     
     if not offre:
         raise HTTPException(
@@ -255,7 +270,7 @@ async def get_candidatures_for_offre(
         )
     
     # Check permissions
-    if current_user.role == UserRole.RECRUTEUR and offre.recruteur_id != current_user.id:
+    if current_user.role == UserRole.RECRUTEUR and offre.admin_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only view candidatures for your own offres"
@@ -267,8 +282,8 @@ async def get_candidatures_for_offre(
             detail="Candidates cannot view other candidatures"
         )
     
-    candidatures = db.query(Candidature).filter(
-        Candidature.offre_id == offre_id
-    ).all()
+    candidatures = (await db.execute(
+        select(Candidature).where(Candidature.offre_id == offre_id)
+    )).scalars().all()
     
     return candidatures
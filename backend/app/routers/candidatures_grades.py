@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 from typing import List
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.user import User
 from ..models.candidature import Candidature, CandidatureStatus
 from ..models.semester_grade import SemesterGrade, DiplomaType
+from ..schemas import CandidatureDashboardResponse, SemesterGradeCreate
 from ..utils.dependencies import get_current_user, require_role
 from ..models.user import UserRole
 from datetime import datetime
@@ -12,13 +16,15 @@ from datetime import datetime
 router = APIRouter(prefix="/candidatures", tags=["candidatures-grades"])
 
 
-@router.get("/my-candidatures")
+@router.get("/my-candidatures", response_model=List[CandidatureDashboardResponse])
 async def get_my_candidatures(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all candidatures for the current user
+    
+    Candidatures, offre titles and grades come back in a single query.
     """
     if current_user.role != UserRole.CANDIDAT:
         raise HTTPException(
@@ -26,35 +32,20 @@ async def get_my_candidatures(
             detail="Only candidates can view their candidatures"
         )
     
-    candidatures = db.query(Candidature).filter(
-        Candidature.candidat_id == current_user.id
-    ).all()
-    
-    result = []
-    for cand in candidatures:
-        grades = db.query(SemesterGrade).filter(
-            SemesterGrade.candidature_id == cand.id
-        ).all()
-        
-        result.append({
-            "id": cand.id,
-            "offre_id": cand.offre_id,
-            "offre_titre": cand.offre.titre if cand.offre else None,
-            "nom": cand.nom,
-            "prenom": cand.prenom,
-            "status": cand.status.value,
-            "commentaire": cand.commentaire,
-            "created_at": cand.created_at.isoformat() if cand.created_at else None,
-            "grades_count": len(grades),
-            "grades": [{
-                "id": g.id,
-                "semester_number": g.semester_number,
-                "average": g.average,
-                "academic_year": g.academic_year
-            } for g in grades]
-        })
-    
-    return result
+    candidatures = (await db.execute(
+        select(Candidature).outerjoin(
+            Candidature.offre
+        ).outerjoin(
+            Candidature.semester_grades
+        ).options(
+            contains_eager(Candidature.offre),
+            contains_eager(Candidature.semester_grades)
+        ).where(
+            Candidature.candidat_id == current_user.id
+        ).order_by(Candidature.id, SemesterGrade.semester_number)
+    )).unique().scalars().all()
+    
+    return candidatures
 
 
 @router.post("/{candidature_id}/grades")
@@ -64,17 +55,19 @@ async def add_semester_grade(
     diploma_type: str,
     academic_year: str,
     average: float,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Add a semester grade to a candidature
     """
     # Check candidature exists and belongs to user
-    candidature = db.query(Candidature).filter(
-        Candidature.id == candidature_id,
-        Candidature.candidat_id == current_user.id
-    ).first()
+    candidature = (await db.execute(
+        select(Candidature).where(
+            Candidature.id == candidature_id,
+            Candidature.candidat_id == current_user.id
+        )
+    )).scalars().first()
     
     if not candidature:
         raise HTTPException(
@@ -83,10 +76,12 @@ async def add_semester_grade(
         )
     
     # Check if grade already exists for this semester
-    existing = db.query(SemesterGrade).filter(
-        SemesterGrade.candidature_id == candidature_id,
-        SemesterGrade.semester_number == semester_number
-    ).first()
+    existing = (await db.execute(
+        select(SemesterGrade).where(
+            SemesterGrade.candidature_id == candidature_id,
+            SemesterGrade.semester_number == semester_number
+        )
+    )).scalars().first()
     
     if existing:
         # Update existing
@@ -104,25 +99,109 @@ async def add_semester_grade(
         )
         db.add(new_grade)
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Grade added successfully"}
 
 
+@router.post("/{candidature_id}/grades/bulk")
+async def save_semester_grades(
+    candidature_id: int,
+    grades: List[SemesterGradeCreate] = Body(..., min_length=1, max_length=20),
+    submit: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add or update several semester grades of a candidature at once
+    
+    Each semester is created, or updated if the candidature already has it.
+    Everything is saved in a single transaction: either all grades are
+    saved or none.
+    
+    - **submit**: also mark the candidature as submitted (INCOMPLETE -> SUBMITTED)
+    """
+    semesters = [grade.semester_number for grade in grades]
+    if len(set(semesters)) != len(semesters):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each semester can only appear once"
+        )
+    
+    candidature = (await db.execute(
+        select(Candidature).where(
+            Candidature.id == candidature_id,
+            Candidature.candidat_id == current_user.id
+        )
+    )).scalars().first()
+    
+    if not candidature:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidature not found"
+        )
+    
+    existing = {
+        grade.semester_number: grade
+        for grade in (await db.execute(
+            select(SemesterGrade).where(
+                SemesterGrade.candidature_id == candidature_id,
+                SemesterGrade.semester_number.in_(semesters)
+            )
+        )).scalars()
+    }
+    
+    created = 0
+    for grade in grades:
+        row = existing.get(grade.semester_number)
+        if row is None:
+            row = SemesterGrade(candidature_id=candidature_id, semester_number=grade.semester_number)
+            db.add(row)
+            created += 1
+        row.diploma_type = grade.diploma_type
+        row.academic_year = grade.academic_year
+        row.average = grade.average
+        row.grades_detail = grade.grades_detail
+        row.updated_at = datetime.utcnow()
+    
+    if submit and candidature.status == CandidatureStatus.INCOMPLETE:
+        candidature.status = CandidatureStatus.SUBMITTED
+        candidature.updated_at = datetime.utcnow()
+    
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another request added one of these semesters meanwhile
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Grades were modified by another request, please retry"
+        )
+    
+    return {
+        "message": "Grades saved successfully",
+        "created": created,
+        "updated": len(grades) - created,
+        "status": candidature.status.value
+    }
+
+
 @router.post("/{candidature_id}/submit-grades")
 async def submit_grades(
     candidature_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Mark candidature as submitted after filling all grades
     Changes status from INCOMPLETE to SUBMITTED
     """
-    candidature = db.query(Candidature).filter(
-        Candidature.id == candidature_id,
-        Candidature.candidat_id == current_user.id
-    ).first()
+    candidature = (await db.execute(
+        select(Candidature).where(
+            Candidature.id == candidature_id,
+            Candidature.candidat_id == current_user.id
+        )
+    )).scalars().first()
     
     if not candidature:
         raise HTTPException(
@@ -131,9 +210,11 @@ async def submit_grades(
         )
     
     # Check if there are grades
-    grades_count = db.query(SemesterGrade).filter(
-        SemesterGrade.candidature_id == candidature_id
-    ).count()
+    grades_count = (await db.execute(
+        select(func.count(SemesterGrade.id)).where(
+            SemesterGrade.candidature_id == candidature_id
+        )
+    )).scalar_one()
     
     if grades_count == 0:
         raise HTTPException(
@@ -145,7 +226,7 @@ async def submit_grades(
     if candidature.status == CandidatureStatus.INCOMPLETE:
         candidature.status = CandidatureStatus.SUBMITTED
         candidature.updated_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
     
     return {"message": "Candidature soumise avec succès", "status": candidature.status.value}
 
@@ -153,11 +234,11 @@ async def submit_grades(
 @router.delete("/grades/{grade_id}")
 async def delete_grade(
     grade_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a semester grade"""
-    grade = db.query(SemesterGrade).filter(SemesterGrade.id == grade_id).first()
+    grade = await db.get(SemesterGrade, grade_id)
     
     if not grade:
         raise HTTPException(
@@ -166,10 +247,12 @@ async def delete_grade(
         )
     
     # Check ownership
-    candidature = db.query(Candidature).filter(
-        Candidature.id == grade.candidature_id,
-        Candidature.candidat_id == current_user.id
-    ).first()
+    candidature = (await db.execute(
+        select(Candidature).where(
+            Candidature.id == grade.candidature_id,
+            Candidature.candidat_id == current_user.id
+        )
+    )).scalars().first()
     
     if not candidature:
         raise HTTPException(
@@ -177,7 +260,7 @@ async def delete_grade(
             detail="Not authorized"
         )
     
-    db.delete(grade)
-    db.commit()
+    await db.delete(grade)
+    await db.commit()
     
     return {"message": "Grade deleted"}
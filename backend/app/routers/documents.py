@@ -0,0 +1,251 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Tuple
+import os
+import re
+from ..config import get_settings
+from ..database import get_db
+from ..models import User, UserRole, Candidature, Offre, StudentProfile, DocumentBlob, DocumentReference
+from ..utils import get_current_user
+from ..utils.image_derivatives import derivative_service, VARIANTS
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+settings = get_settings()
+
+UPLOAD_ROOT = "uploads"
+CHUNK_SIZE = 64 * 1024
+
+# Blobs are content-addressed: a given URL always returns the same bytes
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" Range header
+
+    Returns:
+        Inclusive (start, end) offsets, or None to send the whole file.
+        Multiple ranges are not supported and fall back to the whole file.
+
+    Raises:
+        HTTPException 416 if the range cannot be satisfied
+    """
+    if not range_header:
+        return None
+
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    elif end:
+        # Suffix range: the last N bytes
+        start = max(size - int(end), 0)
+        end = size - 1
+    else:
+        return None
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int):
+    """Yield the bytes of a file between two inclusive offsets"""
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def send_document(request: Request, path: str, media_type: str, etag: str) -> Response:
+    """
+    Send a stored file with immutable caching, conditional and Range requests
+
+    With DOCUMENT_DELIVERY set to x-accel-redirect or x-sendfile, only the
+    headers are produced and the fronting proxy streams the bytes (and
+    handles Range itself), so API workers are not tied up by transfers.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes"
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document file is missing"
+        )
+
+    if settings.document_delivery == "x-accel-redirect":
+        relative_path = os.path.relpath(path, UPLOAD_ROOT).replace(os.sep, "/")
+        headers["X-Accel-Redirect"] = f"{settings.document_accel_prefix.rstrip('/')}/{relative_path}"
+        return Response(media_type=media_type, headers=headers)
+
+    if settings.document_delivery == "x-sendfile":
+        headers["X-Sendfile"] = os.path.abspath(path)
+        return Response(media_type=media_type, headers=headers)
+
+    size = os.path.getsize(path)
+
+    # If-Range: only honour the range when the client's copy is current
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if not if_range or if_range == etag:
+        byte_range = parse_range(request.headers.get("range"), size)
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+def can_read_documents_of(current_user: User):
+    """
+    Condition on a DocumentReference (candidature and profile joined) for
+    the documents a user may read besides ADMIN, who reads them all:
+    - the documents of their own candidatures and profile
+    - RECRUTEUR: the documents of the candidatures to their offres, the
+      candidatures GET /candidatures/offre/{id} lists to them
+    """
+    conditions = [Candidature.candidat_id == current_user.id, StudentProfile.user_id == current_user.id]
+    if current_user.role == UserRole.RECRUTEUR:
+        conditions.append(Offre.admin_id == current_user.id)
+    return or_(*conditions)
+
+
+async def get_accessible_blob(sha256: str, db: AsyncSession, current_user: User) -> DocumentBlob:
+    """
+    Load a blob the current user may read (see can_read_documents_of)
+
+    Unknown and forbidden blobs both answer 404 so document hashes cannot
+    be probed.
+    """
+    not_found = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Document not found"
+    )
+
+    blob = await db.get(DocumentBlob, sha256)
+    if not blob:
+        raise not_found
+
+    if current_user.role == UserRole.ADMIN:
+        return blob
+
+    readable = (await db.execute(
+        select(DocumentReference.id).outerjoin(
+            Candidature,
+            and_(DocumentReference.owner_type == "candidature", Candidature.id == DocumentReference.owner_id)
+        ).outerjoin(
+            Offre, Offre.id == Candidature.offre_id
+        ).outerjoin(
+            StudentProfile,
+            and_(DocumentReference.owner_type == "student_profile", StudentProfile.id == DocumentReference.owner_id)
+        ).where(
+            DocumentReference.blob_sha256 == sha256,
+            can_read_documents_of(current_user)
+        ).limit(1)
+    )).first()
+
+    if not readable:
+        raise not_found
+
+    return blob
+
+
+@router.get("/{sha256}")
+async def get_document(
+    sha256: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download an original document
+
+    Supports If-None-Match (304) and single Range requests (206).
+    """
+    blob = await get_accessible_blob(sha256, db, current_user)
+    return send_document(
+        request,
+        blob.path,
+        blob.content_type or "application/octet-stream",
+        f'"{blob.sha256}"'
+    )
+
+
+@router.get("/{sha256}/{variant}")
+async def get_document_derivative(
+    sha256: str,
+    variant: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a resized rendition of a document (thumbnail or review size)
+
+    Renditions are generated on first access and cached on disk.
+    """
+    if variant not in VARIANTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown variant. Must be one of: {', '.join(VARIANTS)}"
+        )
+
+    blob = await get_accessible_blob(sha256, db, current_user)
+    etag = derivative_service.etag(blob.sha256, variant)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        )
+
+    path = await run_in_threadpool(derivative_service.get_or_create, blob.sha256, blob.path, variant)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No preview available for this document"
+        )
+
+    return send_document(request, path, derivative_service.media_type, etag)
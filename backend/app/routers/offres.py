@@ -1,43 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_db, get_read_db
 from ..models import Offre, User, UserRole, OffreStatus
-from ..schemas import OffreCreate, OffreUpdate, OffreResponse
+from ..schemas import OffreCreate, OffreUpdate, OffreResponse, OffreSearchResult
 from ..utils import get_current_user
+from ..utils.offre_search import search_offres
+from ..utils.pagination import paginate
 
 router = APIRouter(prefix="/offres", tags=["Offres"])
 
 
 @router.get("/", response_model=List[OffreResponse])
 async def get_offres(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get list of offres.
     ADMIN sees all.
     CANDIDAT sees only VALIDATED offers.
+    
+    Pass the X-Next-Cursor header of a page as **cursor** to get the next one.
     """
-    query = db.query(Offre)
+    query = select(Offre)
     
     if current_user.role == UserRole.CANDIDAT:
-        query = query.filter(Offre.status == OffreStatus.VALIDATED)
+        query = query.where(Offre.status == OffreStatus.VALIDATED)
     
-    offres = query.offset(skip).limit(limit).all()
+    offres = await paginate(db, query, Offre, response, skip, limit, cursor, include_total)
     return offres
 
 
+@router.get("/search", response_model=List[OffreSearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search offres by words of their title, description and conditions.
+    Accents and case are ignored, the end of a word can be left out.
+    Best matches first, each with a **snippet** of the matching text.
+    CANDIDAT only finds VALIDATED offers.
+    """
+    results = await search_offres(db, q, current_user.role == UserRole.CANDIDAT, skip, limit)
+    return [
+        OffreSearchResult(**OffreResponse.model_validate(offre).model_dump(), score=score, snippet=snippet)
+        for offre, score, snippet in results
+    ]
+
+
 @router.get("/{offre_id}", response_model=OffreResponse)
 async def get_offre(
     offre_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get details of a specific offre"""
-    offre = db.query(Offre).filter(Offre.id == offre_id).first()
+    offre = await db.get(Offre, offre_id)
     
     if not offre:
         raise HTTPException(
@@ -57,7 +86,7 @@ async def get_offre(
 @router.post("/", response_model=OffreResponse, status_code=status.HTTP_201_CREATED)
 async def create_offre(
     offre_data: OffreCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -76,8 +105,8 @@ async def create_offre(
     )
     
     db.add(new_offre)
-    db.commit()
-    db.refresh(new_offre)
+    await db.commit()
+    await db.refresh(new_offre)
     
     return new_offre
 
@@ -86,7 +115,7 @@ async def create_offre(
 async def update_offre(
     offre_id: int,
     offre_data: OffreUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -98,7 +127,7 @@ async def update_offre(
             detail="Only admins can update offres"
         )
 
-    offre = db.query(Offre).filter(Offre.id == offre_id).first()
+    offre = await db.get(Offre, offre_id)
     
     if not offre:
         raise HTTPException(
@@ -110,8 +139,8 @@ async def update_offre(
     for field, value in offre_data.model_dump(exclude_unset=True).items():
         setattr(offre, field, value)
     
-    db.commit()
-    db.refresh(offre)
+    await db.commit()
+    await db.refresh(offre)
     
     return offre
 
@@ -119,7 +148,7 @@ async def update_offre(
 @router.delete("/{offre_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_offre(
     offre_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -131,7 +160,7 @@ async def delete_offre(
             detail="Only admins can delete offres"
         )
 
-    offre = db.query(Offre).filter(Offre.id == offre_id).first()
+    offre = await db.get(Offre, offre_id)
     
     if not offre:
         raise HTTPException(
@@ -139,7 +168,7 @@ async def delete_offre(
             detail="Offre not found"
         )
     
-    db.delete(offre)
-    db.commit()
+    await db.delete(offre)
+    await db.commit()
     
     return None
@@ -1,42 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 from datetime import date, datetime
-import os
-import shutil
 
-from ..database import get_db
-from ..models import StudentProfile, ProfileStatus, User
+from ..database import get_db, get_read_db
+from ..models import StudentProfile, ProfileStatus, User, DocumentBlob
 from ..schemas import StudentProfileCreate, StudentProfileUpdate, StudentProfileResponse
-from ..utils import get_current_user, ocr_service
+from ..utils import get_current_user, ocr_service, document_store, document_results
+from ..utils.document_transcoder import transcode_documents_task
+from .uploads import resolve_document
 
 router = APIRouter(prefix="/profile", tags=["Student Profile"])
 
-UPLOAD_DIR = "uploads/profiles"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+async def _attach_profile_documents(
+    db: AsyncSession,
+    profile_id: int,
+    cin_blob: DocumentBlob,
+    bac_blob: DocumentBlob,
+    releve_blob: DocumentBlob
+):
+    """Reference the profile documents in the store (replaces previous uploads)"""
+    await document_store.attach_async(db, cin_blob, "student_profile", profile_id, "cin_image_path")
+    await document_store.attach_async(db, bac_blob, "student_profile", profile_id, "bac_image_path")
+    await document_store.attach_async(db, releve_blob, "student_profile", profile_id, "releve_notes_path")
 
 
 @router.post("/complete", response_model=StudentProfileResponse, status_code=status.HTTP_201_CREATED)
 async def complete_profile(
+    background_tasks: BackgroundTasks,
     nom: str = Form(...),
     prenom: str = Form(...),
     date_naissance: date = Form(...),
     telephone: Optional[str] = Form(None),
     adresse: Optional[str] = Form(None),
-    cin_image: UploadFile = File(...),
-    bac_image: UploadFile = File(...),
-    releve_notes: UploadFile = File(...),
+    cin_image: Optional[UploadFile] = File(None),
+    bac_image: Optional[UploadFile] = File(None),
+    releve_notes: Optional[UploadFile] = File(None),
+    cin_image_upload_id: Optional[str] = Form(None),
+    bac_image_upload_id: Optional[str] = Form(None),
+    releve_notes_upload_id: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Complete student profile with personal info and documents.
     Triggers OCR verification automatically.
+    
+    Each document is sent either as a file or as the id of a finalized
+    resumable upload (<field>_upload_id).
     """
     # Check if profile already exists
-    existing_profile = db.query(StudentProfile).filter(
-        StudentProfile.user_id == current_user.id
-    ).first()
+    existing_profile = (await db.execute(
+        select(StudentProfile).where(StudentProfile.user_id == current_user.id)
+    )).scalars().first()
     
     if existing_profile and existing_profile.profile_status == ProfileStatus.VERIFIED:
         raise HTTPException(
@@ -44,25 +63,20 @@ async def complete_profile(
             detail="Votre profil est déjà vérifié. Utilisez la mise à jour si nécessaire."
         )
     
-    # Save uploaded files
-    cin_path = os.path.join(UPLOAD_DIR, f"cin_{current_user.id}_{cin_image.filename}")
-    bac_path = os.path.join(UPLOAD_DIR, f"bac_{current_user.id}_{bac_image.filename}")
-    releve_path = os.path.join(UPLOAD_DIR, f"releve_{current_user.id}_{releve_notes.filename}")
+    # Save uploaded files in the content-addressed store (deduplicated)
+    cin_blob = await resolve_document(db, current_user, cin_image, cin_image_upload_id, "cin_image")
+    bac_blob = await resolve_document(db, current_user, bac_image, bac_image_upload_id, "bac_image")
+    releve_blob = await resolve_document(db, current_user, releve_notes, releve_notes_upload_id, "releve_notes", allow_pdf=True)
     
-    with open(cin_path, "wb") as buffer:
-        shutil.copyfileobj(cin_image.file, buffer)
-    
-    with open(bac_path, "wb") as buffer:
-        shutil.copyfileobj(bac_image.file, buffer)
-    
-    with open(releve_path, "wb") as buffer:
-        shutil.copyfileobj(releve_notes.file, buffer)
+    cin_path = cin_blob.path
+    bac_path = bac_blob.path
+    releve_path = releve_blob.path
     
     # Run OCR verification
     try:
-        cin_data = ocr_service.verify_cin(cin_path)
-        bac_data = ocr_service.verify_bac(bac_path)
-        releve_data = ocr_service.verify_releve_notes(releve_path)
+        cin_data = await run_in_threadpool(ocr_service.verify_cin, cin_path)
+        bac_data = await run_in_threadpool(ocr_service.verify_bac, bac_path)
+        releve_data = await run_in_threadpool(ocr_service.verify_releve_notes, releve_path)
         
         # Auto-verify if OCR successful (can be changed to manual review)
         profile_status = ProfileStatus.VERIFIED
@@ -75,6 +89,9 @@ async def complete_profile(
         profile_status = ProfileStatus.PENDING
         verified_at = None
     
+    # Extracted text is kept apart, profile rows only hold the verified fields
+    ocr_results = {"cin_data": cin_data, "bac_data": bac_data, "releve_data": releve_data}
+    
     # Create or update profile
     if existing_profile:
         existing_profile.nom = nom
@@ -85,14 +102,17 @@ async def complete_profile(
         existing_profile.cin_image_path = cin_path
         existing_profile.bac_image_path = bac_path
         existing_profile.releve_notes_path = releve_path
-        existing_profile.cin_data = cin_data
-        existing_profile.bac_data = bac_data
-        existing_profile.releve_data = releve_data
+        existing_profile.cin_data = document_results.compact(cin_data)
+        existing_profile.bac_data = document_results.compact(bac_data)
+        existing_profile.releve_data = document_results.compact(releve_data)
         existing_profile.profile_status = profile_status
         existing_profile.verified_at = verified_at
         existing_profile.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(existing_profile)
+        await _attach_profile_documents(db, existing_profile.id, cin_blob, bac_blob, releve_blob)
+        await document_results.save_async(db, "student_profile", existing_profile.id, ocr_results)
+        await db.commit()
+        await db.refresh(existing_profile)
+        background_tasks.add_task(transcode_documents_task, "student_profile", existing_profile.id)
         return existing_profile
     else:
         new_profile = StudentProfile(
@@ -105,27 +125,31 @@ async def complete_profile(
             cin_image_path=cin_path,
             bac_image_path=bac_path,
             releve_notes_path=releve_path,
-            cin_data=cin_data,
-            bac_data=bac_data,
-            releve_data=releve_data,
+            cin_data=document_results.compact(cin_data),
+            bac_data=document_results.compact(bac_data),
+            releve_data=document_results.compact(releve_data),
             profile_status=profile_status,
             verified_at=verified_at
         )
         db.add(new_profile)
-        db.commit()
-        db.refresh(new_profile)
+        await db.flush()
+        await _attach_profile_documents(db, new_profile.id, cin_blob, bac_blob, releve_blob)
+        await document_results.save_async(db, "student_profile", new_profile.id, ocr_results)
+        await db.commit()
+        await db.refresh(new_profile)
+        background_tasks.add_task(transcode_documents_task, "student_profile", new_profile.id)
         return new_profile
 
 
 @router.get("/me", response_model=StudentProfileResponse)
 async def get_my_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get current user's profile"""
-    profile = db.query(StudentProfile).filter(
-        StudentProfile.user_id == current_user.id
-    ).first()
+    profile = (await db.execute(
+        select(StudentProfile).where(StudentProfile.user_id == current_user.id)
+    )).scalars().first()
     
     if not profile:
         raise HTTPException(
@@ -139,12 +163,12 @@ async def get_my_profile(
 @router.get("/status")
 async def get_profile_status(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Check if profile is complete and verified"""
-    profile = db.query(StudentProfile).filter(
-        StudentProfile.user_id == current_user.id
-    ).first()
+    profile = (await db.execute(
+        select(StudentProfile).where(StudentProfile.user_id == current_user.id)
+    )).scalars().first()
     
     if not profile:
         return {
@@ -171,12 +195,12 @@ async def get_profile_status(
 async def update_profile(
     profile_update: StudentProfileUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update student profile (personal info only, not documents)"""
-    profile = db.query(StudentProfile).filter(
-        StudentProfile.user_id == current_user.id
-    ).first()
+    profile = (await db.execute(
+        select(StudentProfile).where(StudentProfile.user_id == current_user.id)
+    )).scalars().first()
     
     if not profile:
         raise HTTPException(
@@ -197,7 +221,7 @@ async def update_profile(
         profile.adresse = profile_update.adresse
     
     profile.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
     
     return profile
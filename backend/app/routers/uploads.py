@@ -0,0 +1,322 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, UploadFile, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from typing import Optional
+from datetime import datetime
+import os
+import uuid
+from ..config import get_settings
+from ..database import get_db
+from ..models import User, UploadSession, UploadStatus, DocumentBlob
+from ..schemas import UploadSessionResponse
+from ..utils import get_current_user, document_store, upload_validator
+
+router = APIRouter(prefix="/uploads", tags=["Resumable Uploads"])
+settings = get_settings()
+
+
+async def _get_upload(upload_id: str, db: AsyncSession, current_user: User) -> UploadSession:
+    """Load one of the current user's upload sessions"""
+    upload = (await db.execute(
+        select(UploadSession).where(
+            UploadSession.id == upload_id,
+            UploadSession.user_id == current_user.id
+        )
+    )).scalars().first()
+
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+
+    return upload
+
+
+def _offset_headers(upload: UploadSession) -> dict:
+    return {
+        "Upload-Offset": str(upload.upload_offset),
+        "Upload-Length": str(upload.upload_length),
+        "Cache-Control": "no-store"
+    }
+
+
+async def resolve_document(
+    db: AsyncSession,
+    current_user: User,
+    file: Optional[UploadFile],
+    upload_id: Optional[str],
+    label: str,
+    allow_pdf: bool = False
+) -> DocumentBlob:
+    """
+    Store a document sent either as a multipart file or as a finalized resumable upload id
+
+    Files are validated (real type, size, image dimensions) before being stored;
+    resumable uploads were validated when finalized.
+
+    Args:
+        label: Form field name, used in error messages ("cin_image", ...)
+        allow_pdf: Accept a PDF document besides images
+    """
+    if file is not None and upload_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Send either {label} or {label}_upload_id, not both"
+        )
+
+    if file is not None:
+        await run_in_threadpool(upload_validator.validate, file.file, label, allow_pdf=allow_pdf)
+        return await document_store.save_async(db, file.file)
+
+    if upload_id:
+        upload = (await db.execute(
+            select(UploadSession).options(joinedload(UploadSession.blob)).where(
+                UploadSession.id == upload_id,
+                UploadSession.user_id == current_user.id
+            )
+        )).scalars().first()
+
+        if not upload or upload.status != UploadStatus.COMPLETED:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{label}_upload_id: upload not found or not finalized"
+            )
+        if upload.blob.content_type == "application/pdf" and not allow_pdf:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"{label}: unsupported document type, must be an image (JPEG, PNG, WEBP...)"
+            )
+        return upload.blob
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"{label} is required ({label} file or {label}_upload_id)"
+    )
+
+
+@router.post("/", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(
+    response: Response,
+    upload_length: int = Header(..., gt=0),
+    filename: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload
+
+    - **Upload-Length** header: total size of the document in bytes
+
+    Then send the bytes with PATCH /uploads/{id} and finalize with
+    POST /uploads/{id}/finalize. The finalized id replaces the file in
+    POST /candidatures/ and POST /profile/complete.
+    """
+    if upload_length > settings.max_upload_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Document too large (max {settings.max_upload_bytes} bytes)"
+        )
+
+    upload = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=current_user.id,
+        filename=filename,
+        upload_length=upload_length,
+        upload_offset=0
+    )
+    db.add(upload)
+    await db.commit()
+    await db.refresh(upload)
+
+    response.headers["Location"] = f"/uploads/{upload.id}"
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+@router.api_route("/{upload_id}", methods=["GET", "HEAD"], response_model=UploadSessionResponse)
+async def get_upload(
+    upload_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the state of an upload: resume with PATCH from Upload-Offset
+    """
+    upload = await _get_upload(upload_id, db, current_user)
+
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+@router.patch("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Append a chunk to an upload
+
+    - **Upload-Offset** header: must equal the current offset of the upload
+    - Body: raw bytes of the chunk (application/offset+octet-stream)
+
+    If the connection drops, the bytes already received are kept: ask
+    GET/HEAD /uploads/{id} for the offset and resume from there. Chunks of
+    one upload are applied one at a time: when two requests send the same
+    offset (a retry racing the original), the second gets 409.
+    """
+    upload = await _get_upload(upload_id, db, current_user)
+
+    if upload.status != UploadStatus.IN_PROGRESS:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload already finalized"
+        )
+
+    expected_offset = upload.upload_offset
+    if upload_offset != expected_offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload-Offset mismatch: expected {expected_offset}",
+            headers={"Upload-Offset": str(expected_offset)}
+        )
+
+    # The chunk is received into its own file, then written into the upload
+    # once its offset is claimed
+    chunk_path = document_store.chunk_path(upload.id)
+    received = 0
+    too_large = False
+    try:
+        chunk_file = await run_in_threadpool(open, chunk_path, "wb")
+        try:
+            async for chunk in request.stream():
+                if expected_offset + received + len(chunk) > upload.upload_length:
+                    too_large = True
+                    break
+                await run_in_threadpool(chunk_file.write, chunk)
+                received += len(chunk)
+        except ClientDisconnect:
+            # Keep what arrived, the client resumes from the stored offset
+            pass
+        finally:
+            await run_in_threadpool(chunk_file.close)
+
+        # Conditional update: a concurrent request for the same offset waits on
+        # the row until this one commits, then matches nothing
+        claimed = await db.execute(
+            update(UploadSession).where(
+                UploadSession.id == upload.id,
+                UploadSession.upload_offset == expected_offset
+            ).values(
+                upload_offset=expected_offset + received,
+                updated_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount == 0:
+            await db.rollback()
+            await db.refresh(upload)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload-Offset mismatch: expected {upload.upload_offset}",
+                headers={"Upload-Offset": str(upload.upload_offset)}
+            )
+
+        # Written while the row is locked, committed with the new offset
+        await run_in_threadpool(document_store.write_part, upload.id, chunk_path, expected_offset)
+        await db.commit()
+    finally:
+        if os.path.exists(chunk_path):
+            os.remove(chunk_path)
+
+    await db.refresh(upload)
+
+    if too_large:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Chunk goes past the announced Upload-Length",
+            headers={"Upload-Offset": str(upload.upload_offset)}
+        )
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_offset_headers(upload))
+
+
+@router.post("/{upload_id}/finalize", response_model=UploadSessionResponse)
+async def finalize_upload(
+    upload_id: str,
+    sha256: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Finish an upload once every byte has been received
+
+    The document is validated (real type, image dimensions), then moved into
+    the document store (deduplicated). Pass **sha256** to have the server
+    check the document integrity.
+    """
+    upload = await _get_upload(upload_id, db, current_user)
+
+    if upload.status == UploadStatus.COMPLETED:
+        return upload
+
+    if upload.upload_offset != upload.upload_length:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload incomplete: {upload.upload_offset}/{upload.upload_length} bytes received",
+            headers={"Upload-Offset": str(upload.upload_offset)}
+        )
+
+    path = document_store.incoming_path(upload.id)
+    try:
+        await run_in_threadpool(upload_validator.validate, path, "document", allow_pdf=True)
+    except HTTPException:
+        # Not a usable document: drop the bytes, the client starts over
+        os.remove(path)
+        upload.upload_offset = 0
+        await db.commit()
+        raise
+
+    blob = await document_store.save_file_async(db, path)
+
+    if sha256 and sha256.lower() != blob.sha256:
+        # The moved bytes stay in the store unreferenced until the orphan collector runs
+        await db.rollback()
+        upload.upload_offset = 0
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Checksum mismatch, upload the document again from offset 0"
+        )
+
+    upload.blob_sha256 = blob.sha256
+    upload.status = UploadStatus.COMPLETED
+    await db.commit()
+    await db.refresh(upload)
+
+    return upload
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel an upload and drop the bytes received so far"""
+    upload = await _get_upload(upload_id, db, current_user)
+
+    path = document_store.incoming_path(upload.id)
+    if os.path.exists(path):
+        os.remove(path)
+
+    await db.delete(upload)
+    await db.commit()
+
+    return None
@@ -1,21 +1,26 @@
 from .user import UserBase, UserCreate, UserLogin, UserResponse, UserUpdate
-from .offre import OffreBase, OffreCreate, OffreUpdate, OffreResponse, OffreValidation
+from .offre import OffreBase, OffreCreate, OffreUpdate, OffreResponse, OffreSearchResult, OffreValidation
 from .candidature import (
     CandidatureBase,
     CandidatureCreate,
     CandidatureResponse,
     CandidatureUpdate,
+    CandidatureGradeSummary,
+    CandidatureDashboardResponse,
     OCRVerifyResponse
 )
 from .token import Token, TokenData
 from .student_profile import StudentProfileCreate, StudentProfileUpdate, StudentProfileResponse
 from .semester_grade import SemesterGradeCreate, SemesterGradeUpdate, SemesterGradeResponse
+from .upload import UploadSessionResponse
 
 __all__ = [
     "UserBase", "UserCreate", "UserLogin", "UserResponse", "UserUpdate",
-    "OffreBase", "OffreCreate", "OffreUpdate", "OffreResponse", "OffreValidation",
+    "OffreBase", "OffreCreate", "OffreUpdate", "OffreResponse", "OffreSearchResult", "OffreValidation",
     "CandidatureBase", "CandidatureCreate", "CandidatureResponse", "CandidatureUpdate",
+    "CandidatureGradeSummary", "CandidatureDashboardResponse",
     "OCRVerifyResponse", "Token", "TokenData",
     "StudentProfileCreate", "StudentProfileUpdate", "StudentProfileResponse",
-    "SemesterGradeCreate", "SemesterGradeUpdate", "SemesterGradeResponse"
+    "SemesterGradeCreate", "SemesterGradeUpdate", "SemesterGradeResponse",
+    "UploadSessionResponse"
 ]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, AliasPath, computed_field
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from ..models.candidature import CandidatureStatus
 
@@ -32,6 +32,37 @@ class CandidatureResponse(CandidatureBase):
         from_attributes = True
 
 
+class CandidatureGradeSummary(BaseModel):
+    id: int
+    semester_number: int
+    average: Optional[float] = None
+    academic_year: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class CandidatureDashboardResponse(BaseModel):
+    """Candidate home screen entry: a candidature with its offre title and grades"""
+    id: int
+    offre_id: int
+    offre_titre: Optional[str] = Field(None, validation_alias=AliasPath("offre", "titre"))
+    nom: str
+    prenom: str
+    status: CandidatureStatus
+    commentaire: Optional[str] = None
+    created_at: Optional[datetime] = None
+    grades: List[CandidatureGradeSummary] = Field([], validation_alias="semester_grades")
+    
+    @computed_field
+    @property
+    def grades_count(self) -> int:
+        return len(self.grades)
+    
+    class Config:
+        from_attributes = True
+
+
 class CandidatureUpdate(BaseModel):
     status: Optional[CandidatureStatus] = None
     commentaire: Optional[str] = None
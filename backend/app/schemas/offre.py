@@ -35,6 +35,11 @@ class OffreResponse(OffreBase):
         from_attributes = True
 
 
+class OffreSearchResult(OffreResponse):
+    score: float  # Relevance, higher is better
+    snippet: Optional[str] = None  # Matching excerpt, words highlighted with <mark>
+
+
 class OffreValidation(BaseModel):
     status: OffreStatus  # validated or rejected
     commentaire: Optional[str] = None
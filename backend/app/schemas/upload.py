@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from ..models.upload_session import UploadStatus
+
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    filename: Optional[str] = None
+    upload_length: int
+    upload_offset: int
+    status: UploadStatus
+    blob_sha256: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
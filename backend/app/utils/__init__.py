@@ -7,6 +7,9 @@ from .dependencies import (
     get_admin_user
 )
 from .ocr_service import ocr_service, OCRService
+from .document_store import document_store, DocumentStore
+from .upload_validation import upload_validator, UploadValidator
+from .document_results import document_results, DocumentResultStore
 
 __all__ = [
     "verify_password",
@@ -19,5 +22,11 @@ __all__ = [
     "get_candidat_user",
     "get_admin_user",
     "ocr_service",
-    "OCRService"
+    "OCRService",
+    "document_store",
+    "DocumentStore",
+    "upload_validator",
+    "UploadValidator",
+    "document_results",
+    "DocumentResultStore"
 ]
@@ -0,0 +1,160 @@
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from ..config import get_settings
+from ..models import (
+    ArchivedCandidature,
+    ArchivedSemesterGrade,
+    Candidature,
+    CandidatureStatus,
+    DocumentReference,
+    DocumentResult,
+    SemesterGrade,
+)
+
+settings = get_settings()
+
+# Candidatures whose outcome is final: the only ones archived
+CLOSED_STATUSES = (CandidatureStatus.ACCEPTED, CandidatureStatus.REJECTED)
+
+# owner_type of the documents and OCR results of an archived candidature
+ARCHIVED_OWNER_TYPE = "archived_candidature"
+
+
+def campaign_of(moment: datetime) -> str:
+    """Admission campaign (academic year) of a date: "2024-2025" from September 2024 to August 2025"""
+    year = moment.year if moment.month >= settings.campaign_start_month else moment.year - 1
+    return f"{year}-{year + 1}"
+
+
+def campaign_start(campaign: str) -> datetime:
+    """First day of a campaign given as "2024-2025" """
+    try:
+        first, second = (int(year) for year in campaign.split("-"))
+    except ValueError:
+        raise ValueError(f"Invalid campaign '{campaign}', expected e.g. 2024-2025")
+    if second != first + 1:
+        raise ValueError(f"Invalid campaign '{campaign}', expected e.g. 2024-2025")
+    return datetime(first, settings.campaign_start_month, 1)
+
+
+def _archived_row(candidature: Candidature, archived_at: datetime) -> Dict[str, Any]:
+    return {
+        "original_id": candidature.id,
+        "campaign": campaign_of(candidature.created_at),
+        "candidat_id": candidature.candidat_id,
+        "offre_id": candidature.offre_id,
+        "offre_titre": candidature.offre.titre if candidature.offre else None,
+        "nom": candidature.nom,
+        "prenom": candidature.prenom,
+        "date_naissance": candidature.date_naissance,
+        "telephone": candidature.telephone,
+        "cne": candidature.cne,
+        "cin_number": candidature.cin_number,
+        "cin_image_path": candidature.cin_image_path,
+        "bac_image_path": candidature.bac_image_path,
+        "cin_data": candidature.cin_data,
+        "bac_data": candidature.bac_data,
+        "status": candidature.status.value,
+        "commentaire": candidature.commentaire,
+        "grades_count": candidature.grades_count,
+        "average_total": candidature.average_total,
+        "created_at": candidature.created_at,
+        "updated_at": candidature.updated_at,
+        "archived_at": archived_at,
+    }
+
+
+def _archived_grade_row(grade: SemesterGrade) -> Dict[str, Any]:
+    return {
+        "original_id": grade.id,
+        "diploma_type": grade.diploma_type.value,
+        "semester_number": grade.semester_number,
+        "academic_year": grade.academic_year,
+        "average": grade.average,
+        "grades_detail": grade.grades_detail,
+        "transcript_path": grade.transcript_path,
+        "ocr_data": grade.ocr_data,
+        "is_validated": grade.is_validated,
+        "validated_by": grade.validated_by,
+        "validated_at": grade.validated_at,
+        "created_at": grade.created_at,
+        "updated_at": grade.updated_at,
+    }
+
+
+def archive_candidatures(db: Session, before: str, batch_size: int = 200, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Move the closed candidatures of the campaigns before `before` to the
+    archive tables
+
+    Each batch is copied to archived_candidatures / archived_semester_grades
+    under new ids (the original ones are kept in original_id), its documents
+    and OCR results are handed over to the archived rows (owner_type
+    "archived_candidature", owner_id their new id) and the originals are deleted
+    through the ORM, so the statistics tables follow; then it is committed.
+    An interrupted run resumes where it stopped.
+
+    Args:
+        before: First campaign to keep, e.g. "2025-2026"
+        batch_size: Candidatures moved per transaction
+        dry_run: Only count what would be archived
+
+    Returns:
+        Number of candidatures and semester grades archived
+    """
+    closed = select(Candidature).where(
+        Candidature.status.in_(CLOSED_STATUSES),
+        Candidature.created_at < campaign_start(before)
+    )
+    report = {"candidatures": 0, "grades": 0}
+
+    if dry_run:
+        report["candidatures"] = db.scalar(select(func.count()).select_from(closed.subquery()))
+        report["grades"] = db.scalar(
+            select(func.count(SemesterGrade.id)).where(
+                SemesterGrade.candidature_id.in_(closed.with_only_columns(Candidature.id))
+            )
+        )
+        return report
+
+    batch = closed.options(
+        selectinload(Candidature.semester_grades),
+        joinedload(Candidature.offre)
+    ).order_by(Candidature.id).limit(batch_size)
+
+    while candidatures := db.execute(batch).scalars().all():
+        archived_at = datetime.utcnow()
+        grades = sum(len(candidature.semester_grades) for candidature in candidatures)
+        archived = [
+            ArchivedCandidature(
+                **_archived_row(candidature, archived_at),
+                semester_grades=[ArchivedSemesterGrade(**_archived_grade_row(grade)) for grade in candidature.semester_grades]
+            )
+            for candidature in candidatures
+        ]
+        db.add_all(archived)
+        db.flush()
+
+        # candidatures.id -> archived_candidatures.id
+        new_ids = {row.original_id: row.id for row in archived}
+        for model in (DocumentReference, DocumentResult):
+            db.execute(
+                update(model).where(
+                    model.owner_type == "candidature",
+                    model.owner_id.in_(list(new_ids))
+                ).values(
+                    owner_type=ARCHIVED_OWNER_TYPE,
+                    owner_id=case(new_ids, value=model.owner_id)
+                ).execution_options(synchronize_session=False)
+            )
+
+        for candidature in candidatures:
+            db.delete(candidature)  # Grades follow (cascade)
+        db.commit()
+
+        report["candidatures"] += len(candidatures)
+        report["grades"] += grades
+
+    return report
@@ -0,0 +1,80 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, false, or_
+from sqlalchemy.sql.elements import ColumnElement
+from ..models.identifiers import normalize_identifier, normalize_name
+
+MIN_PREFIX_LENGTH = 2  # Shorter queries would match half of the table
+MAX_NAME_WORDS = 4
+
+
+def _starts_with(column, prefix: str, highest: str) -> ColumnElement:
+    """
+    column starts with prefix, written as a range on the column so that a
+    plain B-tree index serves it whatever the collation (LIKE 'x%' only
+    does with a binary / pattern collation); the LIKE keeps the result exact.
+
+    Args:
+        highest: Highest character of the normalized values ("z" for names, "Z" for identifiers)
+    """
+    return and_(
+        column >= prefix,
+        column <= prefix + highest * (column.type.length - len(prefix)),
+        column.like(prefix + "%")
+    )
+
+
+def _name_conditions(model, name: str) -> Tuple[List[ColumnElement], List[ColumnElement]]:
+    """Exact and prefix conditions for a name query: "nom", "prenom", "nom prenom" or "prenom nom" """
+    words = name.split()[:MAX_NAME_WORDS]
+    exact, prefix = [], []
+
+    for split in range(len(words) + 1):
+        first, rest = " ".join(words[:split]), " ".join(words[split:])
+        if not rest:
+            exact.append(model.nom_normalized == first)
+            prefix.append(_starts_with(model.nom_normalized, first, "z"))
+        elif not first:
+            exact.append(model.prenom_normalized == rest)
+            prefix.append(_starts_with(model.prenom_normalized, rest, "z"))
+        else:
+            exact += [
+                and_(model.nom_normalized == first, model.prenom_normalized == rest),
+                and_(model.prenom_normalized == first, model.nom_normalized == rest)
+            ]
+            prefix += [
+                and_(model.nom_normalized == first, _starts_with(model.prenom_normalized, rest, "z")),
+                and_(_starts_with(model.prenom_normalized, first, "z"), _starts_with(model.nom_normalized, rest, "z"))
+            ]
+    return exact, prefix
+
+
+def lookup_conditions(model, q: str) -> Tuple[ColumnElement, ColumnElement]:
+    """
+    (matches, exact) conditions to find candidatures or profiles from an
+    admin query: a CNE, a CIN number or a name, in full or its beginning
+
+    Args:
+        model: Candidature or StudentProfile (both have the lookup columns)
+    """
+    exact: List[ColumnElement] = []
+    prefix: List[ColumnElement] = []
+
+    if any(char.isdigit() for char in q):
+        # CNE and CIN numbers have digits, names do not
+        identifier: Optional[str] = normalize_identifier(q)
+        if identifier and len(identifier) >= MIN_PREFIX_LENGTH:
+            exact += [model.cne_lookup == identifier, model.cin_number_lookup == identifier]
+            prefix += [
+                _starts_with(model.cne_lookup, identifier, "Z"),
+                _starts_with(model.cin_number_lookup, identifier, "Z")
+            ]
+    else:
+        name: Optional[str] = normalize_name(q)
+        if name and len(name) >= MIN_PREFIX_LENGTH:
+            name_exact, name_prefix = _name_conditions(model, name)
+            exact += name_exact
+            prefix += name_prefix
+
+    if not prefix:
+        return false(), false()
+    return or_(*prefix), or_(*exact)
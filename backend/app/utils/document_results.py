@@ -0,0 +1,109 @@
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+import zstandard
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
+from ..models import DocumentResult
+
+# Keys of an OCR result kept on the owner row, small and read by list pages
+COMPACT_KEYS = ("success", "verified_fields", "confidence", "error", "verification")
+
+COMPRESSION_LEVEL = 3
+
+
+class DocumentResultStore:
+    """
+    Split OCR results between the owner row and the document_results table
+
+    verify_cin() & co. return the extracted text next to the verified
+    fields. Only the compact part (COMPACT_KEYS) is stored in the
+    candidature / profile *_data columns; the rest (raw text, layout) is
+    compressed with zstd into a DocumentResult row keyed like
+    DocumentReference by (owner_type, owner_id, field).
+    """
+
+    def split(self, result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return the (compact, bulky) parts of an OCR result"""
+        compact = {key: value for key, value in result.items() if key in COMPACT_KEYS}
+        bulky = {key: value for key, value in result.items() if key not in COMPACT_KEYS}
+        return compact, bulky
+
+    def compact(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """The part of an OCR result stored on the owner row"""
+        return self.split(result)[0]
+
+    def decompress(self, payload: bytes) -> Dict[str, Any]:
+        return json.loads(zstandard.decompress(payload))
+
+    def save(self, db: Session, owner_type: str, owner_id: int, results: Dict[str, Dict[str, Any]]):
+        """
+        Store the bulky part of an owner's OCR results, replacing previous ones
+
+        Args:
+            results: Full OCR result per owner column ("cin_data", ...)
+        """
+        existing = {
+            row.field: row
+            for row in db.query(DocumentResult).filter(
+                DocumentResult.owner_type == owner_type,
+                DocumentResult.owner_id == owner_id,
+                DocumentResult.field.in_(list(results))
+            )
+        }
+
+        for field, result in results.items():
+            bulky = self.split(result or {})[1]
+            row = existing.get(field)
+
+            if not bulky:
+                if row is not None:
+                    db.delete(row)
+                continue
+
+            if row is None:
+                row = DocumentResult(owner_type=owner_type, owner_id=owner_id, field=field)
+                db.add(row)
+            encoded = json.dumps(bulky, ensure_ascii=False).encode("utf-8")
+            row.codec = "zstd"
+            row.payload = zstandard.compress(encoded, COMPRESSION_LEVEL)
+            row.size = len(encoded)
+
+        db.flush()
+
+    def load(self, db: Session, owner_type: str, owner_ids: Iterable[int]) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """Bulky OCR results of several owners: {owner_id: {field: data}}"""
+        owner_ids = list(owner_ids)
+        loaded = {}
+        if not owner_ids:
+            return loaded
+
+        rows = db.execute(
+            select(DocumentResult).options(undefer(DocumentResult.payload)).where(
+                DocumentResult.owner_type == owner_type,
+                DocumentResult.owner_id.in_(owner_ids)
+            )
+        ).scalars()
+        for row in rows:
+            loaded.setdefault(row.owner_id, {})[row.field] = self.decompress(row.payload)
+        return loaded
+
+    def merge(self, compact: Optional[Dict[str, Any]], bulky: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Rebuild a full OCR result from its two parts"""
+        if compact is None and not bulky:
+            return None
+        return {**(compact or {}), **(bulky or {})}
+
+    async def save_async(self, db: AsyncSession, owner_type: str, owner_id: int, results: Dict[str, Dict[str, Any]]):
+        """save() for an AsyncSession"""
+        await db.run_sync(self.save, owner_type, owner_id, results)
+
+    async def load_async(
+        self, db: AsyncSession, owner_type: str, owner_ids: Iterable[int]
+    ) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """load() for an AsyncSession"""
+        return await db.run_sync(self.load, owner_type, list(owner_ids))
+
+
+# Singleton instance
+document_results = DocumentResultStore()
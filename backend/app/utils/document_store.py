@@ -0,0 +1,286 @@
+import hashlib
+import os
+import shutil
+import uuid
+from typing import BinaryIO, Dict, Optional, Union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from ..models import DocumentBlob, DocumentReference, Candidature, StudentProfile, ArchivedCandidature
+
+
+STORE_DIR = os.path.join("uploads", "store")
+CHUNK_SIZE = 1024 * 1024
+
+# DocumentReference.owner_type -> owner model
+OWNER_MODELS = {
+    "candidature": Candidature,
+    "student_profile": StudentProfile,
+    "archived_candidature": ArchivedCandidature,
+}
+
+# Magic bytes -> (extension, content type)
+MAGIC_SIGNATURES = [
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    (b"%PDF", ".pdf", "application/pdf"),
+    (b"GIF87a", ".gif", "image/gif"),
+    (b"GIF89a", ".gif", "image/gif"),
+    (b"II*\x00", ".tif", "image/tiff"),
+    (b"MM\x00*", ".tif", "image/tiff"),
+    (b"BM", ".bmp", "image/bmp"),
+]
+
+
+def sniff_document_type(head: bytes) -> tuple[str, str]:
+    """Guess (extension, content type) from the first bytes of a document"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp", "image/webp"
+    for magic, extension, content_type in MAGIC_SIGNATURES:
+        if head.startswith(magic):
+            return extension, content_type
+    return ".bin", "application/octet-stream"
+
+
+class DocumentStore:
+    """
+    Content-addressed storage for uploaded documents
+
+    Blobs are keyed by the SHA-256 of their bytes and sharded in
+    two levels of subdirectories (uploads/store/ab/cd/abcd...), so identical
+    uploads are stored once. A DocumentReference row links each
+    cin_image_path / bac_image_path / releve_notes_path to its blob and
+    keeps DocumentBlob.ref_count up to date.
+
+    The *_async methods are the same operations for request handlers: file
+    I/O runs in the threadpool and database work in the AsyncSession.
+    """
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.incoming_dir = os.path.join(root, "incoming")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        os.makedirs(self.incoming_dir, exist_ok=True)
+
+    def blob_path(self, sha256: str, extension: str) -> str:
+        """Sharded path of a blob: <root>/ab/cd/<sha256><extension>"""
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}{extension}")
+
+    def is_store_path(self, path: Optional[str]) -> bool:
+        """Check whether a stored path already points inside the store"""
+        if not path:
+            return False
+        return os.path.normpath(path).startswith(os.path.normpath(self.root) + os.sep)
+
+    def incoming_path(self, upload_id: str) -> str:
+        """Path of a resumable upload being received, inside the store"""
+        return os.path.join(self.incoming_dir, f"{upload_id}.part")
+
+    def chunk_path(self, upload_id: str) -> str:
+        """Temporary file receiving one chunk of a resumable upload"""
+        return os.path.join(self.incoming_dir, f"{upload_id}.{uuid.uuid4().hex}.chunk")
+
+    def write_part(self, upload_id: str, chunk_path: str, offset: int) -> int:
+        """
+        Write a received chunk into an upload at an explicit offset
+
+        Anything past the chunk (bytes of a write interrupted before its
+        offset was committed) is cut off.
+
+        Returns:
+            New size of the upload
+        """
+        path = self.incoming_path(upload_id)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as part, open(chunk_path, "rb") as chunk:
+            part.seek(offset)
+            shutil.copyfileobj(chunk, part, CHUNK_SIZE)
+            part.truncate()
+            return part.tell()
+
+    def _move_into_store(self, file_path: str, sha256: str, head: bytes) -> dict:
+        """Move a fully written file to its content-addressed location"""
+        extension, content_type = sniff_document_type(head)
+        path = self.blob_path(sha256, extension)
+
+        if os.path.exists(path):
+            # Same bytes already stored: keep the existing blob, refresh its
+            # mtime so the orphan collector's grace period covers this upload
+            os.remove(file_path)
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(file_path, path)
+
+        return {
+            "sha256": sha256,
+            "path": path,
+            "content_type": content_type
+        }
+
+    def write(self, source: Union[bytes, BinaryIO]) -> dict:
+        """
+        Hash and write bytes to the store, without touching the database
+
+        Args:
+            source: Raw bytes or a readable binary file object
+
+        Returns:
+            Dictionary with sha256, path, size and content_type
+        """
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+
+        if isinstance(source, (bytes, bytearray)):
+            chunks = [bytes(source)]
+        else:
+            chunks = iter(lambda: source.read(CHUNK_SIZE), b"")
+
+        try:
+            with open(tmp_path, "wb") as buffer:
+                for chunk in chunks:
+                    if len(head) < 16:
+                        head += chunk[:16 - len(head)]
+                    digest.update(chunk)
+                    buffer.write(chunk)
+                    size += len(chunk)
+
+            stored = self._move_into_store(tmp_path, digest.hexdigest(), head)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return {**stored, "size": size}
+
+    def write_file(self, file_path: str) -> dict:
+        """
+        Move a file already on disk (e.g. a finished resumable upload) into
+        the store without copying it
+
+        Returns:
+            Dictionary with sha256, path, size and content_type
+        """
+        digest = hashlib.sha256()
+        size = os.path.getsize(file_path)
+
+        with open(file_path, "rb") as file:
+            head = file.read(16)
+            file.seek(0)
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        stored = self._move_into_store(file_path, digest.hexdigest(), head)
+        return {**stored, "size": size}
+
+    def _get_or_create_blob(self, db: Session, stored: dict) -> DocumentBlob:
+        """Return the DocumentBlob row of stored bytes, creating it if needed"""
+        blob = db.query(DocumentBlob).filter(DocumentBlob.sha256 == stored["sha256"]).first()
+        if blob:
+            return blob
+
+        try:
+            # Savepoint: the same bytes may be uploaded by a concurrent request
+            with db.begin_nested():
+                blob = DocumentBlob(
+                    sha256=stored["sha256"],
+                    path=stored["path"],
+                    size=stored["size"],
+                    content_type=stored["content_type"],
+                    ref_count=0
+                )
+                db.add(blob)
+        except IntegrityError:
+            blob = db.query(DocumentBlob).filter(DocumentBlob.sha256 == stored["sha256"]).one()
+
+        return blob
+
+    def save(self, db: Session, source: Union[bytes, BinaryIO]) -> DocumentBlob:
+        """
+        Store a document and return its DocumentBlob row (created if needed)
+
+        The blob is not referenced yet: call attach() once the owner row has an id.
+        """
+        return self._get_or_create_blob(db, self.write(source))
+
+    def save_file(self, db: Session, file_path: str) -> DocumentBlob:
+        """Like save(), for a file already on disk which is moved into the store"""
+        return self._get_or_create_blob(db, self.write_file(file_path))
+
+    def attach(self, db: Session, blob: DocumentBlob, owner_type: str, owner_id: int, field: str) -> DocumentReference:
+        """Point an owner's document field at a blob, updating reference counts"""
+        reference = db.query(DocumentReference).filter(
+            DocumentReference.owner_type == owner_type,
+            DocumentReference.owner_id == owner_id,
+            DocumentReference.field == field
+        ).first()
+
+        if reference:
+            if reference.blob_sha256 == blob.sha256:
+                return reference
+            reference.blob.ref_count -= 1
+            reference.blob = blob
+        else:
+            reference = DocumentReference(
+                owner_type=owner_type,
+                owner_id=owner_id,
+                field=field,
+                blob=blob
+            )
+            db.add(reference)
+
+        blob.ref_count += 1
+        db.flush()
+        return reference
+
+    def references_for(self, db: Session, owner_type: str, owner_id: int) -> Dict[str, DocumentReference]:
+        """Return an owner's references keyed by document field"""
+        references = db.query(DocumentReference).filter(
+            DocumentReference.owner_type == owner_type,
+            DocumentReference.owner_id == owner_id
+        ).all()
+        return {reference.field: reference for reference in references}
+
+    def detach(self, db: Session, owner_type: str, owner_id: int, field: Optional[str] = None) -> int:
+        """Drop an owner's references (all fields, or a single one). Returns the number removed"""
+        query = db.query(DocumentReference).filter(
+            DocumentReference.owner_type == owner_type,
+            DocumentReference.owner_id == owner_id
+        )
+        if field:
+            query = query.filter(DocumentReference.field == field)
+
+        references = query.all()
+        for reference in references:
+            reference.blob.ref_count -= 1
+            db.delete(reference)
+
+        db.flush()
+        return len(references)
+
+    async def save_async(self, db: AsyncSession, source: Union[bytes, BinaryIO]) -> DocumentBlob:
+        """save() for an AsyncSession"""
+        stored = await run_in_threadpool(self.write, source)
+        return await db.run_sync(self._get_or_create_blob, stored)
+
+    async def save_file_async(self, db: AsyncSession, file_path: str) -> DocumentBlob:
+        """save_file() for an AsyncSession"""
+        stored = await run_in_threadpool(self.write_file, file_path)
+        return await db.run_sync(self._get_or_create_blob, stored)
+
+    async def attach_async(
+        self, db: AsyncSession, blob: DocumentBlob, owner_type: str, owner_id: int, field: str
+    ) -> DocumentReference:
+        """attach() for an AsyncSession"""
+        return await db.run_sync(self.attach, blob, owner_type, owner_id, field)
+
+    async def references_for_async(self, db: AsyncSession, owner_type: str, owner_id: int) -> Dict[str, DocumentReference]:
+        """references_for() for an AsyncSession"""
+        return await db.run_sync(self.references_for, owner_type, owner_id)
+
+
+# Singleton instance
+document_store = DocumentStore()
@@ -0,0 +1,145 @@
+import io
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..database import SessionLocal
+from .document_store import document_store, OWNER_MODELS
+from .image_derivatives import derivative_service
+
+settings = get_settings()
+
+# Reference field holding the uploaded original while it is retained
+ORIGINAL_SUFFIX = "_original"
+
+FORMATS = {
+    "webp": "WEBP",
+    "jpeg": "JPEG",
+}
+
+
+class DocumentTranscoder:
+    """
+    Re-encodes stored documents to a compact at-rest format
+
+    Uploaded photos (often 3-8 MB JPEG/PNG straight from a phone) are
+    bounded to max_dimension, re-encoded as WebP or optimized JPEG and
+    stripped of EXIF metadata (orientation is applied first).
+    """
+
+    def __init__(self, format: str = "webp", max_dimension: int = 2400, quality: int = 82):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported document format: {format}")
+        self.format = FORMATS[format]
+        self.max_dimension = max_dimension
+        self.quality = quality
+
+    def _is_normalized(self, image: Image.Image) -> bool:
+        """Already in the target format, size-bounded and without EXIF"""
+        return (
+            image.format == self.format
+            and max(image.size) <= self.max_dimension
+            and not image.getexif()
+        )
+
+    def transcode(self, source_path: str) -> Optional[bytes]:
+        """
+        Re-encode a document
+
+        Returns:
+            The encoded bytes, or None when the document is not an image,
+            is already normalized or would not get smaller
+        """
+        try:
+            with Image.open(source_path) as image:
+                if self._is_normalized(image):
+                    return None
+
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                image.thumbnail((self.max_dimension, self.max_dimension))
+
+                # EXIF is not carried over: Pillow only writes it when asked to
+                buffer = io.BytesIO()
+                if self.format == "WEBP":
+                    image.save(buffer, "WEBP", quality=self.quality, method=4)
+                else:
+                    image.save(buffer, "JPEG", quality=self.quality, optimize=True, progressive=True)
+        except (FileNotFoundError, UnidentifiedImageError):
+            return None
+
+        data = buffer.getvalue()
+        if len(data) >= os.path.getsize(source_path):
+            return None
+        return data
+
+    def transcode_owner_documents(self, db: Session, owner_type: str, owner_id: int) -> int:
+        """
+        Replace an owner's stored documents by their normalized version
+
+        The owner's path columns and references move to the new blobs. The
+        original stays referenced for ORIGINAL_RETENTION_DAYS (if any),
+        otherwise it becomes unreferenced and the orphan collector removes it.
+
+        Returns:
+            Number of documents transcoded (not committed)
+        """
+        owner = db.get(OWNER_MODELS[owner_type], owner_id)
+        if not owner:
+            return 0
+
+        references = document_store.references_for(db, owner_type, owner_id)
+        transcoded = 0
+
+        for field, reference in list(references.items()):
+            if field.endswith(ORIGINAL_SUFFIX):
+                continue
+
+            original = reference.blob
+            data = self.transcode(original.path)
+            if data is None:
+                continue
+
+            blob = document_store.save(db, data)
+            document_store.attach(db, blob, owner_type, owner_id, field)
+            setattr(owner, field, blob.path)
+
+            if settings.original_retention_days > 0:
+                kept = document_store.attach(db, original, owner_type, owner_id, f"{field}{ORIGINAL_SUFFIX}")
+                kept.expires_at = datetime.utcnow() + timedelta(days=settings.original_retention_days)
+
+            transcoded += 1
+
+        db.flush()
+        return transcoded
+
+
+def transcode_documents_task(owner_type: str, owner_id: int):
+    """
+    Background task run after OCR: normalize an owner's documents, then
+    pre-generate the review renditions of the stored versions
+    """
+    db = SessionLocal()
+    try:
+        document_transcoder.transcode_owner_documents(db, owner_type, owner_id)
+        db.commit()
+
+        for reference in document_store.references_for(db, owner_type, owner_id).values():
+            if not reference.field.endswith(ORIGINAL_SUFFIX):
+                derivative_service.generate_all(reference.blob_sha256, reference.blob.path)
+    except Exception as e:
+        print(f"Error transcoding documents of {owner_type} {owner_id}: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+# Singleton instance
+document_transcoder = DocumentTranscoder(
+    format=settings.document_format,
+    max_dimension=settings.document_max_dimension,
+    quality=settings.document_quality
+)
@@ -0,0 +1,89 @@
+import os
+import uuid
+from typing import Dict, Optional
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+
+DERIVATIVES_DIR = os.path.join("uploads", "derivatives")
+
+# Variant name -> longest side in pixels
+VARIANTS = {
+    "thumbnail": 320,
+    "review": 1600,
+}
+
+
+class DerivativeService:
+    """
+    Generates and caches resized renditions of stored documents
+
+    Renditions are keyed by the blob SHA-256, so they never go stale:
+    uploads/derivatives/ab/<sha256>_<variant>.webp (JPEG when WebP is unavailable).
+    """
+
+    def __init__(self, root: str = DERIVATIVES_DIR):
+        self.root = root
+        if features.check("webp"):
+            self.extension, self.media_type, self.format = ".webp", "image/webp", "WEBP"
+        else:
+            self.extension, self.media_type, self.format = ".jpg", "image/jpeg", "JPEG"
+        os.makedirs(self.root, exist_ok=True)
+
+    def derivative_path(self, sha256: str, variant: str) -> str:
+        """Cache path of a rendition"""
+        return os.path.join(self.root, sha256[:2], f"{sha256}_{variant}{self.extension}")
+
+    def etag(self, sha256: str, variant: str) -> str:
+        """Strong ETag of a rendition: content hash of the source plus the variant"""
+        return f'"{sha256}-{variant}"'
+
+    def get_or_create(self, sha256: str, source_path: str, variant: str) -> Optional[str]:
+        """
+        Return the path of a rendition, generating it on first access
+
+        Returns:
+            Path of the cached rendition, or None if the source is not an image
+        """
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown variant: {variant}")
+
+        path = self.derivative_path(sha256, variant)
+        if os.path.exists(path):
+            return path
+
+        try:
+            with Image.open(source_path) as image:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                image.thumbnail((VARIANTS[variant], VARIANTS[variant]))
+
+                # Write to a temporary name first so concurrent requests never see partial files
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                try:
+                    image.save(tmp_path, self.format, quality=80)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+        except (FileNotFoundError, UnidentifiedImageError):
+            return None
+
+        return path
+
+    def generate_all(self, sha256: str, source_path: str):
+        """Pre-generate every rendition (used as a background task at upload time)"""
+        for variant in VARIANTS:
+            try:
+                self.get_or_create(sha256, source_path, variant)
+            except Exception as e:
+                print(f"Error generating {variant} for {sha256}: {str(e)}")
+
+    def urls_for(self, sha256: str) -> Dict[str, str]:
+        """API URLs of every rendition of a blob"""
+        return {variant: f"/documents/{sha256}/{variant}" for variant in VARIANTS}
+
+
+# Singleton instance
+derivative_service = DerivativeService()
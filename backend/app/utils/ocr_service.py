@@ -1,10 +1,15 @@
 import pytesseract
 from PIL import Image
+import io
 import os
-from typing import Dict, Any
+from typing import Dict, Any, BinaryIO, Union
 import re
 
 
+# A document to OCR: a file path, raw bytes or a readable binary buffer
+ImageSource = Union[str, bytes, BinaryIO]
+
+
 class OCRService:
     """Service for extracting text from images using Tesseract OCR"""
     
@@ -22,19 +27,25 @@ class OCRService:
                 pytesseract.pytesseract.tesseract_cmd = path
                 break
     
-    def extract_text(self, image_path: str, lang: str = 'fra') -> Dict[str, Any]:
+    def _open_image(self, source: ImageSource) -> Image.Image:
+        """Open an image from a path, raw bytes or an in-memory buffer"""
+        if isinstance(source, (bytes, bytearray)):
+            return Image.open(io.BytesIO(source))
+        return Image.open(source)
+    
+    def extract_text(self, source: ImageSource, lang: str = 'fra') -> Dict[str, Any]:
         """
         Extract text from an image using OCR
         
         Args:
-            image_path: Path to the image file
+            source: Path to the image file, raw image bytes or a binary buffer
             lang: Language for OCR (default: 'fra' for French)
             
         Returns:
             Dictionary with extracted text and metadata
         """
         try:
-            if not os.path.exists(image_path):
+            if isinstance(source, str) and not os.path.exists(source):
                 return {
                     "success": False,
                     "error": "Image file not found",
@@ -43,7 +54,7 @@ class OCRService:
                 }
             
             # Open and process image
-            image = Image.open(image_path)
+            image = self._open_image(source)
             
             # Extract text
             text = pytesseract.image_to_string(image, lang=lang)
@@ -68,14 +79,14 @@ class OCRService:
                 "confidence": 0.0
             }
     
-    def verify_cin(self, image_path: str) -> Dict[str, Any]:
+    def verify_cin(self, source: ImageSource) -> Dict[str, Any]:
         """
         Verify CIN (Carte d'Identité Nationale) and extract information
         
         Returns:
             Dictionary with verified fields
         """
-        ocr_result = self.extract_text(image_path)
+        ocr_result = self.extract_text(source)
         
         if not ocr_result["success"]:
             return {
@@ -116,14 +127,14 @@ class OCRService:
             "confidence": ocr_result["confidence"]
         }
     
-    def verify_baccalaureat(self, image_path: str) -> Dict[str, Any]:
+    def verify_baccalaureat(self, source: ImageSource) -> Dict[str, Any]:
         """
         Verify Baccalauréat certificate and extract information including CNE
         
         Returns:
             Dictionary with verified fields
         """
-        ocr_result = self.extract_text(image_path)
+        ocr_result = self.extract_text(source)
         
         if not ocr_result["success"]:
             return {
@@ -314,9 +325,9 @@ class OCRService:
         return verification_report
     
     # Alias for backward compatibility
-    def verify_bac(self, image_path: str) -> Dict[str, Any]:
+    def verify_bac(self, source: ImageSource) -> Dict[str, Any]:
         """Alias for verify_baccalaureat"""
-        return self.verify_baccalaureat(image_path)
+        return self.verify_baccalaureat(source)
 
 
 # Singleton instance
@@ -0,0 +1,138 @@
+import re
+import unicodedata
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import Select, and_, column, func, literal_column, or_, select, table
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Offre, OffreStatus
+
+# Highlighted words in snippets
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_WORDS = 16  # Words around the first match
+MAX_TERMS = 8  # Words of a query used for the search
+
+# SQLite FTS5 index, see migration 0007 (rank is bm25 weighted by column)
+offres_fts = table("offres_fts", column("rowid"), column("rank"))
+POSTGRESQL_CONFIG = literal_column("'french_unaccent'::regconfig")
+
+
+def search_terms(q: str) -> List[str]:
+    """Words of a search query, lowercased; operators and punctuation are dropped"""
+    return re.findall(r"\w+", q.lower())[:MAX_TERMS]
+
+
+def _fold(text: str) -> str:
+    """Lowercase text without accents, one character for each character of text"""
+    return "".join(unicodedata.normalize("NFD", char.lower())[0] for char in text)
+
+
+def highlight(text: Optional[str], terms: Sequence[str]) -> Optional[str]:
+    """
+    Snippet of text around its first word starting with one of the terms,
+    matching words wrapped in SNIPPET_START / SNIPPET_END
+
+    Used where the database has no snippet function (MySQL).
+    """
+    if not text:
+        return None
+
+    folded_terms = [_fold(term) for term in terms]
+    words = list(re.finditer(r"\w+", _fold(text)))
+    matches = [i for i, word in enumerate(words) if word.group().startswith(tuple(folded_terms))]
+    if not matches:
+        return None
+
+    first = max(matches[0] - SNIPPET_WORDS // 4, 0)
+    last = min(first + SNIPPET_WORDS, len(words)) - 1
+
+    parts = ["…" if first > 0 else ""]
+    position = words[first].start()
+    for i in matches:
+        if first <= i <= last:
+            word = words[i]
+            parts += [text[position:word.start()], SNIPPET_START, text[word.start():word.end()], SNIPPET_END]
+            position = word.end()
+    parts += [text[position:words[last].end()], "…" if last < len(words) - 1 else ""]
+    return "".join(parts)
+
+
+def _search_statement(dialect: str, terms: List[str]) -> Tuple[Select, bool]:
+    """
+    select(Offre, score, snippet) of the offres matching every term (as a
+    word prefix), best first; and whether snippets must be built in Python
+    """
+    if dialect == "sqlite":
+        fts = literal_column("offres_fts")
+        query = " ".join(f'"{term}"*' for term in terms)
+        snippet = func.snippet(fts, -1, SNIPPET_START, SNIPPET_END, "…", SNIPPET_WORDS)
+        statement = select(Offre, (-offres_fts.c.rank).label("score"), snippet.label("snippet")).join(
+            offres_fts, offres_fts.c.rowid == Offre.id
+        ).where(fts.op("MATCH")(query)).order_by(offres_fts.c.rank, Offre.id)
+        return statement, False
+
+    if dialect == "postgresql":
+        search_vector = literal_column("offres.search_vector")
+        query = func.to_tsquery(POSTGRESQL_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        score = func.ts_rank_cd(search_vector, query)
+        snippet = func.ts_headline(
+            POSTGRESQL_CONFIG,
+            func.concat_ws(" ", Offre.titre, Offre.description, Offre.conditions),
+            query,
+            f'StartSel="{SNIPPET_START}", StopSel="{SNIPPET_END}", MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}'
+        )
+        statement = select(Offre, score.label("score"), snippet.label("snippet")).where(
+            search_vector.op("@@")(query)
+        ).order_by(score.desc(), Offre.id)
+        return statement, False
+
+    if dialect == "mysql":
+        score = mysql_match(
+            Offre.titre, Offre.description, Offre.conditions,
+            against=" ".join(f"+{term}*" for term in terms)
+        ).in_boolean_mode()
+        statement = select(Offre, score.label("score")).where(score > 0).order_by(score.desc(), Offre.id)
+        return statement, True
+
+    # No full-text index: every term somewhere in the text, unranked
+    statement = select(Offre, literal_column("0.0").label("score")).where(and_(*[
+        or_(Offre.titre.ilike(f"%{term}%"), Offre.description.ilike(f"%{term}%"), Offre.conditions.ilike(f"%{term}%"))
+        for term in terms
+    ])).order_by(Offre.created_at.desc(), Offre.id)
+    return statement, True
+
+
+async def search_offres(
+    db: AsyncSession,
+    q: str,
+    validated_only: bool = True,
+    skip: int = 0,
+    limit: int = 20
+) -> List[Tuple[Offre, float, Optional[str]]]:
+    """
+    Full-text search over titre, description and conditions
+
+    Accents and case are ignored; every word of the query must appear,
+    as a word or the start of one. Results are ranked by relevance, the
+    title weighing most, then the description.
+
+    Returns:
+        (offre, score, snippet) tuples, best first
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    statement, python_snippets = _search_statement(db.get_bind().dialect.name, terms)
+    if validated_only:
+        statement = statement.where(Offre.status == OffreStatus.VALIDATED)
+
+    rows = (await db.execute(statement.offset(skip).limit(limit))).all()
+
+    if python_snippets:
+        return [
+            (offre, float(score or 0), highlight(offre.description, terms) or highlight(offre.conditions, terms)
+             or highlight(offre.titre, terms))
+            for offre, score in rows
+        ]
+    return [(offre, float(score or 0), snippet) for offre, score, snippet in rows]
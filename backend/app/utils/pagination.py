@@ -0,0 +1,136 @@
+import base64
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Seconds a total count is reused before counting again
+TOTAL_COUNT_TTL = 60
+
+# Most totals kept at once (one per distinct query and parameters)
+TOTAL_COUNT_CACHE_SIZE = 1000
+
+# Cached totals: query SQL + parameters -> (count, computed at), oldest first
+_total_counts: Dict[str, Tuple[int, float]] = {}
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just after a row"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Read a cursor produced by encode_cursor()"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def approximate_count(db: AsyncSession, statement: Select) -> int:
+    """
+    Count the rows of a query, reusing the result for TOTAL_COUNT_TTL seconds
+
+    Totals of big lists are expensive and only shown as an indication,
+    so a count up to a minute old is good enough.
+    """
+    statement = statement.order_by(None)
+    key = f"{statement}|{statement.compile().params}"
+
+    cached = _total_counts.get(key)
+    if cached and time.monotonic() - cached[1] < TOTAL_COUNT_TTL:
+        return cached[0]
+
+    total = (await db.execute(select(func.count()).select_from(statement.subquery()))).scalar_one()
+    now = time.monotonic()
+    _total_counts.pop(key, None)
+    _total_counts[key] = (total, now)
+
+    if len(_total_counts) > TOTAL_COUNT_CACHE_SIZE:
+        # Every filter value adds a key: drop the expired totals, then the oldest ones
+        for cached_key, (_, computed_at) in list(_total_counts.items()):
+            if now - computed_at < TOTAL_COUNT_TTL and len(_total_counts) <= TOTAL_COUNT_CACHE_SIZE:
+                break
+            del _total_counts[cached_key]
+
+    return total
+
+
+async def paginate(
+    db: AsyncSession,
+    statement: Select,
+    model: Any,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    order_by: Optional[Sequence[Any]] = None
+) -> List[Any]:
+    """
+    Return one page of a query ordered by (created_at, id)
+
+    With a cursor the page starts right after the row it points to (keyset
+    pagination on the (created_at, id) indexes), otherwise skip/limit are
+    used as before. When more rows may follow, the X-Next-Cursor header
+    holds the cursor of the next page; X-Total-Count is added on request.
+
+    With a custom order_by, pages are read with skip/limit only.
+
+    Args:
+        db: Database session
+        statement: Filtered select(); its first entity must be `model`
+        model: Mapped class with created_at and id columns
+        response: Response whose headers receive the pagination links
+        skip: Rows to skip (ignored with a cursor)
+        limit: Page size
+        cursor: X-Next-Cursor of the previous page
+        include_total: Add an approximate X-Total-Count header
+        order_by: Sort clauses replacing (created_at, id)
+
+    Returns:
+        The model instances, or rows (tuples) when several columns are selected
+    """
+    if include_total:
+        response.headers["X-Total-Count"] = str(await approximate_count(db, statement))
+
+    if order_by is not None:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="cursor is only available in creation order, use skip with this sort"
+            )
+        rows = (await db.execute(statement.order_by(*order_by).offset(skip).limit(limit))).all()
+        return _entities(statement, rows)
+
+    statement = statement.order_by(model.created_at, model.id)
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.id) > tuple_(created_at, row_id))
+    elif skip:
+        statement = statement.offset(skip)
+
+    rows = (await db.execute(statement.limit(limit))).all()
+
+    if rows and len(rows) == limit:
+        last = rows[-1][0]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+    return _entities(statement, rows)
+
+
+def _entities(statement: Select, rows: List[Any]) -> List[Any]:
+    """Unwrap single-entity rows"""
+    if len(statement.column_descriptions) == 1:
+        return [row[0] for row in rows]
+    return rows
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from ..models import (
+    Candidature,
+    CandidatureStatistics,
+    DiplomaStatistics,
+    ProfileStatus,
+    SemesterGrade,
+    StudentProfile,
+)
+
+
+def rebuild_statistics(db: Session) -> Dict[str, int]:
+    """
+    Recompute the statistics tables from the rows they summarize
+
+    The tables, like Candidature.grades_count and average_total, are
+    maintained on every flush (see models/statistics.py); this is the
+    repair path, after bulk SQL writes or a restored backup.
+    Runs in the caller's transaction: commit afterwards.
+
+    Returns:
+        Number of rows written to each statistics table, and of candidatures rescored
+    """
+    diplomas = defaultdict(lambda: {"students_count": 0, "verified_count": 0, "grades_count": 0, "grades_sum": 0.0})
+
+    profiles = db.execute(
+        select(
+            func.coalesce(StudentProfile.current_diploma, ""),
+            func.count(StudentProfile.id),
+            func.sum(case((StudentProfile.profile_status == ProfileStatus.VERIFIED, 1), else_=0))
+        ).group_by(func.coalesce(StudentProfile.current_diploma, ""))
+    )
+    for diploma, students, verified in profiles:
+        diplomas[diploma].update(students_count=students, verified_count=verified or 0)
+
+    grades = db.execute(
+        select(
+            SemesterGrade.diploma_type,
+            func.count(SemesterGrade.id),
+            func.sum(SemesterGrade.average)
+        ).where(
+            SemesterGrade.average.isnot(None)
+        ).group_by(SemesterGrade.diploma_type)
+    )
+    for diploma_type, count, total in grades:
+        diplomas[diploma_type.value].update(grades_count=count, grades_sum=total)
+
+    candidatures = db.execute(
+        select(
+            Candidature.offre_id,
+            Candidature.status,
+            func.count(Candidature.id)
+        ).group_by(Candidature.offre_id, Candidature.status)
+    ).all()
+
+    now = datetime.utcnow()
+    db.execute(delete(DiplomaStatistics))
+    db.execute(delete(CandidatureStatistics))
+    if diplomas:
+        db.execute(insert(DiplomaStatistics), [
+            {"diploma": diploma, **counts, "updated_at": now} for diploma, counts in diplomas.items()
+        ])
+    if candidatures:
+        db.execute(insert(CandidatureStatistics), [
+            {"offre_id": offre_id, "status": status.value, "candidatures_count": count, "updated_at": now}
+            for offre_id, status, count in candidatures
+        ])
+
+    grades = select(SemesterGrade).where(SemesterGrade.candidature_id == Candidature.id)
+    rescored = db.execute(
+        update(Candidature).values(
+            grades_count=grades.with_only_columns(func.count(SemesterGrade.id)).scalar_subquery(),
+            average_total=grades.with_only_columns(func.avg(SemesterGrade.average)).scalar_subquery(),
+            updated_at=Candidature.updated_at
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+
+    return {
+        "diploma_statistics": len(diplomas),
+        "candidature_statistics": len(candidatures),
+        "candidatures": rescored
+    }
@@ -0,0 +1,72 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Sequence
+
+ROWS_PER_CHUNK = 500
+
+# Lets Excel open the file as UTF-8 (accents in names)
+UTF8_BOM = "\ufeff"
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+# First characters that make spreadsheets read a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: Any) -> Any:
+    """_cell() for CSV: text that would run as a formula (e.g. a name like "=HYPERLINK(...)") is quoted with '"""
+    value = _cell(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(columns: Sequence[str], rows: Iterable[Sequence[Any]], rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[bytes]:
+    """
+    Write rows as CSV while they are read, a chunk of bytes every
+    rows_per_chunk rows
+
+    Args:
+        columns: Header line
+        rows: Values in the order of columns, None as an empty cell; text
+            starting with = + - @ or a tab / carriage return gets a ' prefix
+            so spreadsheets do not evaluate it
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write(UTF8_BOM)
+    writer.writerow(columns)
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(value) for value in row])
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(columns: Sequence[str], rows: Iterable[Sequence[Any]], rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[bytes]:
+    """Same as stream_csv, one JSON object per line keyed by columns"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(
+            {column: _cell(value) for column, value in zip(columns, row)}, ensure_ascii=False, default=str
+        ))
+        if len(lines) == rows_per_chunk:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
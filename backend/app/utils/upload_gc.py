@@ -0,0 +1,269 @@
+import os
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Set
+from sqlalchemy.orm import Session
+from ..models import (
+    Candidature, StudentProfile, SemesterGrade, ArchivedCandidature, ArchivedSemesterGrade,
+    DocumentBlob, DocumentReference, DocumentResult, UploadSession
+)
+from .document_store import document_store, OWNER_MODELS
+from .image_derivatives import derivative_service, VARIANTS
+
+
+UPLOAD_ROOT = "uploads"
+
+# Every column that may point at a file under uploads/
+PATH_COLUMNS = [
+    Candidature.cin_image_path,
+    Candidature.bac_image_path,
+    StudentProfile.cin_image_path,
+    StudentProfile.bac_image_path,
+    StudentProfile.releve_notes_path,
+    SemesterGrade.transcript_path,
+    ArchivedCandidature.cin_image_path,
+    ArchivedCandidature.bac_image_path,
+    ArchivedSemesterGrade.transcript_path,
+]
+
+def _batched(iterable: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _iter_files(root: str) -> Iterator[str]:
+    """Walk every file under a directory, as paths relative to the working directory like the stored ones"""
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            yield os.path.relpath(os.path.join(directory, filename))
+
+
+def _referenced_paths(db: Session, paths: List[str]) -> Set[str]:
+    """Return the paths of a batch still used by a candidature, profile or grade"""
+    referenced = set()
+    for column in PATH_COLUMNS:
+        rows = db.query(column).filter(column.in_(paths)).all()
+        referenced.update(os.path.normpath(path) for (path,) in rows)
+    return referenced
+
+
+def _remove_file(path: str, report: Dict[str, Any], dry_run: bool):
+    """Delete a file and account for the reclaimed space"""
+    try:
+        size = os.path.getsize(path)
+        if not dry_run:
+            os.remove(path)
+    except FileNotFoundError:
+        return
+    report["deleted_files"] += 1
+    report["reclaimed_bytes"] += size
+
+
+def release_dangling_references(db: Session, batch_size: int, dry_run: bool = False) -> int:
+    """Drop document references whose candidature or profile has been deleted"""
+    released = 0
+    for owner_type, model in OWNER_MODELS.items():
+        query = db.query(DocumentReference).outerjoin(
+            model, model.id == DocumentReference.owner_id
+        ).filter(
+            DocumentReference.owner_type == owner_type,
+            model.id.is_(None)
+        )
+
+        if dry_run:
+            released += query.count()
+            continue
+
+        while dangling := query.limit(batch_size).all():
+            for reference in dangling:
+                reference.blob.ref_count -= 1
+                db.delete(reference)
+            released += len(dangling)
+            db.commit()
+
+    return released
+
+
+def delete_dangling_results(db: Session, batch_size: int, dry_run: bool = False) -> int:
+    """Drop OCR results whose candidature or profile has been deleted"""
+    deleted = 0
+    for owner_type, model in OWNER_MODELS.items():
+        query = db.query(DocumentResult.id).outerjoin(
+            model, model.id == DocumentResult.owner_id
+        ).filter(
+            DocumentResult.owner_type == owner_type,
+            model.id.is_(None)
+        )
+
+        if dry_run:
+            deleted += query.count()
+            continue
+
+        while ids := [result_id for (result_id,) in query.limit(batch_size).all()]:
+            db.query(DocumentResult).filter(DocumentResult.id.in_(ids)).delete(synchronize_session=False)
+            deleted += len(ids)
+            db.commit()
+
+    return deleted
+
+
+def release_expired_references(db: Session, batch_size: int, dry_run: bool = False) -> int:
+    """Drop references past their retention date (originals kept after transcoding)"""
+    query = db.query(DocumentReference).filter(
+        DocumentReference.expires_at.isnot(None),
+        DocumentReference.expires_at < datetime.utcnow()
+    )
+
+    if dry_run:
+        return query.count()
+
+    released = 0
+    while expired := query.limit(batch_size).all():
+        for reference in expired:
+            reference.blob.ref_count -= 1
+            db.delete(reference)
+        released += len(expired)
+        db.commit()
+
+    return released
+
+
+def collect_orphaned_uploads(
+    db: Session,
+    root: str = UPLOAD_ROOT,
+    grace_period: timedelta = timedelta(hours=24),
+    batch_size: int = 500,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Delete uploaded files that no row references anymore
+
+    Submissions rejected by OCR verification (no_match / partial_match)
+    leave their documents behind, replaced profile documents drop to a
+    zero reference count, deleted users leave dangling references (and
+    OCR results) and originals kept after transcoding expire.
+    Only files older than the grace period are touched, so uploads still
+    being processed are safe. Work is done in batches of `batch_size`
+    files, each checked against the database with a single IN query per
+    path column.
+
+    Args:
+        db: Database session
+        root: Uploads directory to scan
+        grace_period: Minimum age of a file before it can be collected
+        batch_size: Files (or blob rows) processed per batch
+        dry_run: Only report what would be deleted
+
+    Returns:
+        Report with the number of deleted files, blobs, references, OCR results and reclaimed bytes
+    """
+    report = {
+        "scanned_files": 0,
+        "deleted_files": 0,
+        "deleted_blobs": 0,
+        "deleted_uploads": 0,
+        "released_references": 0,
+        "deleted_results": 0,
+        "reclaimed_bytes": 0,
+        "dry_run": dry_run
+    }
+    cutoff = datetime.utcnow() - grace_period
+    cutoff_timestamp = time.time() - grace_period.total_seconds()
+    derivatives_root = os.path.relpath(derivative_service.root)
+
+    # 1. References left behind by deleted candidatures / profiles, or past retention
+    report["released_references"] = (
+        release_dangling_references(db, batch_size, dry_run)
+        + release_expired_references(db, batch_size, dry_run)
+    )
+    report["deleted_results"] = delete_dangling_results(db, batch_size, dry_run)
+
+    # 2. Resumable uploads abandoned, or finalized and not used, past the grace period
+    stale_uploads = db.query(UploadSession).filter(UploadSession.updated_at < cutoff)
+    if dry_run:
+        report["deleted_uploads"] = stale_uploads.count()
+    else:
+        while uploads := stale_uploads.limit(batch_size).all():
+            for upload in uploads:
+                _remove_file(document_store.incoming_path(upload.id), report, dry_run)
+                db.delete(upload)
+            report["deleted_uploads"] += len(uploads)
+            db.commit()
+
+    # 3. Blobs nobody references anymore
+    last_sha256 = ""
+    while True:
+        blobs = db.query(DocumentBlob).filter(
+            DocumentBlob.ref_count <= 0,
+            DocumentBlob.created_at < cutoff,
+            DocumentBlob.sha256 > last_sha256
+        ).order_by(DocumentBlob.sha256).limit(batch_size).all()
+
+        if not blobs:
+            break
+        last_sha256 = blobs[-1].sha256
+
+        still_used = _referenced_paths(db, [blob.path for blob in blobs])
+        pending_uploads = {
+            sha256
+            for (sha256,) in db.query(UploadSession.blob_sha256).filter(
+                UploadSession.blob_sha256.in_([blob.sha256 for blob in blobs])
+            ).all()
+        }
+        for blob in blobs:
+            if os.path.normpath(blob.path) in still_used or blob.sha256 in pending_uploads:
+                continue
+            # Stored again recently (deduplicated upload not committed yet)
+            if os.path.exists(blob.path) and os.path.getmtime(blob.path) >= cutoff_timestamp:
+                continue
+            _remove_file(blob.path, report, dry_run)
+            for variant in VARIANTS:
+                _remove_file(derivative_service.derivative_path(blob.sha256, variant), report, dry_run)
+            if not dry_run:
+                db.delete(blob)
+            report["deleted_blobs"] += 1
+
+        if not dry_run:
+            db.commit()
+
+    # 4. Files on disk without any row: rejected submissions, leaked temp files,
+    #    renditions of deleted blobs
+    old_files = (
+        path for path in _iter_files(root)
+        if os.path.getmtime(path) < cutoff_timestamp
+    )
+    for batch in _batched(old_files, batch_size):
+        report["scanned_files"] += len(batch)
+
+        # Renditions are named <sha256>_<variant>.<ext>
+        renditions = {
+            path: os.path.basename(path).split("_")[0]
+            for path in batch
+            if path.startswith(derivatives_root + os.sep)
+        }
+        documents = [path for path in batch if path not in renditions]
+
+        known_blobs = {
+            os.path.normpath(path)
+            for (path,) in db.query(DocumentBlob.path).filter(DocumentBlob.path.in_(documents)).all()
+        }
+        referenced = _referenced_paths(db, documents) | known_blobs
+
+        live_shas = {
+            sha256
+            for (sha256,) in db.query(DocumentBlob.sha256).filter(
+                DocumentBlob.sha256.in_(set(renditions.values()))
+            ).all()
+        }
+
+        for path in documents:
+            if path not in referenced:
+                _remove_file(path, report, dry_run)
+        for path, sha256 in renditions.items():
+            if sha256 not in live_shas:
+                _remove_file(path, report, dry_run)
+
+    return report
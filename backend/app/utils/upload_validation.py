@@ -0,0 +1,141 @@
+import io
+import os
+import warnings
+from typing import BinaryIO, Union
+from fastapi import HTTPException, status
+from PIL import Image, UnidentifiedImageError
+from ..config import get_settings
+from .document_store import sniff_document_type
+
+settings = get_settings()
+
+# Image content type -> format name reported by Pillow
+IMAGE_FORMATS = {
+    "image/jpeg": "JPEG",
+    "image/png": "PNG",
+    "image/webp": "WEBP",
+    "image/tiff": "TIFF",
+    "image/bmp": "BMP",
+    "image/gif": "GIF",
+}
+
+# Enough bytes for the magic numbers of every supported format
+HEADER_SIZE = 16
+
+# Pillow refuses to decode past twice this limit anywhere in the app (OCR,
+# renditions, transcoding), not only for the uploads checked here
+Image.MAX_IMAGE_PIXELS = settings.max_image_pixels
+
+# A document to check: raw bytes, a readable + seekable binary file or a path
+UploadSource = Union[bytes, BinaryIO, str]
+
+
+class UploadValidator:
+    """
+    Rejects unsupported or oversized documents before they are stored or OCR'd
+
+    Only the magic bytes and the image header are read: Image.open() is lazy
+    and gives the real format and dimensions without decoding any pixel, so
+    a small PNG announcing 50000x50000 pixels is refused in microseconds.
+    """
+
+    def __init__(self, max_bytes: int, max_dimension: int, max_pixels: int):
+        self.max_bytes = max_bytes
+        self.max_dimension = max_dimension
+        self.max_pixels = max_pixels
+
+    def _reject(self, status_code: int, label: str, reason: str):
+        raise HTTPException(status_code=status_code, detail=f"{label}: {reason}")
+
+    def validate(self, source: UploadSource, label: str = "document", allow_pdf: bool = False) -> str:
+        """
+        Check a document's size, real type and image dimensions
+
+        Args:
+            source: Raw bytes, a binary file object (left at position 0) or a file path
+            label: Form field name, used in error messages
+            allow_pdf: Accept PDF documents besides images
+
+        Returns:
+            The sniffed content type
+
+        Raises:
+            HTTPException 413 if too large, 415 if not a supported document,
+            400 if the image header is corrupt
+        """
+        if isinstance(source, (bytes, bytearray)):
+            file = io.BytesIO(source)
+        elif isinstance(source, str):
+            file = open(source, "rb")
+        else:
+            file = source
+
+        try:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            file.seek(0)
+            if size > self.max_bytes:
+                self._reject(
+                    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, label,
+                    f"document too large (max {self.max_bytes} bytes)"
+                )
+
+            _, content_type = sniff_document_type(file.read(HEADER_SIZE))
+            file.seek(0)
+
+            if content_type == "application/pdf" and allow_pdf:
+                return content_type
+
+            expected_format = IMAGE_FORMATS.get(content_type)
+            if not expected_format:
+                allowed = "an image or a PDF" if allow_pdf else "an image (JPEG, PNG, WEBP...)"
+                self._reject(
+                    status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, label,
+                    f"unsupported document type, must be {allowed}"
+                )
+
+            self._check_image_header(file, expected_format, label)
+            return content_type
+        finally:
+            if file is not source:
+                file.close()
+            else:
+                file.seek(0)
+
+    def _check_image_header(self, file: BinaryIO, expected_format: str, label: str):
+        """Parse the image header (no decoding) and check format and dimensions"""
+        try:
+            with warnings.catch_warnings():
+                # Pillow only warns between MAX_IMAGE_PIXELS and twice that: refuse it too
+                warnings.simplefilter("error", Image.DecompressionBombWarning)
+                with Image.open(file) as image:
+                    image_format = image.format
+                    width, height = image.size
+        except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+            self._reject(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, label,
+                f"image too large (max {self.max_pixels} pixels)"
+            )
+        except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+            self._reject(status.HTTP_400_BAD_REQUEST, label, "corrupt or unreadable image")
+
+        if image_format != expected_format:
+            self._reject(
+                status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, label,
+                "file content does not match its image type"
+            )
+
+        if width > self.max_dimension or height > self.max_dimension or width * height > self.max_pixels:
+            self._reject(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, label,
+                f"image too large ({width}x{height}, max {self.max_dimension}px per side "
+                f"and {self.max_pixels} pixels)"
+            )
+
+
+# Singleton instance
+upload_validator = UploadValidator(
+    max_bytes=settings.max_upload_bytes,
+    max_dimension=settings.max_image_dimension,
+    max_pixels=settings.max_image_pixels
+)
@@ -0,0 +1,83 @@
+import os
+import time
+import zipfile
+from typing import Iterable, Iterator, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+
+# An archive member: (name inside the archive, file path or raw bytes)
+ZipEntry = Tuple[str, Union[str, bytes]]
+
+
+class _StreamBuffer:
+    """
+    Write-only, unseekable file object collecting what zipfile writes
+
+    zipfile detects that it cannot seek back and writes each member's
+    sizes and CRC in a data descriptor after its data, so the archive can
+    be sent as it is produced.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last call"""
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _iter_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """Write the archive into an unseekable buffer, yielding what each step produced"""
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, source in entries:
+            if isinstance(source, (bytes, bytearray)):
+                archive.writestr(zipfile.ZipInfo(name, time.localtime()[:6]), source)
+                yield buffer.drain()
+                continue
+
+            if not os.path.exists(source):
+                continue
+
+            info = zipfile.ZipInfo(name, time.localtime(os.path.getmtime(source))[:6])
+            info.file_size = os.path.getsize(source)
+            zip64 = info.file_size > zipfile.ZIP64_LIMIT
+            with open(source, "rb") as file, archive.open(info, mode="w", force_zip64=zip64) as member:
+                for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                    member.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+
+    # Central directory, written when the archive is closed
+    yield buffer.drain()
+
+
+def stream_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """
+    Build a ZIP archive on the fly, yielding it chunk by chunk
+
+    Files are copied in CHUNK_SIZE pieces and each piece is yielded right
+    away, so memory stays constant whatever the archive size (only the
+    central directory, a few bytes per member, is kept until the end).
+    Documents are already compressed images: members are stored, not deflated.
+    Paths that no longer exist on disk are skipped.
+
+    Args:
+        entries: (name inside the archive, file path or raw bytes) pairs, consumed lazily
+    """
+    return (chunk for chunk in _iter_zip(entries) if chunk)
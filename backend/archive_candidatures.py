@@ -0,0 +1,48 @@
+"""
+Archive the closed candidatures of past admission campaigns
+
+Accepted and rejected candidatures created before the given campaign are
+moved, with their semester grades, to the archive tables (read with
+/admin/archive/...). Candidatures still open stay where they are. Safe to
+interrupt and run again.
+
+Usage:
+    python archive_candidatures.py [--before 2025-2026] [--batch-size 200] [--dry-run]
+"""
+
+import argparse
+from datetime import datetime
+from app.database import SessionLocal
+from app.utils.archive import archive_candidatures, campaign_of
+
+
+def archive(before: str, batch_size: int, dry_run: bool):
+    """Run the archival and print what was moved"""
+    db = SessionLocal()
+    try:
+        report = archive_candidatures(db, before, batch_size=batch_size, dry_run=dry_run)
+
+        action = "Would archive" if dry_run else "Archived"
+        print(f"{action} {report['candidatures']} candidature(s) "
+              f"and {report['grades']} semester grade(s) from before {before}")
+
+    except Exception as e:
+        print(f"Error while archiving candidatures: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive the closed candidatures of past campaigns")
+    parser.add_argument(
+        "--before", default=campaign_of(datetime.utcnow()),
+        help="First campaign to keep, e.g. 2025-2026 (default: the current one)"
+    )
+    parser.add_argument("--batch-size", type=int, default=200, help="Candidatures moved per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+    args = parser.parse_args()
+
+    print("Archiving candidatures...")
+    archive(args.before, args.batch_size, args.dry_run)
+    print("\nArchival complete!")
@@ -0,0 +1,53 @@
+"""
+Garbage collector for orphaned uploads
+
+Deletes documents that no candidature, profile or grade references anymore
+(rejected submissions, replaced profile documents, deleted users), once
+they are older than the grace period. Safe to run from cron.
+
+Usage:
+    python gc_uploads.py [--grace-hours 24] [--batch-size 500] [--dry-run]
+"""
+
+import argparse
+from datetime import timedelta
+from app.database import SessionLocal
+from app.utils.upload_gc import collect_orphaned_uploads
+
+
+def gc_uploads(grace_hours: float, batch_size: int, dry_run: bool):
+    """Run the collector and print its report"""
+    db = SessionLocal()
+    try:
+        report = collect_orphaned_uploads(
+            db,
+            grace_period=timedelta(hours=grace_hours),
+            batch_size=batch_size,
+            dry_run=dry_run
+        )
+
+        action = "Would delete" if dry_run else "Deleted"
+        print(f"{action} {report['deleted_files']} file(s), {report['deleted_blobs']} blob(s)")
+        print(f"Released {report['released_references']} dangling reference(s), "
+              f"{report['deleted_uploads']} stale resumable upload(s)")
+        print(f"{action} {report['deleted_results']} OCR result(s) of deleted candidatures/profiles")
+        print(f"Reclaimed {report['reclaimed_bytes']} bytes ({report['reclaimed_bytes'] / (1024 * 1024):.2f} MB)")
+        print(f"Checked {report['scanned_files']} file(s) past the grace period")
+
+    except Exception as e:
+        print(f"Error during garbage collection: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete orphaned uploaded documents")
+    parser.add_argument("--grace-hours", type=float, default=24, help="Minimum age of a file before deletion")
+    parser.add_argument("--batch-size", type=int, default=500, help="Files processed per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    args = parser.parse_args()
+
+    print("Starting uploads garbage collection...")
+    gc_uploads(args.grace_hours, args.batch_size, args.dry_run)
+    print("\nGarbage collection complete!")
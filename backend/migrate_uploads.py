@@ -0,0 +1,69 @@
+"""
+Migration script to move existing uploads into the content-addressed store
+uploads/cin_{user}_{timestamp}_{filename} -> uploads/store/ab/cd/<sha256>.<ext>
+
+Identical files are deduplicated and every document field gets a
+DocumentReference row. Old files are removed once their row is committed.
+"""
+
+import os
+from app.database import SessionLocal
+from app.models import Candidature, StudentProfile
+from app.utils.document_store import document_store
+
+# (model, owner_type, document fields)
+DOCUMENT_OWNERS = [
+    (Candidature, "candidature", ["cin_image_path", "bac_image_path"]),
+    (StudentProfile, "student_profile", ["cin_image_path", "bac_image_path", "releve_notes_path"]),
+]
+
+
+def migrate_uploads():
+    """Move every legacy document path into the store"""
+    db = SessionLocal()
+    migrated = {}  # old path -> blob, in case several rows share a file
+    missing = 0
+    try:
+        for model, owner_type, fields in DOCUMENT_OWNERS:
+            for row in db.query(model).order_by(model.id).all():
+                for field in fields:
+                    old_path = getattr(row, field)
+                    if not old_path or document_store.is_store_path(old_path):
+                        continue
+
+                    blob = migrated.get(old_path)
+                    if blob is None:
+                        if not os.path.exists(old_path):
+                            print(f"   - {owner_type} {row.id} {field}: file not found ({old_path})")
+                            missing += 1
+                            continue
+
+                        with open(old_path, "rb") as source:
+                            blob = document_store.save(db, source)
+                        migrated[old_path] = blob
+
+                    document_store.attach(db, blob, owner_type, row.id, field)
+                    setattr(row, field, blob.path)
+
+                db.commit()
+
+        # Every row now points into the store: the legacy files can go
+        for old_path in migrated:
+            os.remove(old_path)
+
+        unique_blobs = len({blob.sha256 for blob in migrated.values()})
+        print(f"Successfully moved {len(migrated)} file(s) into {document_store.root} ({unique_blobs} unique blob(s))")
+        if missing:
+            print(f"{missing} document path(s) point to missing files and were left unchanged")
+
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("Starting uploads migration...")
+    migrate_uploads()
+    print("\nMigration complete!")
@@ -0,0 +1,53 @@
+from logging.config import fileConfig
+from alembic import context
+from app.database import engine, Base
+import app.models  # noqa: F401 - registers every table on Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Full-text search objects are database-specific and created by migration 0007, not from the models
+SEARCH_OBJECTS = ("offres_fts", "search_vector", "ix_offres_search", "ix_offres_fulltext")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave the full-text search objects out of autogenerate"""
+    return not (reflected and compare_to is None and name and name.startswith(SEARCH_OBJECTS))
+
+
+def run_migrations_offline():
+    """Emit the SQL of the migrations instead of running them (alembic upgrade head --sql)"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        render_as_batch=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations against DATABASE_URL, each in its own transaction"""
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite cannot ALTER constraints: autogenerate batch (copy-and-move) operations
+            render_as_batch=True,
+            transaction_per_migration=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,113 @@
+"""
+Helpers for online migrations
+
+Schema changes and data fixes on a live database must not hold long locks:
+indexes are built concurrently where the database supports it, and data
+migrations work in small batches, each committed on its own.
+"""
+from typing import Iterable, Iterator, List, Sequence
+from alembic import context, op
+import sqlalchemy as sa
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def has_table(table_name: str) -> bool:
+    """Check whether a table already exists (databases created before migrations)"""
+    if context.is_offline_mode():
+        # Generating SQL (--sql): written for an empty database
+        return False
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def has_index(table_name: str, index_name: str) -> bool:
+    """Check whether an index already exists on a table"""
+    if context.is_offline_mode():
+        return False
+    indexes = sa.inspect(op.get_bind()).get_indexes(table_name)
+    return any(index["name"] == index_name for index in indexes)
+
+
+def batches(values: Iterable, size: int) -> Iterator[List]:
+    """Split values into lists of at most `size` items"""
+    batch = []
+    for value in values:
+        batch.append(value)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def create_index_online(index_name: str, table_name: str, columns: Sequence[str], unique: bool = False):
+    """
+    Create an index without blocking writes
+
+    PostgreSQL builds it with CREATE INDEX CONCURRENTLY (outside of the
+    migration transaction); MySQL and SQLite build indexes in place.
+    Does nothing if the index already exists.
+    """
+    if has_index(table_name, index_name):
+        return
+
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index(index_name, table_name, list(columns), unique=unique, postgresql_concurrently=True)
+    else:
+        op.create_index(index_name, table_name, list(columns), unique=unique)
+
+
+def drop_index_online(index_name: str, table_name: str):
+    """Drop an index created by create_index_online()"""
+    if not has_index(table_name, index_name):
+        return
+
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+    else:
+        op.drop_index(index_name, table_name=table_name)
+
+
+def batched_delete(table: sa.Table, ids: Sequence[int], batch_size: int = 1000) -> int:
+    """
+    Delete rows by id, `batch_size` rows per statement, each batch committed
+    on its own so locks are held briefly
+
+    Returns:
+        Number of rows deleted
+    """
+    deleted = 0
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for batch in batches(ids, batch_size):
+            deleted += bind.execute(sa.delete(table).where(table.c.id.in_(batch))).rowcount
+    return deleted
+
+
+def batched_update(table: sa.Table, values: dict, where, batch_size: int = 1000) -> int:
+    """
+    UPDATE rows matching `where` in batches of `batch_size` ids (keyset on
+    id), each batch committed on its own
+
+    Returns:
+        Number of rows updated
+    """
+    updated = 0
+    last_id = 0
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        while True:
+            ids = [
+                row_id for (row_id,) in bind.execute(
+                    sa.select(table.c.id).where(where, table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+                )
+            ]
+            if not ids:
+                break
+            last_id = ids[-1]
+            updated += bind.execute(sa.update(table).where(table.c.id.in_(ids)).values(**values)).rowcount
+    return updated
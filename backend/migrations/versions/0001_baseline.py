@@ -0,0 +1,185 @@
+"""Baseline schema
+
+Tables as they were created by Base.metadata.create_all before migrations.
+Databases that already have them are left untouched: run `alembic upgrade
+head` on an existing database and only the missing tables are created.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import has_table
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Enums are stored by member name, as SQLAlchemy does for Enum(PythonEnum)
+user_role = sa.Enum("CANDIDAT", "RECRUTEUR", "ADMIN", name="userrole")
+offre_status = sa.Enum("PENDING", "VALIDATED", "REJECTED", name="offrestatus")
+candidature_status = sa.Enum("INCOMPLETE", "SUBMITTED", "IN_REVIEW", "ACCEPTED", "REJECTED", name="candidaturestatus")
+profile_status = sa.Enum("INCOMPLETE", "PENDING", "VERIFIED", "REJECTED", name="profilestatus")
+diploma_type = sa.Enum("LICENCE", "MASTER", "DEUST", "DUT", "DOCTORAT", name="diplomatype")
+upload_status = sa.Enum("IN_PROGRESS", "COMPLETED", name="uploadstatus")
+
+
+def upgrade():
+    if not has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("username", sa.String(100), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("role", user_role, nullable=False),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    if not has_table("offres"):
+        op.create_table(
+            "offres",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("titre", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("type_formation", sa.String(100)),
+            sa.Column("duree", sa.String(50)),
+            sa.Column("conditions", sa.Text()),
+            sa.Column("status", offre_status, nullable=False),
+            sa.Column("admin_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_offres_id", "offres", ["id"])
+
+    if not has_table("candidatures"):
+        op.create_table(
+            "candidatures",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("candidat_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("offre_id", sa.Integer(), sa.ForeignKey("offres.id"), nullable=False),
+            sa.Column("nom", sa.String(100), nullable=False),
+            sa.Column("prenom", sa.String(100), nullable=False),
+            sa.Column("date_naissance", sa.String(50)),
+            sa.Column("telephone", sa.String(20)),
+            sa.Column("cin_image_path", sa.String(500)),
+            sa.Column("bac_image_path", sa.String(500)),
+            sa.Column("cin_data", sa.JSON()),
+            sa.Column("bac_data", sa.JSON()),
+            sa.Column("status", candidature_status, nullable=False),
+            sa.Column("commentaire", sa.Text()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_candidatures_id", "candidatures", ["id"])
+
+    if not has_table("student_profiles"):
+        op.create_table(
+            "student_profiles",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False, unique=True),
+            sa.Column("nom", sa.String(100), nullable=False),
+            sa.Column("prenom", sa.String(100), nullable=False),
+            sa.Column("date_naissance", sa.Date(), nullable=False),
+            sa.Column("telephone", sa.String(20)),
+            sa.Column("adresse", sa.Text()),
+            sa.Column("cin_image_path", sa.String(255)),
+            sa.Column("bac_image_path", sa.String(255)),
+            sa.Column("releve_notes_path", sa.String(255)),
+            sa.Column("current_diploma", sa.String(50)),
+            sa.Column("cin_data", sa.JSON()),
+            sa.Column("bac_data", sa.JSON()),
+            sa.Column("releve_data", sa.JSON()),
+            sa.Column("profile_status", profile_status, nullable=False),
+            sa.Column("verified_at", sa.DateTime()),
+            sa.Column("rejection_reason", sa.Text()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_student_profiles_id", "student_profiles", ["id"])
+
+    if not has_table("semester_grades"):
+        op.create_table(
+            "semester_grades",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("candidature_id", sa.Integer(), sa.ForeignKey("candidatures.id"), nullable=False),
+            sa.Column("diploma_type", diploma_type, nullable=False),
+            sa.Column("semester_number", sa.Integer(), nullable=False),
+            sa.Column("academic_year", sa.String(10)),
+            sa.Column("average", sa.Float()),
+            sa.Column("grades_detail", sa.JSON()),
+            sa.Column("transcript_path", sa.String(255)),
+            sa.Column("ocr_data", sa.JSON()),
+            sa.Column("is_validated", sa.Boolean()),
+            sa.Column("validated_by", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("validated_at", sa.DateTime()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_semester_grades_id", "semester_grades", ["id"])
+
+    if not has_table("document_blobs"):
+        op.create_table(
+            "document_blobs",
+            sa.Column("sha256", sa.String(64), primary_key=True),
+            sa.Column("path", sa.String(500), nullable=False, unique=True),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("content_type", sa.String(100)),
+            sa.Column("ref_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+
+    if not has_table("document_references"):
+        op.create_table(
+            "document_references",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("owner_type", sa.String(50), nullable=False),
+            sa.Column("owner_id", sa.Integer(), nullable=False),
+            sa.Column("field", sa.String(50), nullable=False),
+            sa.Column("blob_sha256", sa.String(64), sa.ForeignKey("document_blobs.sha256"), nullable=False),
+            sa.Column("expires_at", sa.DateTime()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.UniqueConstraint("owner_type", "owner_id", "field", name="uq_document_reference_owner_field"),
+        )
+        op.create_index("ix_document_references_id", "document_references", ["id"])
+        op.create_index("ix_document_references_blob_sha256", "document_references", ["blob_sha256"])
+
+    if not has_table("upload_sessions"):
+        op.create_table(
+            "upload_sessions",
+            sa.Column("id", sa.String(32), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("filename", sa.String(255)),
+            sa.Column("upload_length", sa.Integer(), nullable=False),
+            sa.Column("upload_offset", sa.Integer(), nullable=False),
+            sa.Column("status", upload_status, nullable=False),
+            sa.Column("blob_sha256", sa.String(64), sa.ForeignKey("document_blobs.sha256")),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_upload_sessions_user_id", "upload_sessions", ["user_id"])
+
+
+def downgrade():
+    for table in [
+        "upload_sessions",
+        "document_references",
+        "document_blobs",
+        "semester_grades",
+        "student_profiles",
+        "candidatures",
+        "offres",
+        "users",
+    ]:
+        op.drop_table(table)
+
+    bind = op.get_bind()
+    for enum in [upload_status, diploma_type, profile_status, candidature_status, offre_status, user_role]:
+        enum.drop(bind, checkfirst=True)
@@ -0,0 +1,197 @@
+"""Composite indexes and uniqueness of applications and semester grades
+
+- candidatures(candidat_id, offre_id) unique: one application per offre,
+  enforced by the database instead of a racy check-then-insert
+- candidatures(offre_id, status), candidatures(status, created_at)
+- semester_grades(candidature_id, semester_number) unique
+- offres(status)
+
+Duplicates left by the race are moved out of the way first, in batches:
+- later applications to the same offre (the first one is kept, with its grades)
+- older rows of the same semester (the latest one is kept)
+
+Nothing is lost: the rows are copied to candidatures_duplicates and
+semester_grades_duplicates (created only when there are duplicates) before
+being removed, and their ids are logged. The document references of the
+moved applications get the owner type "candidature_duplicate", so
+gc_uploads.py keeps their files. Review the copies, then drop the tables
+by hand; a downgrade puts the rows and references back.
+
+Uniqueness is enforced with unique indexes, so it can be built without
+rewriting the table (CONCURRENTLY on PostgreSQL).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+import logging
+from alembic import context, op
+import sqlalchemy as sa
+from migrations.helpers import batched_delete, batches, create_index_online, drop_index_online, has_table
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# table -> where its duplicates are kept
+DUPLICATE_TABLES = {"candidatures": "candidatures_duplicates", "semester_grades": "semester_grades_duplicates"}
+DUPLICATE_OWNER_TYPE = "candidature_duplicate"  # Unknown to gc_uploads.py, which keeps the files
+
+candidatures = sa.table(
+    "candidatures",
+    sa.column("id", sa.Integer),
+    sa.column("candidat_id", sa.Integer),
+    sa.column("offre_id", sa.Integer),
+)
+semester_grades = sa.table(
+    "semester_grades",
+    sa.column("id", sa.Integer),
+    sa.column("candidature_id", sa.Integer),
+    sa.column("semester_number", sa.Integer),
+)
+document_references = sa.table(
+    "document_references",
+    sa.column("owner_type", sa.String),
+    sa.column("owner_id", sa.Integer),
+)
+
+
+def _duplicate_candidature_ids():
+    """Applications made after a first one by the same candidate to the same offre"""
+    first = candidatures.alias("first")
+    return [
+        row_id for (row_id,) in op.get_bind().execute(
+            sa.select(candidatures.c.id).where(
+                sa.exists().where(
+                    first.c.candidat_id == candidatures.c.candidat_id,
+                    first.c.offre_id == candidatures.c.offre_id,
+                    first.c.id < candidatures.c.id
+                )
+            ).order_by(candidatures.c.id)
+        )
+    ]
+
+
+def _duplicate_grade_ids():
+    """Semester rows replaced by a more recent row for the same semester"""
+    latest = semester_grades.alias("latest")
+    return [
+        row_id for (row_id,) in op.get_bind().execute(
+            sa.select(semester_grades.c.id).where(
+                sa.exists().where(
+                    latest.c.candidature_id == semester_grades.c.candidature_id,
+                    latest.c.semester_number == semester_grades.c.semester_number,
+                    latest.c.id > semester_grades.c.id
+                )
+            ).order_by(semester_grades.c.id)
+        )
+    ]
+
+
+def _reflect(table_name):
+    return sa.Table(table_name, sa.MetaData(), autoload_with=op.get_bind())
+
+
+def _set_aside(table_name, ids):
+    """Copy rows to the duplicates table of table_name, each batch committed on its own"""
+    if not ids:
+        return
+    side_name = DUPLICATE_TABLES[table_name]
+
+    if not has_table(side_name):
+        if op.get_context().dialect.name == "mysql":
+            # CREATE TABLE ... AS SELECT is refused with GTID consistency
+            op.execute(f"CREATE TABLE {side_name} LIKE {table_name}")
+        else:
+            op.execute(f"CREATE TABLE {side_name} AS SELECT * FROM {table_name} WHERE 1 = 0")
+
+    table, side = _reflect(table_name), _reflect(side_name)
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for batch in batches(ids, 1000):
+            # Rows copied by an interrupted run are not copied twice
+            bind.execute(side.insert().from_select(
+                [column.name for column in table.c],
+                sa.select(table).where(table.c.id.in_(batch), table.c.id.not_in(sa.select(side.c.id)))
+            ))
+
+    logger.warning(
+        "Moved %d duplicate row(s) of %s to %s, ids: %s", len(ids), table_name, side_name, ", ".join(map(str, ids))
+    )
+
+
+def _set_owner_type(ids, old, new):
+    """Move the document references of candidatures ids from owner type old to new"""
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for batch in batches(ids, 1000):
+            bind.execute(sa.update(document_references).where(
+                document_references.c.owner_type == old, document_references.c.owner_id.in_(batch)
+            ).values(owner_type=new))
+
+
+def _remove_duplicates():
+    duplicate_candidatures = _duplicate_candidature_ids()
+    if duplicate_candidatures:
+        grade_ids = [
+            row_id
+            for batch in batches(duplicate_candidatures, 1000)
+            for (row_id,) in op.get_bind().execute(
+                sa.select(semester_grades.c.id).where(semester_grades.c.candidature_id.in_(batch))
+            )
+        ]
+        _set_aside("semester_grades", grade_ids)
+        _set_aside("candidatures", duplicate_candidatures)
+        _set_owner_type(duplicate_candidatures, "candidature", DUPLICATE_OWNER_TYPE)
+        batched_delete(semester_grades, grade_ids)
+        batched_delete(candidatures, duplicate_candidatures)
+
+    duplicate_grades = _duplicate_grade_ids()
+    _set_aside("semester_grades", duplicate_grades)
+    batched_delete(semester_grades, duplicate_grades)
+
+
+def _restore_duplicates():
+    """Put the rows set aside by upgrade() back, then drop their tables"""
+    bind = op.get_bind()
+    # Candidatures first: grades point to them
+    for table_name, side_name in DUPLICATE_TABLES.items():
+        if not has_table(side_name):
+            continue
+        table, side = _reflect(table_name), _reflect(side_name)
+        columns = [column.name for column in table.c]
+        bind.execute(table.insert().from_select(
+            columns, sa.select(*[side.c[name] for name in columns]).where(side.c.id.not_in(sa.select(table.c.id)))
+        ))
+        if table_name == "candidatures":
+            restored = [row_id for (row_id,) in bind.execute(sa.select(side.c.id))]
+            _set_owner_type(restored, DUPLICATE_OWNER_TYPE, "candidature")
+        op.drop_table(side_name)
+
+
+def upgrade():
+    # Data can only be inspected against a live database, not when generating SQL
+    if not context.is_offline_mode():
+        _remove_duplicates()
+
+    create_index_online("uq_candidatures_candidat_offre", "candidatures", ["candidat_id", "offre_id"], unique=True)
+    create_index_online("ix_candidatures_offre_status", "candidatures", ["offre_id", "status"])
+    create_index_online("ix_candidatures_status_created_at", "candidatures", ["status", "created_at"])
+    create_index_online(
+        "uq_semester_grades_candidature_semester", "semester_grades", ["candidature_id", "semester_number"], unique=True
+    )
+    create_index_online("ix_offres_status", "offres", ["status"])
+
+
+def downgrade():
+    drop_index_online("ix_offres_status", "offres")
+    drop_index_online("uq_semester_grades_candidature_semester", "semester_grades")
+    drop_index_online("ix_candidatures_status_created_at", "candidatures")
+    drop_index_online("ix_candidatures_offre_status", "candidatures")
+    drop_index_online("uq_candidatures_candidat_offre", "candidatures")
+
+    if not context.is_offline_mode():
+        _restore_duplicates()
@@ -0,0 +1,41 @@
+"""Indexes for keyset pagination on (created_at, id)
+
+Lists are paginated by (created_at, id). Rows created before created_at
+had a default may hold NULL, which a keyset comparison never returns:
+those are set to the migration time first, in batches.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from datetime import datetime
+from alembic import context
+import sqlalchemy as sa
+from migrations.helpers import batched_update, create_index_online, drop_index_online
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+PAGINATED_TABLES = ["users", "offres", "candidatures"]
+
+
+def upgrade():
+    if not context.is_offline_mode():
+        now = datetime.utcnow()
+        for table_name in PAGINATED_TABLES:
+            table = sa.table(table_name, sa.column("id", sa.Integer), sa.column("created_at", sa.DateTime))
+            batched_update(table, {"created_at": now}, table.c.created_at.is_(None))
+
+    create_index_online("ix_users_created_at_id", "users", ["created_at", "id"])
+    create_index_online("ix_users_role_created_at_id", "users", ["role", "created_at", "id"])
+    create_index_online("ix_offres_created_at_id", "offres", ["created_at", "id"])
+    create_index_online("ix_candidatures_created_at_id", "candidatures", ["created_at", "id"])
+
+
+def downgrade():
+    drop_index_online("ix_candidatures_created_at_id", "candidatures")
+    drop_index_online("ix_offres_created_at_id", "offres")
+    drop_index_online("ix_users_role_created_at_id", "users")
+    drop_index_online("ix_users_created_at_id", "users")
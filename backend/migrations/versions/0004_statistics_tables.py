@@ -0,0 +1,114 @@
+"""Statistics tables for /admin/statistics
+
+- diploma_statistics: students, verified profiles and semester averages per diploma
+- candidature_statistics: candidatures per offre and status
+
+The application keeps them up to date on every flush; they are filled
+here from the existing rows (rebuild_statistics.py does the same later).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from datetime import datetime
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+student_profiles = sa.table(
+    "student_profiles",
+    sa.column("id", sa.Integer),
+    sa.column("current_diploma", sa.String),
+    sa.column("profile_status", sa.String),
+)
+semester_grades = sa.table(
+    "semester_grades",
+    sa.column("id", sa.Integer),
+    sa.column("diploma_type", sa.String),
+    sa.column("average", sa.Float),
+)
+candidatures = sa.table(
+    "candidatures",
+    sa.column("id", sa.Integer),
+    sa.column("offre_id", sa.Integer),
+    sa.column("status", sa.String),
+)
+
+
+def _fill(diploma_statistics, candidature_statistics):
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    diplomas = {}
+
+    def diploma(name):
+        return diplomas.setdefault(name, {
+            "diploma": name, "students_count": 0, "verified_count": 0,
+            "grades_count": 0, "grades_sum": 0.0, "updated_at": now
+        })
+
+    current_diploma = sa.func.coalesce(student_profiles.c.current_diploma, "")
+    for name, students, verified in bind.execute(
+        sa.select(
+            current_diploma,
+            sa.func.count(student_profiles.c.id),
+            sa.func.sum(sa.case((student_profiles.c.profile_status == "VERIFIED", 1), else_=0))
+        ).group_by(current_diploma)
+    ):
+        diploma(name).update(students_count=students, verified_count=verified or 0)
+
+    # Enums are stored by member name, statistics use the value (its lowercase)
+    for diploma_type, count, total in bind.execute(
+        sa.select(
+            semester_grades.c.diploma_type,
+            sa.func.count(semester_grades.c.id),
+            sa.func.sum(semester_grades.c.average)
+        ).where(semester_grades.c.average.isnot(None)).group_by(semester_grades.c.diploma_type)
+    ):
+        diploma(diploma_type.lower()).update(grades_count=count, grades_sum=total)
+
+    counts = [
+        {"offre_id": offre_id, "status": status.lower(), "candidatures_count": count, "updated_at": now}
+        for offre_id, status, count in bind.execute(
+            sa.select(
+                candidatures.c.offre_id,
+                candidatures.c.status,
+                sa.func.count(candidatures.c.id)
+            ).group_by(candidatures.c.offre_id, candidatures.c.status)
+        )
+    ]
+
+    if diplomas:
+        op.bulk_insert(diploma_statistics, list(diplomas.values()))
+    if counts:
+        op.bulk_insert(candidature_statistics, counts)
+
+
+def upgrade():
+    diploma_statistics = op.create_table(
+        "diploma_statistics",
+        sa.Column("diploma", sa.String(50), primary_key=True),
+        sa.Column("students_count", sa.Integer(), nullable=False),
+        sa.Column("verified_count", sa.Integer(), nullable=False),
+        sa.Column("grades_count", sa.Integer(), nullable=False),
+        sa.Column("grades_sum", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    candidature_statistics = op.create_table(
+        "candidature_statistics",
+        sa.Column("offre_id", sa.Integer(), primary_key=True),
+        sa.Column("status", sa.String(20), primary_key=True),
+        sa.Column("candidatures_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    if not context.is_offline_mode():
+        _fill(diploma_statistics, candidature_statistics)
+
+
+def downgrade():
+    op.drop_table("candidature_statistics")
+    op.drop_table("diploma_statistics")
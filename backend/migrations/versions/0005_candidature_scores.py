@@ -0,0 +1,63 @@
+"""Grade count and average stored on candidatures
+
+- candidatures.grades_count, candidatures.average_total (average of the
+  semesters that have one), maintained by the application on grade writes
+- candidatures(offre_id, average_total) and (average_total) to sort and
+  filter by average
+
+Existing candidatures with grades are scored in batches.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from migrations.helpers import batched_update, create_index_online, drop_index_online
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+candidatures = sa.table(
+    "candidatures",
+    sa.column("id", sa.Integer),
+    sa.column("grades_count", sa.Integer),
+    sa.column("average_total", sa.Float),
+)
+semester_grades = sa.table(
+    "semester_grades",
+    sa.column("id", sa.Integer),
+    sa.column("candidature_id", sa.Integer),
+    sa.column("average", sa.Float),
+)
+
+
+def upgrade():
+    with op.batch_alter_table("candidatures") as batch:
+        batch.add_column(sa.Column("grades_count", sa.Integer(), server_default="0", nullable=False))
+        batch.add_column(sa.Column("average_total", sa.Float()))
+
+    if not context.is_offline_mode():
+        grades = sa.select(semester_grades.c.id).where(semester_grades.c.candidature_id == candidatures.c.id)
+        batched_update(
+            candidatures,
+            {
+                "grades_count": grades.with_only_columns(sa.func.count(semester_grades.c.id)).scalar_subquery(),
+                "average_total": grades.with_only_columns(sa.func.avg(semester_grades.c.average)).scalar_subquery(),
+            },
+            sa.exists(grades)
+        )
+
+    create_index_online("ix_candidatures_offre_average", "candidatures", ["offre_id", "average_total"])
+    create_index_online("ix_candidatures_average", "candidatures", ["average_total"])
+
+
+def downgrade():
+    drop_index_online("ix_candidatures_average", "candidatures")
+    drop_index_online("ix_candidatures_offre_average", "candidatures")
+
+    with op.batch_alter_table("candidatures") as batch:
+        batch.drop_column("average_total")
+        batch.drop_column("grades_count")
@@ -0,0 +1,159 @@
+"""Move the bulky part of OCR results to a compressed document_results table
+
+Candidatures and student profiles keep only the compact part of each
+OCR result (success, verified_fields, confidence, error, verification) in
+their *_data columns; the rest (extracted text) is stored zstd-compressed
+in document_results, keyed by (owner_type, owner_id, field).
+
+Existing rows are moved in batches, each committed on its own.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+import json
+from datetime import datetime
+from alembic import context, op
+import sqlalchemy as sa
+import zstandard
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+COMPACT_KEYS = ("success", "verified_fields", "confidence", "error", "verification")
+
+# owner_type -> (table, OCR result columns)
+OWNERS = {
+    "candidature": ("candidatures", ["cin_data", "bac_data"]),
+    "student_profile": ("student_profiles", ["cin_data", "bac_data", "releve_data"]),
+}
+
+document_results = sa.table(
+    "document_results",
+    sa.column("id", sa.Integer),
+    sa.column("owner_type", sa.String),
+    sa.column("owner_id", sa.Integer),
+    sa.column("field", sa.String),
+    sa.column("codec", sa.String),
+    sa.column("size", sa.Integer),
+    sa.column("payload", sa.LargeBinary),
+    sa.column("created_at", sa.DateTime),
+    sa.column("updated_at", sa.DateTime),
+)
+
+
+def _owner_table(table_name, fields):
+    return sa.table(table_name, sa.column("id", sa.Integer), *[sa.column(field, sa.JSON) for field in fields])
+
+
+def _iter_batches(table, batch_size=500):
+    """Rows of a table by id, in batches; each statement commits on its own"""
+    bind = op.get_bind()
+    last_id = 0
+    with op.get_context().autocommit_block():
+        while True:
+            rows = bind.execute(
+                sa.select(table).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            yield rows
+
+
+def _move_out(owner_type, table_name, fields):
+    """
+    Compress the bulky part of each result into document_results, then
+    compact the owner row. Results are written first and existing ones
+    skipped, so an interrupted run can simply be started again.
+    """
+    table = _owner_table(table_name, fields)
+    bind = op.get_bind()
+    now = datetime.utcnow()
+
+    for rows in _iter_batches(table):
+        moved = {
+            (owner_id, field) for owner_id, field in bind.execute(
+                sa.select(document_results.c.owner_id, document_results.c.field).where(
+                    document_results.c.owner_type == owner_type,
+                    document_results.c.owner_id.in_([row["id"] for row in rows])
+                )
+            )
+        }
+        results = []
+        compacted = {}
+        for row in rows:
+            for field in fields:
+                data = row[field]
+                if not isinstance(data, dict):
+                    continue
+                bulky = {key: value for key, value in data.items() if key not in COMPACT_KEYS}
+                if not bulky:
+                    continue
+                if (row["id"], field) not in moved:
+                    encoded = json.dumps(bulky, ensure_ascii=False).encode("utf-8")
+                    results.append({
+                        "owner_type": owner_type, "owner_id": row["id"], "field": field, "codec": "zstd",
+                        "size": len(encoded), "payload": zstandard.compress(encoded, 3),
+                        "created_at": now, "updated_at": now
+                    })
+                compacted.setdefault(row["id"], {})[field] = {
+                    key: value for key, value in data.items() if key in COMPACT_KEYS
+                }
+
+        if results:
+            bind.execute(sa.insert(document_results), results)
+        for owner_id, values in compacted.items():
+            bind.execute(sa.update(table).where(table.c.id == owner_id).values(**values))
+
+
+def _move_back(owner_type, table_name, fields):
+    table = _owner_table(table_name, fields)
+    bind = op.get_bind()
+
+    for rows in _iter_batches(table):
+        stored = {}
+        for result in bind.execute(
+            sa.select(document_results).where(
+                document_results.c.owner_type == owner_type,
+                document_results.c.owner_id.in_([row["id"] for row in rows])
+            )
+        ).mappings():
+            stored.setdefault(result["owner_id"], {})[result["field"]] = json.loads(zstandard.decompress(result["payload"]))
+        for row in rows:
+            if row["id"] in stored:
+                bind.execute(sa.update(table).where(table.c.id == row["id"]).values(**{
+                    field: {**(row[field] or {}), **bulky} for field, bulky in stored[row["id"]].items()
+                }))
+
+
+def upgrade():
+    op.create_table(
+        "document_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("owner_type", sa.String(50), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("field", sa.String(50), nullable=False),
+        sa.Column("codec", sa.String(10), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.UniqueConstraint("owner_type", "owner_id", "field", name="uq_document_result_owner_field"),
+    )
+    op.create_index("ix_document_results_id", "document_results", ["id"])
+
+    if not context.is_offline_mode():
+        for owner_type, (table_name, fields) in OWNERS.items():
+            _move_out(owner_type, table_name, fields)
+
+
+def downgrade():
+    if not context.is_offline_mode():
+        for owner_type, (table_name, fields) in OWNERS.items():
+            _move_back(owner_type, table_name, fields)
+
+    op.drop_index("ix_document_results_id", table_name="document_results")
+    op.drop_table("document_results")
@@ -0,0 +1,107 @@
+"""Full-text index over offres (titre, description, conditions)
+
+Accent-insensitive, kept in sync with the offres rows by the database:
+- SQLite: FTS5 table offres_fts (external content, unicode61 tokenizer
+  without diacritics), updated by triggers on insert, update and delete.
+  A batch migration of offres rebuilds the table, which drops the
+  triggers: it must create them again (SQLITE_TRIGGERS).
+- PostgreSQL: generated column offres.search_vector with a GIN index,
+  French stemming after unaccent (text search configuration french_unaccent).
+  Adding the column rewrites offres once.
+- MySQL: FULLTEXT index, accents are ignored by the utf8mb4_unicode_ci collation.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+from migrations.helpers import has_index, has_table
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = {
+    "offres_fts_insert": """
+        CREATE TRIGGER offres_fts_insert AFTER INSERT ON offres BEGIN
+            INSERT INTO offres_fts (rowid, titre, description, conditions)
+            VALUES (new.id, new.titre, new.description, new.conditions);
+        END
+    """,
+    "offres_fts_delete": """
+        CREATE TRIGGER offres_fts_delete AFTER DELETE ON offres BEGIN
+            INSERT INTO offres_fts (offres_fts, rowid, titre, description, conditions)
+            VALUES ('delete', old.id, old.titre, old.description, old.conditions);
+        END
+    """,
+    "offres_fts_update": """
+        CREATE TRIGGER offres_fts_update AFTER UPDATE OF titre, description, conditions ON offres BEGIN
+            INSERT INTO offres_fts (offres_fts, rowid, titre, description, conditions)
+            VALUES ('delete', old.id, old.titre, old.description, old.conditions);
+            INSERT INTO offres_fts (rowid, titre, description, conditions)
+            VALUES (new.id, new.titre, new.description, new.conditions);
+        END
+    """,
+}
+
+
+def create_sqlite_index():
+    """Create the FTS5 table if needed, (re)create its triggers and rebuild it from offres"""
+    if not has_table("offres_fts"):
+        op.execute(
+            "CREATE VIRTUAL TABLE offres_fts USING fts5("
+            "titre, description, conditions, content='offres', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        # Rank by bm25 weighing the title most, then the description
+        op.execute("INSERT INTO offres_fts (offres_fts, rank) VALUES ('rank', 'bm25(4.0, 2.0, 1.0)')")
+    for name, ddl in SQLITE_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(ddl)
+    op.execute("INSERT INTO offres_fts (offres_fts) VALUES ('rebuild')")
+
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+
+    if dialect == "sqlite":
+        create_sqlite_index()
+
+    elif dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute("CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french)")
+        op.execute(
+            "ALTER TEXT SEARCH CONFIGURATION french_unaccent "
+            "ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem"
+        )
+        op.execute(
+            "ALTER TABLE offres ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('french_unaccent', coalesce(titre, '')), 'A') || "
+            "setweight(to_tsvector('french_unaccent', coalesce(description, '')), 'B') || "
+            "setweight(to_tsvector('french_unaccent', coalesce(conditions, '')), 'C')"
+            ") STORED"
+        )
+        with op.get_context().autocommit_block():
+            op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_offres_search ON offres USING gin (search_vector)")
+
+    elif dialect == "mysql":
+        if not has_index("offres", "ix_offres_fulltext"):
+            op.execute("CREATE FULLTEXT INDEX ix_offres_fulltext ON offres (titre, description, conditions)")
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+
+    if dialect == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS offres_fts")
+
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_offres_search")
+        op.execute("ALTER TABLE offres DROP COLUMN IF EXISTS search_vector")
+        op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS french_unaccent")
+
+    elif dialect == "mysql":
+        op.execute("DROP INDEX ix_offres_fulltext ON offres")
@@ -0,0 +1,106 @@
+"""Indexed lookup columns on candidatures and student profiles
+
+- cne, cin_number: identifiers read by OCR (cin_data / bac_data
+  verified_fields), uppercase letters and digits
+- nom_normalized, prenom_normalized: names lowercased, without accents
+  and punctuation
+- indexes on each identifier, on (nom, prenom) and on prenom, for exact
+  and prefix matches
+
+The application fills them on every write (models/identifiers.py);
+existing rows are filled here in batches.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+import re
+import unicodedata
+from alembic import context, op
+import sqlalchemy as sa
+from migrations.helpers import create_index_online, drop_index_online
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+TABLES = ("candidatures", "student_profiles")
+COLUMNS = (("cne", 20), ("cin_number", 20), ("nom_normalized", 100), ("prenom_normalized", 100))
+# index name suffix -> columns
+INDEXES = {
+    "cne": ["cne"],
+    "cin_number": ["cin_number"],
+    "nom_prenom": ["nom_normalized", "prenom_normalized"],
+    "prenom": ["prenom_normalized"],
+}
+
+
+def _normalize_name(value):
+    if not value:
+        return None
+    folded = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.findall(r"[a-z0-9]+", folded))[:100] or None
+
+
+def _extracted(ocr_data, field):
+    value = ((ocr_data or {}).get("verified_fields") or {}).get(field) if isinstance(ocr_data, dict) else None
+    if not value:
+        return None
+    return "".join(re.findall(r"[A-Za-z0-9]", str(value))).upper()[:20] or None
+
+
+def _fill(table_name, batch_size=500):
+    """Compute the lookup columns of every row, each batch committed on its own"""
+    table = sa.table(
+        table_name,
+        sa.column("id", sa.Integer),
+        sa.column("nom", sa.String),
+        sa.column("prenom", sa.String),
+        sa.column("cin_data", sa.JSON),
+        sa.column("bac_data", sa.JSON),
+        *[sa.column(name, sa.String) for name, _ in COLUMNS]
+    )
+    bind = op.get_bind()
+    last_id = 0
+
+    with op.get_context().autocommit_block():
+        while True:
+            rows = bind.execute(
+                sa.select(table.c.id, table.c.nom, table.c.prenom, table.c.cin_data, table.c.bac_data)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            for row in rows:
+                bind.execute(sa.update(table).where(table.c.id == row.id).values(
+                    cne=_extracted(row.bac_data, "cne"),
+                    cin_number=_extracted(row.cin_data, "cin_number"),
+                    nom_normalized=_normalize_name(row.nom),
+                    prenom_normalized=_normalize_name(row.prenom)
+                ))
+
+
+def upgrade():
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name) as batch:
+            for name, length in COLUMNS:
+                batch.add_column(sa.Column(name, sa.String(length)))
+
+        if not context.is_offline_mode():
+            _fill(table_name)
+
+        for suffix, columns in INDEXES.items():
+            create_index_online(f"ix_{table_name}_{suffix}", table_name, columns)
+
+
+def downgrade():
+    for table_name in TABLES:
+        for suffix in INDEXES:
+            drop_index_online(f"ix_{table_name}_{suffix}", table_name)
+
+        with op.batch_alter_table(table_name) as batch:
+            for name, _ in reversed(COLUMNS):
+                batch.drop_column(name)
@@ -0,0 +1,78 @@
+"""Archive tables for the closed candidatures of past campaigns
+
+archived_candidatures / archived_semester_grades receive the accepted and
+rejected candidatures of finished campaigns (archive_candidatures.py),
+keeping their ids.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "archived_candidatures",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("campaign", sa.String(9), nullable=False),
+        sa.Column("candidat_id", sa.Integer(), nullable=False),
+        sa.Column("offre_id", sa.Integer(), nullable=False),
+        sa.Column("offre_titre", sa.String(255)),
+        sa.Column("nom", sa.String(100), nullable=False),
+        sa.Column("prenom", sa.String(100), nullable=False),
+        sa.Column("date_naissance", sa.String(50)),
+        sa.Column("telephone", sa.String(20)),
+        sa.Column("cne", sa.String(20)),
+        sa.Column("cin_number", sa.String(20)),
+        sa.Column("cin_image_path", sa.String(500)),
+        sa.Column("bac_image_path", sa.String(500)),
+        sa.Column("cin_data", sa.JSON()),
+        sa.Column("bac_data", sa.JSON()),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("commentaire", sa.Text()),
+        sa.Column("grades_count", sa.Integer(), nullable=False),
+        sa.Column("average_total", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_archived_candidatures_campaign_created_at_id", "archived_candidatures", ["campaign", "created_at", "id"]
+    )
+    op.create_index("ix_archived_candidatures_offre", "archived_candidatures", ["offre_id"])
+    op.create_index("ix_archived_candidatures_candidat", "archived_candidatures", ["candidat_id"])
+
+    op.create_table(
+        "archived_semester_grades",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("candidature_id", sa.Integer(), sa.ForeignKey("archived_candidatures.id"), nullable=False),
+        sa.Column("diploma_type", sa.String(20), nullable=False),
+        sa.Column("semester_number", sa.Integer(), nullable=False),
+        sa.Column("academic_year", sa.String(10)),
+        sa.Column("average", sa.Float()),
+        sa.Column("grades_detail", sa.JSON()),
+        sa.Column("transcript_path", sa.String(255)),
+        sa.Column("ocr_data", sa.JSON()),
+        sa.Column("is_validated", sa.Boolean()),
+        sa.Column("validated_by", sa.Integer()),
+        sa.Column("validated_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_archived_semester_grades_candidature_id", "archived_semester_grades", ["candidature_id"])
+
+
+def downgrade():
+    op.drop_index("ix_archived_semester_grades_candidature_id", table_name="archived_semester_grades")
+    op.drop_table("archived_semester_grades")
+    op.drop_index("ix_archived_candidatures_candidat", table_name="archived_candidatures")
+    op.drop_index("ix_archived_candidatures_offre", table_name="archived_candidatures")
+    op.drop_index("ix_archived_candidatures_campaign_created_at_id", table_name="archived_candidatures")
+    op.drop_table("archived_candidatures")
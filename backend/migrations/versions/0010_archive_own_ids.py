@@ -0,0 +1,75 @@
+"""Own ids for archived candidatures and grades
+
+Archived rows kept the id of the candidature / semester grade they were
+copied from. Once the original is deleted, SQLite can give that id to a
+new row (INTEGER PRIMARY KEY reuses the highest rowid), and archiving it
+later failed on the primary key. The archive tables now number their rows
+themselves and keep the original id in original_id.
+
+Rows already archived keep their id (documents and OCR results point to
+it) and get it as original_id too; new ids continue after the highest one.
+On downgrade, original_id is dropped and ids stay as they are.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from migrations.helpers import create_index_online, drop_index_online
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+TABLES = ("archived_candidatures", "archived_semester_grades")
+
+
+def _autoincrement_id(table_name):
+    """Let the database number new rows, after the ids already there"""
+    dialect = op.get_context().dialect.name
+
+    if dialect == "postgresql":
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+        op.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table_name}), false)"
+        )
+    elif dialect == "mysql":
+        # The counter starts after the highest id by itself
+        op.execute(f"ALTER TABLE {table_name} MODIFY id INTEGER NOT NULL AUTO_INCREMENT")
+
+
+def upgrade():
+    dialect = op.get_context().dialect.name
+
+    # MySQL refuses to change a column a foreign key points to
+    if dialect == "mysql":
+        op.drop_constraint("archived_semester_grades_ibfk_1", "archived_semester_grades", type_="foreignkey")
+
+    for table_name in TABLES:
+        op.add_column(table_name, sa.Column("original_id", sa.Integer()))
+        op.execute(f"UPDATE {table_name} SET original_id = id")
+
+        # SQLite: the table is rebuilt with AUTOINCREMENT, which never reuses ids
+        with op.batch_alter_table(table_name, table_kwargs={"sqlite_autoincrement": True}) as batch:
+            batch.alter_column("original_id", existing_type=sa.Integer(), nullable=False)
+
+        _autoincrement_id(table_name)
+
+    if dialect == "mysql":
+        op.create_foreign_key(
+            "archived_semester_grades_ibfk_1", "archived_semester_grades", "archived_candidatures",
+            ["candidature_id"], ["id"]
+        )
+
+    create_index_online("ix_archived_candidatures_original_id", "archived_candidatures", ["original_id"])
+
+
+def downgrade():
+    drop_index_online("ix_archived_candidatures_original_id", "archived_candidatures")
+
+    for table_name in reversed(TABLES):
+        with op.batch_alter_table(table_name) as batch:
+            batch.drop_column("original_id")
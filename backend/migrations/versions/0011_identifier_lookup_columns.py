@@ -0,0 +1,110 @@
+"""Identifiers as entered, searched through their own columns
+
+0008 wrote the identifiers read by OCR over cne and cin_number, so the
+CNE a candidate typed was lost whenever the baccalauréat could be read.
+cne and cin_number now keep what was entered; the searched value (read by
+OCR, or else the normalized entered one) goes to cne_lookup and
+cin_number_lookup, which take over the indexes.
+
+Existing rows, in batches:
+- cne_lookup / cin_number_lookup get the values 0008 computed
+- candidatures.cne gets back the typed CNE, kept in the OCR verification
+  report (bac_data.verification.cne.provided) when it was replaced
+- cin_number, and the cne of student profiles, were only ever read by OCR,
+  nothing entered them: they are emptied, their value is in the lookup
+  columns
+
+On downgrade, the lookup values go back to cne and cin_number.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from migrations.helpers import create_index_online, drop_index_online
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+TABLES = ("candidatures", "student_profiles")
+# entered column -> lookup column
+COLUMNS = {"cne": "cne_lookup", "cin_number": "cin_number_lookup"}
+
+
+def _table(table_name):
+    return sa.table(
+        table_name,
+        sa.column("id", sa.Integer),
+        sa.column("bac_data", sa.JSON),
+        *[sa.column(name, sa.String) for pair in COLUMNS.items() for name in pair]
+    )
+
+
+def _typed_cne(bac_data):
+    """The CNE typed by the candidate, from the verification report of the baccalauréat"""
+    if not isinstance(bac_data, dict):
+        return None
+    report = (bac_data.get("verification") or {}).get("cne")
+    return (report or {}).get("provided") or None
+
+
+def _fill(table_name, batch_size=500):
+    """Move the searched values to the lookup columns, each batch committed on its own"""
+    table = _table(table_name)
+    bind = op.get_bind()
+    last_id = 0
+
+    with op.get_context().autocommit_block():
+        while True:
+            rows = bind.execute(
+                sa.select(table.c.id, table.c.bac_data, table.c.cne, table.c.cin_number)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            for row in rows:
+                if table_name == "candidatures":
+                    cne = _typed_cne(row.bac_data) or row.cne
+                else:
+                    cne = None
+                bind.execute(sa.update(table).where(table.c.id == row.id).values(
+                    cne_lookup=row.cne,
+                    cin_number_lookup=row.cin_number,
+                    cne=cne,
+                    cin_number=None
+                ))
+
+
+def upgrade():
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name) as batch:
+            for lookup in COLUMNS.values():
+                batch.add_column(sa.Column(lookup, sa.String(20)))
+
+        if not context.is_offline_mode():
+            _fill(table_name)
+
+        for name, lookup in COLUMNS.items():
+            drop_index_online(f"ix_{table_name}_{name}", table_name)
+            create_index_online(f"ix_{table_name}_{lookup}", table_name, [lookup])
+
+
+def downgrade():
+    for table_name in TABLES:
+        for name, lookup in COLUMNS.items():
+            drop_index_online(f"ix_{table_name}_{lookup}", table_name)
+
+        table = _table(table_name)
+        op.execute(sa.update(table).values(cne=table.c.cne_lookup, cin_number=table.c.cin_number_lookup))
+
+        with op.batch_alter_table(table_name) as batch:
+            for lookup in reversed(list(COLUMNS.values())):
+                batch.drop_column(lookup)
+
+        for name in COLUMNS:
+            create_index_online(f"ix_{table_name}_{name}", table_name, [name])
@@ -0,0 +1,38 @@
+"""
+Rebuild the statistics tables behind /admin/statistics
+
+The tables are updated on every write made through the application. Run
+this after changing candidatures, profiles or grades with raw SQL (or
+restoring a backup) to recompute them, and the grade count and average
+stored on each candidature, from the data.
+
+Usage:
+    python rebuild_statistics.py
+"""
+
+from app.database import SessionLocal
+from app.utils.statistics import rebuild_statistics
+
+
+def rebuild():
+    """Recompute the statistics and print what was written"""
+    db = SessionLocal()
+    try:
+        written = rebuild_statistics(db)
+        db.commit()
+
+        print(f"Diplomas: {written['diploma_statistics']} row(s)")
+        print(f"Candidatures per offre and status: {written['candidature_statistics']} row(s)")
+        print(f"Grade count and average recomputed for {written['candidatures']} candidature(s)")
+
+    except Exception as e:
+        print(f"Error while rebuilding statistics: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("Rebuilding statistics...")
+    rebuild()
+    print("\nStatistics rebuilt!")
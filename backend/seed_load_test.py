@@ -0,0 +1,308 @@
+"""
+Fill the database with a large synthetic dataset for load testing
+
+Generates candidate users with their profiles, offres, candidatures and
+semester grades in realistic proportions (diplomas, statuses, popular
+offres, averages), then recomputes the statistics tables. Rows are written
+with Core insert() in large batches, without the ORM, so a few million
+rows load in minutes. Ids follow the rows already there: run it on an
+empty or disposable database, never in production.
+
+Usage:
+    python seed_load_test.py [--users 200000] [--offres 2000] [--candidatures 1000000]
+                             [--grades 5000000] [--batch-size 10000] [--seed 42]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, insert, select, text
+from app.database import SessionLocal
+from app.models import (
+    Candidature, CandidatureStatus, DiplomaType, Offre, OffreStatus, ProfileStatus, SemesterGrade,
+    StudentProfile, User, UserRole
+)
+from app.models.identifiers import normalize_name
+from app.utils.auth import get_password_hash
+from app.utils.statistics import rebuild_statistics
+
+PASSWORD = "password123"  # Of every generated user
+SPAN = timedelta(days=730)  # Rows are spread over the last two years, in id order
+
+# Diploma: (share of students, semesters)
+DIPLOMAS = {
+    DiplomaType.LICENCE: (0.55, 6),
+    DiplomaType.MASTER: (0.25, 4),
+    DiplomaType.DUT: (0.08, 4),
+    DiplomaType.DEUST: (0.07, 4),
+    DiplomaType.DOCTORAT: (0.05, 3),
+}
+DIPLOMA_SHARES = {diploma: share for diploma, (share, _) in DIPLOMAS.items()}
+PROFILE_STATUSES = {
+    ProfileStatus.VERIFIED: 0.60, ProfileStatus.PENDING: 0.25,
+    ProfileStatus.INCOMPLETE: 0.10, ProfileStatus.REJECTED: 0.05,
+}
+OFFRE_STATUSES = {OffreStatus.VALIDATED: 0.90, OffreStatus.PENDING: 0.07, OffreStatus.REJECTED: 0.03}
+# Of the candidatures with grades; those without stay incomplete
+CANDIDATURE_STATUSES = {
+    CandidatureStatus.SUBMITTED: 0.40, CandidatureStatus.IN_REVIEW: 0.25,
+    CandidatureStatus.ACCEPTED: 0.15, CandidatureStatus.REJECTED: 0.20,
+}
+PROFILE_SHARE = 0.85  # Candidates who completed their profile
+INCOMPLETE_SHARE = 0.10  # Candidatures without any grade yet
+
+NOMS = [
+    "Alami", "Benali", "El Amrani", "Bennani", "Tazi", "Idrissi", "Chraibi", "Berrada", "El Fassi",
+    "Aït-Brahim", "Ouazzani", "Lahlou", "Sqalli", "Benjelloun", "El Khatib", "Boukhari", "Zniber",
+    "Hajji", "Naciri", "Mernissi", "Amrani", "Cherkaoui", "Ziani", "Belhaj", "Kettani", "Filali",
+]
+PRENOMS = [
+    "Sara", "Youssef", "Fatima-Zahra", "Mohammed", "Salma", "Omar", "Imane", "Hamza", "Khadija",
+    "Mehdi", "Aya", "Ayoub", "Hajar", "Anas", "Meryem", "Yassine", "Zineb", "Amine", "Houda",
+    "Ilyas", "Nour", "Reda", "Soukaïna", "Adam", "Chaïmae", "Ismaïl", "Ghita", "Achraf",
+]
+FIELDS = [
+    "Informatique", "Mathématiques appliquées", "Génie civil", "Économie", "Biologie", "Physique",
+    "Chimie", "Droit", "Gestion", "Génie électrique", "Data Science", "Génie logiciel",
+    "Finance", "Énergies renouvelables", "Réseaux et télécommunications", "Génie industriel",
+]
+CITIES = ["Rabat", "Casablanca", "Fès", "Marrakech", "Agadir", "Tanger", "Oujda", "Meknès", "Kénitra", "Tétouan"]
+
+
+class Generator:
+    """Random rows, reproducible from the seed"""
+
+    def __init__(self, seed: int, start: datetime):
+        self.random = random.Random(seed)
+        self.start = start
+
+    def pick(self, weights: dict):
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def moment(self, index: int, count: int) -> datetime:
+        """Creation date of the index-th of count rows, increasing with the index"""
+        offset = SPAN * (index / max(count, 1)) + timedelta(seconds=self.random.randint(0, 3600))
+        return self.start + offset
+
+    def average(self, level: float) -> float:
+        return round(min(20.0, max(0.0, self.random.gauss(level, 1.2))), 2)
+
+
+def _identity(user_id: int) -> dict:
+    """Name and identifiers of a candidate, the same in the profile and every candidature"""
+    nom, prenom = NOMS[user_id % len(NOMS)], PRENOMS[(user_id // len(NOMS)) % len(PRENOMS)]
+    return {
+        "nom": nom,
+        "prenom": prenom,
+        "nom_normalized": normalize_name(nom),
+        "prenom_normalized": normalize_name(prenom),
+        # Unique per candidate, shaped like the real ones (letter + digits)
+        "cne": f"{chr(65 + user_id % 26)}{user_id * 7919 % 10 ** 9:09d}",
+        "cin_number": f"{chr(65 + user_id // 26 % 26)}{chr(65 + user_id % 26)}{user_id % 10 ** 6:06d}",
+    }
+
+
+def _birth_date(user_id: int) -> date:
+    return date(1995 + user_id % 12, 1 + user_id // 12 % 12, 1 + user_id % 28)
+
+
+def _next_id(db, model) -> int:
+    return (db.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _write(db, model, rows: list, counts: dict):
+    """Insert a batch with a single executemany, bypassing the ORM"""
+    if rows:
+        db.execute(insert(model.__table__), rows)
+        counts[model.__tablename__] += len(rows)
+        rows.clear()
+
+
+def seed(users: int, offres: int, candidatures: int, grades: int, batch_size: int, seed_value: int):
+    """Generate and load the dataset, printing the rows written per table"""
+    if candidatures > users * offres:
+        print("Error: more candidatures than (candidate, offre) pairs")
+        return
+
+    db = SessionLocal()
+    started = time.monotonic()
+    generator = Generator(seed_value, datetime.utcnow() - SPAN)
+    counts = {model.__tablename__: 0 for model in (User, StudentProfile, Offre, Candidature, SemesterGrade)}
+    try:
+        hashed_password = get_password_hash(PASSWORD)  # bcrypt is slow: hashed once for everyone
+        admins = max(1, offres // 100)
+        first_user = _next_id(db, User)
+        first_offre = _next_id(db, Offre)
+        profile_id = _next_id(db, StudentProfile)
+        candidature_id = _next_id(db, Candidature)
+        grade_id = _next_id(db, SemesterGrade)
+
+        # Users: a few admins owning the offres, then the candidates with their profiles
+        user_rows, profile_rows, diplomas = [], [], []
+        for index in range(admins + users):
+            user_id = first_user + index
+            is_admin = index < admins
+            user_rows.append({
+                "id": user_id,
+                "email": f"{'admin' if is_admin else 'candidat'}{user_id}@load.example.com",
+                "username": f"{'admin' if is_admin else 'candidat'}{user_id}",
+                "hashed_password": hashed_password,
+                "role": UserRole.ADMIN if is_admin else UserRole.CANDIDAT,
+                "is_active": True,
+                "created_at": generator.moment(index, admins + users),
+            })
+
+            diploma = generator.pick(DIPLOMA_SHARES)
+            diplomas.append(diploma)
+            if not is_admin and generator.random.random() < PROFILE_SHARE:
+                identity = _identity(user_id)
+                profile_rows.append({
+                    "id": profile_id,
+                    "user_id": user_id,
+                    **identity,
+                    "date_naissance": _birth_date(user_id),
+                    "telephone": f"06{generator.random.randint(0, 10 ** 8 - 1):08d}",
+                    "current_diploma": diploma.value,
+                    "profile_status": generator.pick(PROFILE_STATUSES),
+                    "created_at": user_rows[-1]["created_at"],
+                    "updated_at": user_rows[-1]["created_at"],
+                })
+                profile_id += 1
+
+            if len(user_rows) >= batch_size:
+                _write(db, User, user_rows, counts)
+                _write(db, StudentProfile, profile_rows, counts)
+                db.commit()
+        _write(db, User, user_rows, counts)
+        _write(db, StudentProfile, profile_rows, counts)
+        db.commit()
+        print(f"Users: {counts['users']}, profiles: {counts['student_profiles']} ({time.monotonic() - started:.0f}s)")
+
+        offre_rows = []
+        for index in range(offres):
+            diploma = generator.pick(DIPLOMA_SHARES)
+            field, city = generator.random.choice(FIELDS), generator.random.choice(CITIES)
+            created_at = generator.moment(index, offres)
+            offre_rows.append({
+                "id": first_offre + index,
+                "titre": f"{diploma.value.capitalize()} {field} - {city}",
+                "description": f"Formation en {field.lower()} à {city}, stages en entreprise et projet de fin d'études.",
+                "type_formation": diploma.value.capitalize(),
+                "duree": f"{DIPLOMAS[diploma][1] // 2 or 1} ans",
+                "conditions": f"Dossier et moyenne des semestres, places limitées ({generator.random.randint(20, 200)})",
+                "status": generator.pick(OFFRE_STATUSES),
+                "admin_id": first_user + index % admins,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            if len(offre_rows) >= batch_size:
+                _write(db, Offre, offre_rows, counts)
+                db.commit()
+        _write(db, Offre, offre_rows, counts)
+        db.commit()
+        print(f"Offres: {counts['offres']} ({time.monotonic() - started:.0f}s)")
+
+        # Candidatures per candidate, the same on average but not for everyone
+        per_candidate = [0] * users
+        for _ in range(candidatures):
+            per_candidate[generator.random.randrange(users)] += 1
+        grades_per_candidature = grades / candidatures if candidatures else 0
+
+        candidature_rows, grade_rows = [], []
+        written = 0
+        for index, count in enumerate(per_candidate):
+            user_id = first_user + admins + index
+            identity = _identity(user_id)
+            _, semesters = DIPLOMAS[diplomas[admins + index]]
+            level = generator.random.gauss(12.5, 2.0)  # How good the candidate is
+
+            # A few offres get most of the candidatures
+            chosen = set()
+            while len(chosen) < min(count, offres):
+                chosen.add(int(offres * generator.random.random() ** 2))
+
+            for offre_index in sorted(chosen):
+                created_at = generator.moment(written, candidatures)
+                written += 1
+
+                graded = 0
+                if generator.random.random() >= INCOMPLETE_SHARE:
+                    mean = grades_per_candidature / (1 - INCOMPLETE_SHARE)
+                    graded = min(semesters, max(1, round(generator.random.gauss(mean, 1))))
+                    graded = min(graded, max(0, grades - counts["semester_grades"] - len(grade_rows)))
+                status = generator.pick(CANDIDATURE_STATUSES) if graded else CandidatureStatus.INCOMPLETE
+
+                averages = [generator.average(level) for _ in range(graded)]
+                for number, average in enumerate(averages, 1):
+                    year = created_at.year - (graded - number) // 2 - 1
+                    grade_rows.append({
+                        "id": grade_id,
+                        "candidature_id": candidature_id,
+                        "diploma_type": diplomas[admins + index],
+                        "semester_number": number,
+                        "academic_year": f"{year}-{year + 1}",
+                        "average": average,
+                        "is_validated": status in (CandidatureStatus.ACCEPTED, CandidatureStatus.REJECTED),
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                    })
+                    grade_id += 1
+
+                candidature_rows.append({
+                    "id": candidature_id,
+                    "candidat_id": user_id,
+                    "offre_id": first_offre + offre_index,
+                    **identity,
+                    "date_naissance": _birth_date(user_id).isoformat(),
+                    "status": status,
+                    "grades_count": graded,
+                    "average_total": round(sum(averages) / graded, 2) if graded else None,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+                candidature_id += 1
+
+            if len(candidature_rows) >= batch_size or len(grade_rows) >= batch_size:
+                _write(db, Candidature, candidature_rows, counts)  # Before the grades pointing to them
+                _write(db, SemesterGrade, grade_rows, counts)
+                db.commit()
+        _write(db, Candidature, candidature_rows, counts)
+        _write(db, SemesterGrade, grade_rows, counts)
+        db.commit()
+        print(f"Candidatures: {counts['candidatures']}, semester grades: {counts['semester_grades']} "
+              f"({time.monotonic() - started:.0f}s)")
+
+        if db.get_bind().dialect.name == "postgresql":
+            # Ids were given explicitly: move the sequences past them
+            for table in counts:
+                db.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+                ))
+
+        # Core inserts bypass the listeners maintaining the statistics tables
+        rebuild_statistics(db)
+        db.commit()
+        print(f"Statistics rebuilt ({time.monotonic() - started:.0f}s)")
+        print(f"Every generated user logs in with the password '{PASSWORD}'")
+
+    except Exception as e:
+        print(f"Error while seeding: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load a large synthetic dataset for load testing")
+    parser.add_argument("--users", type=int, default=200000, help="Candidates to create")
+    parser.add_argument("--offres", type=int, default=2000, help="Offres to create")
+    parser.add_argument("--candidatures", type=int, default=1000000, help="Candidatures to create")
+    parser.add_argument("--grades", type=int, default=5000000, help="Semester grades to create (at most)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per insert")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, the same dataset for the same value")
+    args = parser.parse_args()
+
+    print("Seeding load test data...")
+    seed(args.users, args.offres, args.candidatures, args.grades, args.batch_size, args.seed)
+    print("\nSeeding complete!")
@@ -0,0 +1,103 @@
+"""
+Test configuration
+
+The app reads its settings when it is imported, so they are set here first.
+DATABASE_URL is a scratch SQLite file unless one is given (e.g. a PostgreSQL
+test database); it is migrated to head before the tests run.
+"""
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="school-enrollment-tests-")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{WORK_DIR}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-test-secret-key-1234")
+os.environ.setdefault("DATABASE_READ_MAX_STALENESS", "1")  # Short read-your-writes window
+
+
+def alembic(database_url: str, *args: str) -> subprocess.CompletedProcess:
+    """Run an alembic command on a database"""
+    return subprocess.run(
+        [sys.executable, "-m", "alembic", "-c", os.path.join(BACKEND_DIR, "alembic.ini"), *args],
+        env={**os.environ, "DATABASE_URL": database_url},
+        check=True,
+        capture_output=True,
+        text=True
+    )
+
+
+def migrate(database_url: str):
+    """alembic upgrade head on a database"""
+    alembic(database_url, "upgrade", "head")
+
+
+def new_user(role: str = "candidat"):
+    """A User row with a unique email, to add to a session"""
+    from app.models import User, UserRole
+
+    name = f"{role}-{uuid.uuid4().hex[:12]}"
+    return User(email=f"{name}@example.com", username=name, hashed_password="-", role=UserRole(role))
+
+
+def new_offre(titre: str = "Licence Informatique", description: str = "Développement logiciel", **columns):
+    """An Offre row with a new admin, to add to a session"""
+    from app.models import Offre
+
+    return Offre(titre=titre, description=description, admin=new_user("admin"), **columns)
+
+
+def image_bytes(size=(320, 240), fmt: str = "JPEG") -> bytes:
+    """A valid image of random pixels: never the same bytes twice (the document store deduplicates)"""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+migrate(os.environ["DATABASE_URL"])
+
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(WORK_DIR)  # uploads/ is created in the working directory
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    """Sync session on DATABASE_URL, as used by scripts and background tasks"""
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def register(client):
+    """Register a user with a unique email and return its Authorization header"""
+
+    def register(role: str = "candidat") -> dict:
+        name = f"{role}-{uuid.uuid4().hex[:12]}"
+        response = client.post("/auth/register", json={
+            "email": f"{name}@example.com", "username": name, "password": "password123", "role": role
+        })
+        assert response.status_code == 201, response.text
+
+        response = client.post("/auth/login", data={"username": f"{name}@example.com", "password": "password123"})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return register
@@ -0,0 +1,54 @@
+def test_health(client):
+    assert client.get("/health").json() == {"status": "healthy"}
+
+
+def test_offre_lifecycle(client, register):
+    admin = register("admin")
+    candidat = register()
+
+    response = client.post("/offres/", json={
+        "titre": "Licence Informatique",
+        "description": "Développement logiciel et bases de données",
+        "conditions": "Baccalauréat"
+    }, headers=admin)
+    assert response.status_code == 201, response.text
+    offre_id = response.json()["id"]
+
+    response = client.get(f"/offres/{offre_id}", headers=admin)
+    assert response.status_code == 200
+    assert response.json()["titre"] == "Licence Informatique"
+
+    assert client.get("/admin/users", headers=candidat).status_code == 403
+    assert client.delete(f"/offres/{offre_id}", headers=admin).status_code == 204
+
+
+def test_student_grades(client, register, db):
+    from datetime import date
+    from conftest import new_offre, new_user
+    from app.models import Candidature, DiplomaType, SemesterGrade, StudentProfile
+
+    student = new_user()
+    profile = StudentProfile(user=student, nom="Amrani", prenom="Hiba", date_naissance=date(2003, 1, 2))
+    candidature = Candidature(
+        candidat=student, offre=new_offre(), nom="Amrani", prenom="Hiba",
+        semester_grades=[
+            SemesterGrade(diploma_type=DiplomaType.LICENCE, semester_number=2, average=13.0, is_validated=True),
+            SemesterGrade(diploma_type=DiplomaType.LICENCE, semester_number=1, average=15.0),
+        ]
+    )
+    other = Candidature(
+        candidat=new_user(), offre=candidature.offre, nom="Autre", prenom="Candidat",
+        semester_grades=[SemesterGrade(diploma_type=DiplomaType.DUT, semester_number=1, average=8.0)]
+    )
+    db.add_all([profile, candidature, other])
+    db.commit()
+    admin = register("admin")
+
+    response = client.get(f"/admin/students/{profile.id}/grades", headers=admin)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [semester["average"] for semester in body["semesters"]] == [15.0, 13.0]
+    assert body["diploma_type"] == "licence"
+    assert body["statistics"] == {"total_semesters": 2, "global_average": 14.0, "validated_semesters": 1}
+
+    assert client.get("/admin/students/999999/grades", headers=admin).status_code == 404
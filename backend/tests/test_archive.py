@@ -0,0 +1,56 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import select
+from conftest import new_offre, new_user
+from app.models import (
+    ArchivedCandidature, Candidature, CandidatureStatus, DiplomaType, DocumentReference, Offre, SemesterGrade
+)
+from app.utils.archive import ARCHIVED_OWNER_TYPE, archive_candidatures
+from app.utils.document_store import document_store
+
+
+def add_closed_candidature(db, offre: Offre) -> Candidature:
+    """An accepted candidature of the 2020-2021 campaign, with a grade and a document"""
+    name = uuid.uuid4().hex[:12]
+    candidature = Candidature(
+        candidat=new_user(), offre=offre, nom="Alami", prenom=name, status=CandidatureStatus.ACCEPTED,
+        created_at=datetime(2020, 10, 1),
+        semester_grades=[SemesterGrade(diploma_type=DiplomaType.LICENCE, semester_number=1, average=14.0)]
+    )
+    db.add(candidature)
+    db.flush()
+    document_store.attach(db, document_store.save(db, name.encode()), "candidature", candidature.id, "cin_image_path")
+    db.commit()
+    return candidature
+
+
+def test_archive_twice_across_id_reuse(db):
+    offre = new_offre("Licence Histoire", "Histoire contemporaine")
+    db.add(offre)
+    db.commit()
+
+    first = add_closed_candidature(db, offre)
+    first_id, first_prenom = first.id, first.prenom
+    assert archive_candidatures(db, "2021-2022")["candidatures"] >= 1
+
+    # On SQLite the new candidature typically gets the id of the archived one back
+    second = add_closed_candidature(db, offre)
+    second_id, second_prenom = second.id, second.prenom
+    assert archive_candidatures(db, "2021-2022")["candidatures"] >= 1
+
+    archived = {
+        row.prenom: row for row in db.execute(
+            select(ArchivedCandidature).where(ArchivedCandidature.prenom.in_([first_prenom, second_prenom]))
+        ).scalars()
+    }
+    assert archived[first_prenom].id != archived[second_prenom].id
+    assert archived[first_prenom].original_id == first_id
+    assert archived[second_prenom].original_id == second_id
+    assert [grade.average for grade in archived[second_prenom].semester_grades] == [14.0]
+
+    for row in archived.values():
+        references = document_store.references_for(db, ARCHIVED_OWNER_TYPE, row.id)
+        assert list(references) == ["cin_image_path"]
+        assert db.scalar(select(DocumentReference.id).where(
+            DocumentReference.owner_type == "candidature", DocumentReference.owner_id == row.original_id
+        )) is None
@@ -0,0 +1,94 @@
+import json
+import uuid
+import sqlalchemy as sa
+from conftest import alembic, new_offre, new_user
+from app.models import Candidature
+
+
+def add_candidature(db, nom: str, prenom: str, cne: str, bac_cne=None, cin_number=None) -> Candidature:
+    """A candidature with the CNE as typed, and the identifiers read on its documents, if any"""
+    candidature = Candidature(
+        candidat=new_user(), offre=new_offre(), nom=nom, prenom=prenom, cne=cne,
+        bac_data={"verified_fields": {"cne": bac_cne}} if bac_cne else None,
+        cin_data={"verified_fields": {"cin_number": cin_number}} if cin_number else None
+    )
+    db.add(candidature)
+    db.commit()
+    return candidature
+
+
+def lookup(client, admin, q):
+    response = client.get("/admin/lookup", params={"q": q}, headers=admin)
+    assert response.status_code == 200, response.text
+    return {row["id"]: row for row in response.json()["candidatures"]}
+
+
+def test_lookup_keeps_typed_identifiers(client, register, db):
+    admin = register("admin")
+    digits = str(uuid.uuid4().int)[:8]
+    # Letters only: a query with digits is read as an identifier
+    prenom = "Hajar" + "".join(chr(ord("a") + int(digit)) for digit in str(uuid.uuid4().int)[:8])
+
+    read = add_candidature(db, "Aït-Brahim", prenom, f"k {digits}-1", bac_cne=f"R{digits}9", cin_number=f"be{digits}")
+    unread = add_candidature(db, "Aït-Brahim", prenom, f"k {digits}-2")
+
+    # Typed values stay as entered, the searched ones are in their own columns
+    db.refresh(read)
+    assert (read.cne, read.cin_number) == (f"k {digits}-1", None)
+    assert (read.cne_lookup, read.cin_number_lookup) == (f"R{digits}9", f"BE{digits}")
+    assert unread.cne_lookup == f"K{digits}2"
+
+    # The CNE read on the baccalauréat, in full or its beginning
+    found = lookup(client, admin, f"r{digits}9")
+    assert found[read.id]["match"] == "exact"
+    assert found[read.id]["cne"] == f"k {digits}-1"
+    assert read.id in lookup(client, admin, f"R {digits[:4]}")
+
+    # The typed CNE, when the baccalauréat could not be read
+    assert lookup(client, admin, f"K{digits}2")[unread.id]["match"] == "exact"
+    assert read.id not in lookup(client, admin, f"K{digits}1")
+
+    # CIN number prefix
+    found = lookup(client, admin, f"BE-{digits[:5]}")
+    assert list(found) == [read.id]
+    assert found[read.id]["match"] == "prefix"
+
+    # Names, in either order, without accents
+    for q in (f"ait brahim {prenom}", f"{prenom.upper()} Aït-Brahim", prenom[:7]):
+        assert {read.id, unread.id} <= set(lookup(client, admin, q)), q
+
+
+def test_migration_restores_typed_cne(tmp_path):
+    url = f"sqlite:///{tmp_path}/identifiers.db"
+    alembic(url, "upgrade", "0010")
+    engine = sa.create_engine(url)
+    bac_data = {
+        "verified_fields": {"cne": "R123456789"},
+        "verification": {"cne": {"extracted": "R123456789", "provided": "r 12345678-0"}}
+    }
+    with engine.begin() as conn:
+        # As 0008 left them: the CNE read by OCR over the typed one
+        conn.execute(sa.text(
+            "INSERT INTO candidatures (id, candidat_id, offre_id, nom, prenom, status, bac_data, cne, cin_number) "
+            "VALUES (1, 1, 1, 'Alami', 'Sara', 'SUBMITTED', :bac_data, 'R123456789', 'BE123456'), "
+            "(2, 1, 2, 'Alami', 'Sara', 'SUBMITTED', NULL, 'K987654321', NULL)"
+        ), {"bac_data": json.dumps(bac_data)})
+
+    alembic(url, "upgrade", "0011")
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text(
+            "SELECT id, cne, cin_number, cne_lookup, cin_number_lookup FROM candidatures ORDER BY id"
+        )).all()
+        indexes = {index["name"] for index in sa.inspect(conn).get_indexes("candidatures")}
+    assert [tuple(row) for row in rows] == [
+        (1, "r 12345678-0", None, "R123456789", "BE123456"),
+        (2, "K987654321", None, "K987654321", None),
+    ]
+    assert {"ix_candidatures_cne_lookup", "ix_candidatures_cin_number_lookup"} <= indexes
+    assert "ix_candidatures_cne" not in indexes
+
+    alembic(url, "downgrade", "0010")
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text("SELECT id, cne, cin_number FROM candidatures ORDER BY id")).all()
+    assert [tuple(row) for row in rows] == [(1, "R123456789", "BE123456"), (2, "K987654321", None)]
+    engine.dispose()
@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select, text
+from sqlalchemy.engine import make_url
+from app.config import Settings
+from app.database import create_db_engine
+
+SERVER_URL = os.environ["DATABASE_URL"] if make_url(os.environ["DATABASE_URL"]).get_backend_name() != "sqlite" else None
+
+
+@pytest.fixture(params=[
+    "sqlite",
+    pytest.param("server", marks=pytest.mark.skipif(SERVER_URL is None, reason="DATABASE_URL is SQLite")),
+])
+def settings(request, tmp_path):
+    """Settings for a scratch SQLite file, and for DATABASE_URL when it is PostgreSQL / MySQL"""
+    url = f"sqlite:///{tmp_path}/engine.db" if request.param == "sqlite" else SERVER_URL
+    return Settings(database_url=url, secret_key="test-secret-key-test-secret-key-1234")
+
+
+@pytest.fixture
+def engine(settings):
+    engine = create_db_engine(settings)
+    yield engine
+    engine.dispose()
+
+
+def test_engine_configuration(engine, settings):
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout_ms
+        else:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+            assert engine.pool.size() == settings.db_pool_size
+            assert engine.pool._pre_ping
+
+
+def test_concurrent_writes(engine):
+    """Writers from many threads at once: no "database is locked" on SQLite, no pool exhaustion"""
+    table = Table(
+        "engine_check", MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("writer", String(20), nullable=False)
+    )
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+
+    def write(writer: int):
+        for _ in range(10):
+            with engine.begin() as connection:
+                connection.execute(insert(table).values(writer=str(writer)))
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(write, range(16)))
+
+        with engine.connect() as connection:
+            assert len(connection.execute(select(table.c.id)).all()) == 160
+    finally:
+        table.drop(engine)
@@ -0,0 +1,101 @@
+import os
+import pytest
+from sqlalchemy import event
+from conftest import image_bytes, new_offre, new_user
+from app.models import Candidature, DocumentBlob
+from app.utils.document_store import DocumentStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(root=str(tmp_path / "store"))
+
+
+@pytest.fixture
+def owners(db):
+    """Ids of two candidatures to attach documents to"""
+    offre = new_offre()
+    candidatures = [Candidature(candidat=new_user(), offre=offre, nom="Fassi", prenom=name) for name in ("Nora", "Adam")]
+    db.add_all(candidatures)
+    db.commit()
+    return [candidature.id for candidature in candidatures]
+
+
+def ref_count(db, blob: DocumentBlob) -> int:
+    db.expire(blob)
+    return blob.ref_count
+
+
+def test_identical_documents_are_stored_once(db, store):
+    data = image_bytes()
+    first = store.save(db, data)
+    second = store.save(db, data)
+    db.commit()
+
+    assert first is second
+    assert first.content_type == "image/jpeg"
+    assert first.path == store.blob_path(first.sha256, ".jpg")
+    assert first.path.endswith(os.path.join(first.sha256[:2], first.sha256[2:4], f"{first.sha256}.jpg"))
+    with open(first.path, "rb") as file:
+        assert file.read() == data
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_reference_counts(db, store, owners):
+    first_owner, second_owner = owners
+    shared = store.save(db, image_bytes())
+    replacement = store.save(db, image_bytes())
+
+    store.attach(db, shared, "candidature", first_owner, "cin_image_path")
+    store.attach(db, shared, "candidature", second_owner, "cin_image_path")
+    store.attach(db, shared, "candidature", second_owner, "cin_image_path")  # Same again: no change
+    db.commit()
+    assert ref_count(db, shared) == 2
+
+    # A new document for a field releases the previous one
+    store.attach(db, replacement, "candidature", second_owner, "cin_image_path")
+    store.attach(db, replacement, "candidature", second_owner, "bac_image_path")
+    db.commit()
+    assert (ref_count(db, shared), ref_count(db, replacement)) == (1, 2)
+    assert set(store.references_for(db, "candidature", second_owner)) == {"cin_image_path", "bac_image_path"}
+
+    assert store.detach(db, "candidature", second_owner, "bac_image_path") == 1
+    db.commit()
+    assert ref_count(db, replacement) == 1
+
+    assert store.detach(db, "candidature", first_owner) == 1
+    assert store.detach(db, "candidature", second_owner) == 1
+    db.commit()
+    assert (ref_count(db, shared), ref_count(db, replacement)) == (0, 0)
+    assert store.references_for(db, "candidature", second_owner) == {}
+
+
+def test_document_types_are_sniffed(db, store):
+    assert store.save(db, image_bytes(fmt="PNG")).content_type == "image/png"
+    pdf = store.save(db, b"%PDF-1.4\n" + os.urandom(64))
+    assert (pdf.content_type, os.path.splitext(pdf.path)[1]) == ("application/pdf", ".pdf")
+    unknown = store.save(db, os.urandom(64))
+    assert (unknown.content_type, os.path.splitext(unknown.path)[1]) == ("application/octet-stream", ".bin")
+    db.rollback()
+
+
+def test_concurrent_saves_of_the_same_document(db, store):
+    """The same new bytes stored by another request between the lookup and the insert: its row is reused"""
+    from app.database import SessionLocal
+
+    data = image_bytes()
+    other = SessionLocal()
+
+    @event.listens_for(db, "before_flush", once=True)
+    def store_meanwhile(session, flush_context, instances):
+        store.save(other, data)
+        other.commit()
+
+    try:
+        blob = store.save(db, data)
+        store.attach(db, blob, "candidature", 0, "cin_image_path")
+        db.rollback()  # The reference only, the other request's row stays
+
+        assert other.get(DocumentBlob, blob.sha256).ref_count == 0
+    finally:
+        other.close()
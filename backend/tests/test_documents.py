@@ -0,0 +1,60 @@
+import pytest
+from conftest import image_bytes
+from app.models import Candidature, Offre
+from app.utils.document_store import document_store
+
+
+def user_id(client, headers) -> int:
+    return client.get("/auth/me", headers=headers).json()["id"]
+
+
+@pytest.fixture
+def dossier(client, register, db):
+    """A candidature of a registered candidat to a registered recruteur's offre, with its CIN stored"""
+    candidat, recruteur = register(), register("recruteur")
+    offre = Offre(titre="Master Finance", description="Marchés financiers", admin_id=user_id(client, recruteur))
+    candidature = Candidature(candidat_id=user_id(client, candidat), offre=offre, nom="Chraibi", prenom="Salma")
+    db.add(candidature)
+    db.flush()
+    data = image_bytes()
+    blob = document_store.save(db, data)
+    document_store.attach(db, blob, "candidature", candidature.id, "cin_image_path")
+    db.commit()
+    return {
+        "sha256": blob.sha256, "data": data, "offre_id": offre.id, "candidat": candidat, "recruteur": recruteur
+    }
+
+
+def test_owner_reads_their_document(client, dossier):
+    response = client.get(f"/documents/{dossier['sha256']}", headers=dossier["candidat"])
+    assert response.status_code == 200
+    assert response.content == dossier["data"]
+    assert response.headers["content-type"] == "image/jpeg"
+
+
+def test_admin_reads_every_document(client, register, dossier):
+    response = client.get(f"/documents/{dossier['sha256']}/thumbnail", headers=register("admin"))
+    assert response.status_code == 200
+
+
+def test_recruteur_reads_documents_of_their_offres(client, register, dossier):
+    """The candidatures a recruteur can list, and their documents"""
+    listed = client.get(f"/candidatures/offre/{dossier['offre_id']}", headers=dossier["recruteur"])
+    assert listed.status_code == 200
+    assert len(listed.json()) == 1
+    assert client.get(f"/documents/{dossier['sha256']}", headers=dossier["recruteur"]).status_code == 200
+
+    other = register("recruteur")
+    assert client.get(f"/candidatures/offre/{dossier['offre_id']}", headers=other).status_code == 403
+    assert client.get(f"/documents/{dossier['sha256']}", headers=other).status_code == 404
+
+
+def test_other_candidat_gets_404(client, register, dossier):
+    other = register()
+    assert client.get(f"/documents/{dossier['sha256']}", headers=other).status_code == 404
+    assert client.get(f"/documents/{dossier['sha256']}/review", headers=other).status_code == 404
+    assert client.get(f"/documents/{'0' * 64}", headers=other).status_code == 404  # Unknown: same answer
+
+
+def test_anonymous_gets_401(client, dossier):
+    assert client.get(f"/documents/{dossier['sha256']}").status_code == 401
@@ -0,0 +1,53 @@
+import sqlalchemy as sa
+from conftest import alembic
+
+
+def rows(conn, query):
+    return [tuple(row) for row in conn.execute(sa.text(query))]
+
+
+def test_duplicates_are_set_aside(tmp_path):
+    url = f"sqlite:///{tmp_path}/duplicates.db"
+    alembic(url, "upgrade", "0001")
+    engine = sa.create_engine(url)
+    with engine.begin() as conn:
+        # Candidatures 2 and 3 repeat 1; grade 12 replaces 11 for the same semester
+        conn.execute(sa.text(
+            "INSERT INTO candidatures (id, candidat_id, offre_id, nom, prenom, status) VALUES "
+            "(1, 1, 1, 'Alami', 'Sara', 'SUBMITTED'), (2, 1, 1, 'Alami', 'Sara', 'SUBMITTED'), "
+            "(3, 1, 1, 'Alami', 'Sara', 'INCOMPLETE'), (4, 1, 2, 'Alami', 'Sara', 'SUBMITTED')"
+        ))
+        conn.execute(sa.text(
+            "INSERT INTO semester_grades (id, candidature_id, diploma_type, semester_number, average) VALUES "
+            "(11, 1, 'LICENCE', 1, 12.5), (12, 1, 'LICENCE', 1, 13.0), (21, 2, 'LICENCE', 1, 15.0)"
+        ))
+        conn.execute(sa.text(
+            "INSERT INTO document_references (id, owner_type, owner_id, field, blob_sha256) VALUES "
+            "(1, 'candidature', 1, 'cin_image_path', 'a'), (2, 'candidature', 2, 'cin_image_path', 'b')"
+        ))
+
+    result = alembic(url, "upgrade", "0002")
+    assert "Moved 2 duplicate row(s) of candidatures to candidatures_duplicates, ids: 2, 3" in result.stderr
+
+    with engine.connect() as conn:
+        assert rows(conn, "SELECT id FROM candidatures ORDER BY id") == [(1,), (4,)]
+        assert rows(conn, "SELECT id FROM semester_grades") == [(12,)]
+        assert rows(conn, "SELECT id, status FROM candidatures_duplicates ORDER BY id") == [
+            (2, "SUBMITTED"), (3, "INCOMPLETE")
+        ]
+        assert rows(conn, "SELECT id, average FROM semester_grades_duplicates ORDER BY id") == [
+            (11, 12.5), (21, 15.0)
+        ]
+        assert rows(conn, "SELECT owner_type, owner_id FROM document_references ORDER BY id") == [
+            ("candidature", 1), ("candidature_duplicate", 2)
+        ]
+
+    alembic(url, "downgrade", "0001")
+    with engine.connect() as conn:
+        assert rows(conn, "SELECT id FROM candidatures ORDER BY id") == [(1,), (2,), (3,), (4,)]
+        assert rows(conn, "SELECT id FROM semester_grades ORDER BY id") == [(11,), (12,), (21,)]
+        assert rows(conn, "SELECT owner_type FROM document_references ORDER BY id") == [
+            ("candidature",), ("candidature",)
+        ]
+        assert not sa.inspect(conn).has_table("candidatures_duplicates")
+    engine.dispose()
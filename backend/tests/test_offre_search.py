@@ -0,0 +1,75 @@
+import uuid
+import pytest
+from app.utils.offre_search import SNIPPET_END, SNIPPET_START, highlight, search_terms
+
+
+def unique_word() -> str:
+    """A word no other offre contains (letters only)"""
+    return "".join(chr(ord("a") + int(char, 16)) for char in uuid.uuid4().hex[:10])
+
+
+@pytest.fixture
+def admin(register):
+    return register("admin")
+
+
+def create(client, admin, **offre) -> int:
+    response = client.post("/offres/", json={"conditions": "Baccalauréat", **offre}, headers=admin)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def search(client, headers, q: str) -> list:
+    response = client.get("/offres/search", params={"q": q}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_search_ranks_accent_insensitive_prefixes(client, admin):
+    word = unique_word()
+    in_description = create(
+        client, admin, titre="Licence Sciences de la Vie", description=f"Parcours écologie {word} et terrain"
+    )
+    in_title = create(client, admin, titre=f"Master Écologie {word}", description="Biodiversité et environnement")
+    create(client, admin, titre="Master Écologie urbaine", description="Ville et environnement")
+
+    results = search(client, admin, f"ECOLO {word[:6]}")
+    assert [result["id"] for result in results] == [in_title, in_description]  # Title weighs most
+    assert results[0]["score"] > results[1]["score"]
+    assert f"{SNIPPET_START}écologie{SNIPPET_END}" in results[1]["snippet"].lower()
+
+
+def test_search_follows_updates_and_deletes(client, admin):
+    word, new_word = unique_word(), unique_word()
+    offre_id = create(client, admin, titre="Licence Géographie", description=f"Cartographie {word}")
+    assert [result["id"] for result in search(client, admin, word)] == [offre_id]
+
+    response = client.put(f"/offres/{offre_id}", json={"description": f"Télédétection {new_word}"}, headers=admin)
+    assert response.status_code == 200, response.text
+    assert search(client, admin, word) == []
+    assert [result["id"] for result in search(client, admin, f"teledetection {new_word}")] == [offre_id]
+
+    assert client.delete(f"/offres/{offre_id}", headers=admin).status_code == 204
+    assert search(client, admin, new_word) == []
+
+
+def test_search_hides_unvalidated_offres_from_candidats(client, admin, register):
+    word = unique_word()
+    offre_id = create(client, admin, titre=f"DEUST {word}", description="Logistique")
+    response = client.put(f"/admin/offres/{offre_id}/validate", json={"status": "rejected"}, headers=admin)
+    assert response.status_code == 200, response.text
+
+    assert search(client, register(), word) == []
+    assert [result["id"] for result in search(client, admin, word)] == [offre_id]
+
+
+def test_search_query_syntax_is_not_interpreted(client, admin):
+    assert search(client, admin, '"*') == []
+    assert isinstance(search(client, admin, "NEAR(a b) OR -x AND \"y"), list)
+
+
+def test_highlight():
+    assert search_terms("Génie-Civil  BTP*") == ["génie", "civil", "btp"]
+    snippet = highlight("Formation en génie civil et travaux publics", ["genie", "trav"])
+    assert snippet == f"Formation en {SNIPPET_START}génie{SNIPPET_END} civil et {SNIPPET_START}travaux{SNIPPET_END} publics"
+    assert highlight("Rien à voir", ["genie"]) is None
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+import pytest
+from conftest import new_offre, new_user
+from app.models import Candidature, DiplomaType, SemesterGrade
+
+START = datetime(2026, 9, 15, 10, 0, 0)
+
+
+@pytest.fixture
+def offre_candidatures(db):
+    """
+    Candidatures to a new offre, most of them created at the same instant
+    and inserted out of creation order
+
+    Returns:
+        (offre id, candidature ids in (created_at, id) order, {id: average})
+    """
+    offre = new_offre()
+    created = [START + timedelta(minutes=5), START, START, START, START, START - timedelta(days=1), START]
+    averages = [12.0, 15.5, None, 15.5, 9.0, 17.25, 15.5]
+    candidatures = [
+        Candidature(
+            candidat=new_user(), offre=offre, nom="Naciri", prenom=f"Candidat {number}", created_at=created_at,
+            semester_grades=[] if average is None else [
+                SemesterGrade(diploma_type=DiplomaType.LICENCE, semester_number=1, average=average)
+            ]
+        )
+        for number, (created_at, average) in enumerate(zip(created, averages))
+    ]
+    db.add_all(candidatures)
+    db.commit()
+
+    ordered = sorted(candidatures, key=lambda candidature: (candidature.created_at, candidature.id))
+    return offre.id, [c.id for c in ordered], {c.id: average for c, average in zip(candidatures, averages)}
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_cursor_pages_with_equal_created_at(client, register, offre_candidatures, limit):
+    """Following X-Next-Cursor returns every row once, in (created_at, id) order"""
+    admin = register("admin")
+    offre_id, expected, _ = offre_candidatures
+
+    seen, cursor = [], None
+    for _ in range(len(expected) + 1):
+        params = {"offre_id": offre_id, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/admin/candidatures", params=params, headers=admin)
+        assert response.status_code == 200, response.text
+
+        page = [row["id"] for row in response.json()]
+        assert len(page) <= limit
+        seen += page
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == expected
+
+
+def test_skip_pages_and_cursor_agree(client, register, offre_candidatures):
+    admin = register("admin")
+    offre_id, expected, _ = offre_candidatures
+
+    pages = [
+        [row["id"] for row in client.get(
+            "/admin/candidatures", params={"offre_id": offre_id, "limit": 3, "skip": skip}, headers=admin
+        ).json()]
+        for skip in (0, 3, 6)
+    ]
+    assert sum(pages, []) == expected
+
+
+def test_average_sort_and_filter(client, register, offre_candidatures):
+    admin = register("admin")
+    offre_id, _, averages = offre_candidatures
+    by_average = sorted(averages, key=lambda row_id: (averages[row_id] is None, -(averages[row_id] or 0), row_id))
+
+    pages = [
+        client.get(
+            "/admin/candidatures", params={"offre_id": offre_id, "sort": "average_desc", "limit": 2, "skip": skip},
+            headers=admin
+        ).json()
+        for skip in range(0, len(averages), 2)
+    ]
+    assert [row["id"] for page in pages for row in page] == by_average
+
+    response = client.get(
+        "/admin/candidatures", params={"offre_id": offre_id, "min_average": 15.5}, headers=admin
+    )
+    assert sorted(row["id"] for row in response.json()) == sorted(
+        row_id for row_id, average in averages.items() if average is not None and average >= 15.5
+    )
+
+    response = client.get(
+        "/admin/candidatures", params={"offre_id": offre_id, "sort": "average_desc", "cursor": "abc"}, headers=admin
+    )
+    assert response.status_code == 400
+
+
+def test_invalid_cursor(client, register):
+    response = client.get("/admin/candidatures", params={"cursor": "not-a-cursor"}, headers=register("admin"))
+    assert response.status_code == 400
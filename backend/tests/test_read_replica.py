@@ -0,0 +1,63 @@
+import os
+import time
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from conftest import WORK_DIR, migrate
+import app.database as database
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """
+    Route read_db() sessions to a second database standing in for a replica
+
+    It is migrated but never replicated to, so a read that finds the rows the
+    test wrote went to the primary.
+    """
+    url = os.environ.get("TEST_DATABASE_READ_URL", f"sqlite:///{WORK_DIR}/replica.db")
+    migrate(url)
+
+    engine = database.create_async_db_engine(database.settings, url)
+    monkeypatch.setattr(database, "read_async_engine", engine)
+    monkeypatch.setattr(
+        database, "ReadSessionLocal", async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    )
+    yield engine
+    engine.sync_engine.dispose()
+
+
+def test_read_your_writes(client, register, replica):
+    admin = register("admin")
+
+    response = client.post("/offres/", json={
+        "titre": "Master Réseaux",
+        "description": "Administration et sécurité des réseaux",
+        "conditions": "Licence"
+    }, headers=admin)
+    assert response.status_code == 201, response.text
+    offre_id = response.json()["id"]
+    marker = response.headers[database.LAST_WRITE_HEADER]
+    assert response.cookies[database.LAST_WRITE_COOKIE] == marker
+    client.cookies.clear()
+
+    # Just written: on the primary, whichever worker serves the request
+    response = client.get(f"/offres/{offre_id}", headers={**admin, database.LAST_WRITE_HEADER: marker})
+    assert response.status_code == 200
+    client.cookies.set(database.LAST_WRITE_COOKIE, marker)
+    assert client.get(f"/offres/{offre_id}", headers=admin).status_code == 200
+    client.cookies.clear()
+
+    # No marker, or one that is forged or belongs to another client: on the replica
+    assert client.get(f"/offres/{offre_id}", headers=admin).status_code == 404
+    stamp = marker.rpartition(".")[0]
+    forged = f"{time.time():.3f}.{marker.rpartition('.')[2]}"
+    assert client.get(f"/offres/{offre_id}", headers={**admin, database.LAST_WRITE_HEADER: forged}).status_code == 404
+    other = register("admin")
+    assert client.get(f"/offres/{offre_id}", headers={**other, database.LAST_WRITE_HEADER: marker}).status_code == 404
+
+    # Past the staleness window: back on the replica
+    time.sleep(max(0.0, float(stamp) + database.settings.database_read_max_staleness + 0.2 - time.time()))
+    response = client.get(f"/offres/{offre_id}", headers={**admin, database.LAST_WRITE_HEADER: marker})
+    assert response.status_code == 404
+
+    assert client.delete(f"/offres/{offre_id}", headers=admin).status_code == 204
@@ -0,0 +1,104 @@
+from datetime import date
+import pytest
+from sqlalchemy import select
+from conftest import new_offre, new_user
+from app.models import (
+    Candidature, CandidatureStatistics, CandidatureStatus, DiplomaStatistics, DiplomaType, ProfileStatus,
+    SemesterGrade, StudentProfile
+)
+from app.utils.statistics import rebuild_statistics
+
+
+def snapshot(db) -> dict:
+    """Statistics rows (empty ones left out) and candidature scores as stored"""
+    diplomas = {
+        row.diploma: (row.students_count, row.verified_count, row.grades_count, pytest.approx(row.grades_sum))
+        for row in db.execute(select(DiplomaStatistics)).scalars()
+        if row.students_count or row.grades_count
+    }
+    candidatures = {
+        (row.offre_id, row.status): row.candidatures_count
+        for row in db.execute(select(CandidatureStatistics)).scalars()
+        if row.candidatures_count
+    }
+    scores = {
+        candidature_id: (count, pytest.approx(average) if average is not None else None)
+        for candidature_id, count, average in db.execute(
+            select(Candidature.id, Candidature.grades_count, Candidature.average_total)
+        )
+    }
+    return {"diplomas": diplomas, "candidatures": candidatures, "scores": scores}
+
+
+def assert_matches_rebuild(db):
+    """The incrementally maintained statistics are what rebuild_statistics() computes"""
+    db.commit()
+    maintained = snapshot(db)
+    rebuild_statistics(db)
+    db.expire_all()
+    rebuilt = snapshot(db)
+    db.rollback()
+    assert maintained == rebuilt
+
+
+def test_statistics_follow_writes(db):
+    offre, other_offre = new_offre(), new_offre("Master Physique")
+    profile = StudentProfile(
+        user=new_user(), nom="Benali", prenom="Sara", date_naissance=date(2002, 3, 4), current_diploma="licence"
+    )
+    candidature = Candidature(
+        candidat=profile.user, offre=offre, nom="Benali", prenom="Sara",
+        semester_grades=[
+            SemesterGrade(diploma_type=DiplomaType.LICENCE, semester_number=1, average=12.5),
+            SemesterGrade(diploma_type=DiplomaType.LICENCE, semester_number=2, average=15.0),
+            SemesterGrade(diploma_type=DiplomaType.LICENCE, semester_number=3),  # No average yet
+        ]
+    )
+    other = Candidature(candidat=new_user(), offre=other_offre, nom="Idrissi", prenom="Omar")
+    db.add_all([profile, candidature, other])
+    assert_matches_rebuild(db)
+    assert candidature.grades_count == 3
+    assert candidature.average_total == pytest.approx(13.75)
+
+    # Updates of rows loaded after the commit (expired) and of rows loaded in the session
+    profile.profile_status = ProfileStatus.VERIFIED
+    profile.current_diploma = "master"
+    candidature.status = CandidatureStatus.SUBMITTED
+    other.offre = offre
+    grades = {grade.semester_number: grade for grade in candidature.semester_grades}
+    grades[1].average = 16.5
+    grades[3].average = 10.0
+    grades[2].diploma_type = DiplomaType.DUT
+    assert_matches_rebuild(db)
+    assert candidature.average_total == pytest.approx(13.833, abs=1e-3)
+
+    # A grade moved to another candidature rescores both
+    grades[3].candidature = other
+    assert_matches_rebuild(db)
+    assert (candidature.grades_count, other.grades_count) == (2, 1)
+
+    # Deletes, grades going with their candidature
+    db.delete(grades[1])
+    assert_matches_rebuild(db)
+    db.delete(candidature)
+    db.delete(profile)
+    assert_matches_rebuild(db)
+    db.delete(other)
+    assert_matches_rebuild(db)
+
+
+def test_statistics_follow_api_writes(client, register, db):
+    """Writes through the async session of the API"""
+    admin = register("admin")
+    response = client.post("/offres/", json={
+        "titre": "DUT Génie Civil", "description": "Bâtiment et travaux publics", "conditions": "Bac S"
+    }, headers=admin)
+    assert response.status_code == 201, response.text
+    offre_id = response.json()["id"]
+
+    candidature = Candidature(candidat=new_user(), offre_id=offre_id, nom="Tazi", prenom="Lina")
+    db.add(candidature)
+    db.commit()
+
+    assert client.delete(f"/offres/{offre_id}", headers=admin).status_code == 204
+    assert_matches_rebuild(db)
@@ -0,0 +1,36 @@
+import csv
+import io
+from app.utils.tabular_stream import UTF8_BOM, stream_csv, stream_ndjson
+
+ROWS = [
+    ["=HYPERLINK(\"http://example.com\")", "+33 6 12 34 56 78", "-2+3", "@SUM(A1:A2)"],
+    ["\tcmd", "\rcmd", "Dupont-Martin", -12.5],
+]
+COLUMNS = ["a", "b", "c", "d"]
+
+
+def read_csv(chunks) -> list:
+    text = b"".join(chunks).decode("utf-8")
+    assert text.startswith(UTF8_BOM)
+    return list(csv.reader(io.StringIO(text[len(UTF8_BOM):])))
+
+
+def test_csv_neutralizes_formulas():
+    assert read_csv(stream_csv(COLUMNS, ROWS)) == [
+        COLUMNS,
+        ["'=HYPERLINK(\"http://example.com\")", "'+33 6 12 34 56 78", "'-2+3", "'@SUM(A1:A2)"],
+        ["'\tcmd", "'\rcmd", "Dupont-Martin", "-12.5"],
+    ]
+
+
+def test_csv_chunks():
+    rows = [[str(number), None] for number in range(7)]
+    chunks = list(stream_csv(["n", "empty"], rows, rows_per_chunk=3))
+    assert len(chunks) == 3
+    assert read_csv(chunks) == [["n", "empty"]] + [[str(number), ""] for number in range(7)]
+
+
+def test_ndjson_keeps_values():
+    lines = b"".join(stream_ndjson(COLUMNS, ROWS)).decode("utf-8").splitlines()
+    assert lines[0] == '{"a": "=HYPERLINK(\\"http://example.com\\")", "b": "+33 6 12 34 56 78", "c": "-2+3", "d": "@SUM(A1:A2)"}'
+    assert len(lines) == 2
@@ -0,0 +1,81 @@
+import os
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from conftest import image_bytes, new_offre, new_user
+from app.models import Candidature, DocumentBlob, DocumentReference
+from app.utils.document_store import document_store
+from app.utils.upload_gc import collect_orphaned_uploads
+
+TWO_DAYS_AGO = datetime.utcnow() - timedelta(days=2)
+
+
+def age(db, *blobs: DocumentBlob):
+    """Make blobs (rows and files) look stored two days ago"""
+    db.execute(
+        update(DocumentBlob).where(DocumentBlob.sha256.in_([blob.sha256 for blob in blobs])).values(
+            created_at=TWO_DAYS_AGO
+        )
+    )
+    db.commit()
+    for blob in blobs:
+        os.utime(blob.path, (time.time() - 2 * 86400,) * 2)
+
+
+def exists(db, blob: DocumentBlob) -> bool:
+    """Whether a blob still has both its row and its file"""
+    row = db.get(DocumentBlob, blob.sha256)
+    assert (row is None) == (not os.path.exists(blob.path)), "row and file out of sync"
+    return row is not None
+
+
+def test_gc_keeps_referenced_blobs_and_deletes_orphans(db):
+    candidature = Candidature(candidat=new_user(), offre=new_offre(), nom="Ouali", prenom="Yasmine")
+    leaving = Candidature(candidat=new_user(), offre=candidature.offre, nom="Ouali", prenom="Karim")
+    db.add_all([candidature, leaving])
+    db.flush()
+
+    referenced = document_store.save(db, image_bytes())
+    document_store.attach(db, referenced, "candidature", candidature.id, "cin_image_path")
+    orphan = document_store.save(db, image_bytes())  # e.g. a submission rejected by OCR
+    recent_orphan = document_store.save(db, image_bytes())
+    dangling = document_store.save(db, image_bytes())
+    document_store.attach(db, dangling, "candidature", leaving.id, "cin_image_path")
+    db.commit()
+    db.delete(leaving)  # Its reference stays behind
+    db.commit()
+
+    age(db, referenced, orphan, dangling)
+    db.execute(update(DocumentBlob).where(DocumentBlob.sha256 == recent_orphan.sha256).values(created_at=TWO_DAYS_AGO))
+    db.commit()  # Row old, file written again just now: a deduplicated upload in flight
+
+    loose = os.path.join("uploads", "left-over.jpg")
+    with open(loose, "wb") as file:
+        file.write(image_bytes())
+    os.utime(loose, (time.time() - 2 * 86400,) * 2)
+
+    report = collect_orphaned_uploads(db, grace_period=timedelta(hours=1), dry_run=True)
+    assert report["deleted_blobs"] >= 1 and report["released_references"] >= 1
+    assert all(exists(db, blob) for blob in (referenced, orphan, recent_orphan, dangling))
+    assert os.path.exists(loose)
+
+    collect_orphaned_uploads(db, grace_period=timedelta(hours=1))
+    db.expire_all()
+
+    assert exists(db, referenced)
+    assert db.get(DocumentBlob, referenced.sha256).ref_count == 1
+    assert exists(db, recent_orphan)
+    assert not exists(db, orphan)
+    assert not exists(db, dangling)
+    assert db.query(DocumentReference).filter(DocumentReference.owner_id == leaving.id,
+                                              DocumentReference.owner_type == "candidature").count() == 0
+    assert not os.path.exists(loose)
+
+
+def test_gc_keeps_recent_orphans(db):
+    orphan = document_store.save(db, image_bytes())
+    db.commit()
+
+    collect_orphaned_uploads(db, grace_period=timedelta(hours=1))
+    db.expire_all()
+    assert exists(db, orphan)
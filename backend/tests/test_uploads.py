@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import os
+import time
+import httpx
+from conftest import image_bytes
+from app.main import app
+from app.utils import document_store
+
+
+def create_upload(client, headers, data: bytes) -> str:
+    response = client.post("/uploads/", headers={**headers, "Upload-Length": str(len(data))})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def patch(client, headers, upload_id: str, offset: int, chunk: bytes):
+    return client.patch(f"/uploads/{upload_id}", content=chunk, headers={**headers, "Upload-Offset": str(offset)})
+
+
+def test_resumable_upload(client, register):
+    headers = register()
+    data = image_bytes()
+    upload_id = create_upload(client, headers, data)
+    half = len(data) // 2
+
+    response = patch(client, headers, upload_id, 0, data[:half])
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == str(half)
+
+    # A retry of the chunk already applied, a stale offset and one past the received bytes
+    for offset, chunk in ((0, data[:half]), (half - 10, data[half - 10:]), (half + 10, data[half + 10:])):
+        response = patch(client, headers, upload_id, offset, chunk)
+        assert response.status_code == 409
+        assert response.headers["Upload-Offset"] == str(half)
+
+    response = client.post(f"/uploads/{upload_id}/finalize", headers=headers)
+    assert response.status_code == 409
+
+    assert patch(client, headers, upload_id, half, data[half:]).status_code == 204
+    assert client.head(f"/uploads/{upload_id}", headers=headers).headers["Upload-Offset"] == str(len(data))
+
+    response = client.post(
+        f"/uploads/{upload_id}/finalize", params={"sha256": hashlib.sha256(data).hexdigest()}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "completed"
+
+    assert patch(client, headers, upload_id, len(data), b"more").status_code == 409
+
+
+def test_chunk_past_upload_length(client, register):
+    headers = register()
+    data = image_bytes()
+    upload_id = create_upload(client, headers, data)
+
+    response = patch(client, headers, upload_id, 0, data + b"extra")
+    assert response.status_code == 413
+    assert int(response.headers["Upload-Offset"]) <= len(data)
+
+
+def test_racing_chunks_at_the_same_offset(client, register, monkeypatch):
+    """Two requests for the same offset (a retry racing the original): one is applied, the other gets 409"""
+    headers = register()
+    data = image_bytes()
+    upload_id = create_upload(client, headers, data)
+
+    write_part = document_store.write_part
+
+    def slow_write_part(*args):
+        time.sleep(0.3)  # Keeps the first request holding the offset while the second arrives
+        return write_part(*args)
+
+    monkeypatch.setattr(document_store, "write_part", slow_write_part)
+
+    async def race():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as async_client:
+            return await asyncio.gather(*[
+                async_client.patch(
+                    f"/uploads/{upload_id}", content=chunk, headers={**headers, "Upload-Offset": "0"}
+                )
+                for chunk in (data[:1000], data[:1500])
+            ])
+
+    responses = asyncio.run(race())
+    assert sorted(response.status_code for response in responses) == [204, 409]
+
+    offset = int(client.head(f"/uploads/{upload_id}", headers=headers).headers["Upload-Offset"])
+    assert offset in (1000, 1500)
+    assert os.path.getsize(document_store.incoming_path(upload_id)) == offset
+    assert not [name for name in os.listdir(document_store.incoming_dir) if name.startswith(upload_id)
+                and name.endswith(".chunk")]
+
+    monkeypatch.undo()
+    assert patch(client, headers, upload_id, offset, data[offset:]).status_code == 204
+    response = client.post(
+        f"/uploads/{upload_id}/finalize", params={"sha256": hashlib.sha256(data).hexdigest()}, headers=headers
+    )
+    assert response.status_code == 200, response.text
@@ -0,0 +1,68 @@
+"""
+Bulk converter: re-encode every stored document to the at-rest format
+(DOCUMENT_FORMAT, DOCUMENT_MAX_DIMENSION, DOCUMENT_QUALITY)
+
+Documents already normalized, non-image documents and documents that
+would not get smaller are left as they are. Replaced originals are kept
+for ORIGINAL_RETENTION_DAYS, then removed by gc_uploads.py.
+
+Run migrate_uploads.py first if documents are still outside the store.
+
+Usage:
+    python transcode_uploads.py [--batch-size 100]
+"""
+
+import argparse
+from app.database import SessionLocal
+from app.models import DocumentReference
+from app.utils.document_transcoder import document_transcoder
+
+
+def transcode_uploads(batch_size: int):
+    """Transcode the documents of every candidature and profile, one batch of owners at a time"""
+    db = SessionLocal()
+    transcoded = 0
+    owners = 0
+    try:
+        last_owner = ("", 0)
+        while True:
+            batch = db.query(
+                DocumentReference.owner_type,
+                DocumentReference.owner_id
+            ).filter(
+                (DocumentReference.owner_type > last_owner[0])
+                | ((DocumentReference.owner_type == last_owner[0]) & (DocumentReference.owner_id > last_owner[1]))
+            ).distinct().order_by(
+                DocumentReference.owner_type,
+                DocumentReference.owner_id
+            ).limit(batch_size).all()
+
+            if not batch:
+                break
+            last_owner = tuple(batch[-1])
+
+            for owner_type, owner_id in batch:
+                transcoded += document_transcoder.transcode_owner_documents(db, owner_type, owner_id)
+            db.commit()
+
+            owners += len(batch)
+            print(f"   - {owners} owner(s) processed, {transcoded} document(s) transcoded")
+
+        print(f"Successfully transcoded {transcoded} document(s)")
+        print("Run gc_uploads.py to reclaim the space of the replaced originals")
+
+    except Exception as e:
+        print(f"Error during transcoding: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-encode stored documents to the at-rest format")
+    parser.add_argument("--batch-size", type=int, default=100, help="Candidatures/profiles per transaction")
+    args = parser.parse_args()
+
+    print("Starting documents transcoding...")
+    transcode_uploads(args.batch_size)
+    print("\nTranscoding complete!")